@@ -1,6 +1,7 @@
 import sys
 
-from interpreter import build_bytecode, Parser, VM, pretty_print_bc
+from interpreter import build_bytecode, optimize, DEFAULT_OPT_LEVEL, Parser, VM, pretty_print_bc
+from interpreter.token_reader import TokenReader, stream_lines
 from metadata import VERSION
 
 HELP = '''Использование:
@@ -8,6 +9,7 @@ pykumir [ОПЦИИ] файл.kum
 
 Опции:
   --debug       - запустить программу в режиме отладки
+  -O<уровень>   - уровень оптимизации байт-кода: 0 - без оптимизаций, 1 - все оптимизации (по умолчанию)
   --help, -h    - распечатать это сообщение
   --version, -V - распечатать версию
 '''
@@ -15,8 +17,17 @@ pykumir [ОПЦИИ] файл.kum
 
 def main(argv):
     debug = False
+    opt_level = DEFAULT_OPT_LEVEL
 
     argv = argv[1:]
+    for arg in argv:
+        if arg.startswith('-O'):
+            if not arg[2:].isdigit():
+                print(HELP)
+                return
+            opt_level = int(arg[2:])
+    argv = [arg for arg in argv if not arg.startswith('-O')]
+
     if '--help' in argv or '-h' in argv:
         print(HELP)
         return
@@ -30,20 +41,40 @@ def main(argv):
     for file in argv:
         if file.endswith('.kum'):
             with open(file, encoding='utf-8') as f:
-                run_program(f.read(), debug)
+                run_program(f.read(), debug, opt_level)
+
+
+# вывод в терминал появляется не позже, чем через столько секунд
+TTY_FLUSH_INTERVAL = 0.1
+
+
+def _write(text: str) -> None:
+    # VM передаёт вывод большими кусками и перед вводом, поэтому его сразу должно быть видно
+    sys.stdout.write(text)
+    sys.stdout.flush()
 
 
-def run_program(code: str, debug: bool):
+def run_program(code: str, debug: bool, opt_level: int = DEFAULT_OPT_LEVEL):
     parser = Parser(code, debug)
     parsed = parser.parse()
     if debug:
         print(*parsed, sep='\n')
         print('-' * 40)
-    bc = build_bytecode(parsed)
+    bc = optimize(*build_bytecode(parsed), opt_level)
     if debug:
         pretty_print_bc(*bc)
         print('-' * 40)
-    vm = VM(bc[0], output_f=lambda s: print(s, end=''), input_f=input, algs=bc[1])
+    # ввод читается из `sys.stdin` большими кусками и разбивается на слова по мере надобности
+    input_reader = TokenReader(stream_lines(sys.stdin.buffer))
+    # в файл или канал вывод передаётся большими кусками, в терминал - ещё и по таймеру
+    flush_interval = TTY_FLUSH_INTERVAL if sys.stdout.isatty() else None
+    vm = VM(
+        bc[0],
+        output_f=_write,
+        algs=bc[1],
+        input_reader=input_reader,
+        output_flush_interval=flush_interval,
+    )
     vm.execute()
 
 
@@ -1,24 +1,52 @@
-from threading import Thread
+from threading import Event, Lock
 
-from PyQt6.QtCore import QEvent, Qt, pyqtSignal
-from PyQt6.QtGui import QTextCursor
+from PyQt6.QtCore import QEvent, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCharFormat, QTextCursor
 from PyQt6.QtWidgets import QTextEdit
 
 
+# как часто (в миллисекундах) накопленный вывод программы добавляется в консоль
+OUTPUT_INTERVAL_MS = 30
+# сколько последних строк хранит консоль, более старые удаляются
+DEFAULT_MAX_LINES = 10_000
+
+
+class InputCancelled(Exception):
+    """Ожидание ввода прервано, потому что программа остановлена."""
+
+
 class Console(QTextEdit):
-    output = pyqtSignal(str)
+    """
+    Консоль программы. Вывод программы (`write`) приходит из её потока и копится в очереди,
+    а в поток интерфейса переносится по таймеру одной вставкой обычного текста.
+    """
+
     output_sys = pyqtSignal(str)
     output_err = pyqtSignal(str)
 
-    def __init__(self, parent=None) -> None:
+    def __init__(self, parent=None, max_lines: int = DEFAULT_MAX_LINES) -> None:
+        """
+        :param max_lines: сколько последних строк хранить, `0` - без ограничения
+        """
         super().__init__(parent)
         self.setReadOnly(True)
+        self.max_lines = max_lines
+        # старые строки удаляются из начала документа, когда строк становится больше `max_lines`
+        self.document().setMaximumBlockCount(max_lines)
+
+        # вывод программы, ещё не добавленный в консоль
+        self.pending: list[str] = []
+        self.pending_lock = Lock()
+        self.output_timer = QTimer(self)
+        self.output_timer.timeout.connect(self._flush_output)
+        self.output_timer.start(OUTPUT_INTERVAL_MS)
 
-        self.input_completed = False
+        # устанавливается, когда ввод закончен (нажат Enter) или отменён
+        self.input_completed = Event()
+        self.input_cancelled = False
         self.input_text = ''
         self.inputting = False
 
-        self.output.connect(self._output)
         self.output_sys.connect(self._output_sys)
         self.output_err.connect(self._output_err)
 
@@ -28,7 +56,7 @@ class Console(QTextEdit):
             if e.type() == QEvent.Type.KeyPress:
                 if e.key() == Qt.Key.Key_Return:
                     self.inputting = False
-                    self.input_completed = True
+                    self.input_completed.set()
                 else:
                     self.input_text += e.text()
 
@@ -38,34 +66,63 @@ class Console(QTextEdit):
         self.setTextCursor(cursor)
 
     def _output_err(self, text: str) -> None:
+        self._flush_output()
         self._cursor_to_end()
         html_text = text.replace('\n', '<br />')
         self.insertHtml(f'<span style="color: red;">{html_text}</span>')
 
     def _output_sys(self, text: str) -> None:
+        self._flush_output()
         self._cursor_to_end()
         html_text = text.replace('\n', '<br />')
         self.insertHtml(f'<span style="font-style: italic; color: grey;">{html_text}</span>')
 
-    def _output(self, text: str) -> None:
-        self._cursor_to_end()
-        self.insertHtml(text)
+    def write(self, text: str) -> None:
+        """Добавляет вывод программы в очередь, можно вызывать из любого потока."""
+        with self.pending_lock:
+            self.pending.append(text)
 
-    def _wait_for_input(self):
-        while True:
-            if self.input_completed:
-                break
+    def _flush_output(self) -> None:
+        """Добавляет в консоль весь накопленный вывод программы (в потоке интерфейса)."""
+        with self.pending_lock:
+            if not self.pending:
+                return
+            text = ''.join(self.pending)
+            self.pending.clear()
+        if self.max_lines and text.count('\n') > self.max_lines:
+            # всё равно останутся только последние строки
+            text = '\n'.join(text.rsplit('\n', self.max_lines)[1:])
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        # обычный формат: иначе текст получит цвет и стиль сообщения, выведенного перед ним
+        cursor.insertText(text, QTextCharFormat())
+        self.setTextCursor(cursor)
 
     def input(self) -> str:
+        """
+        Вызывается из потока программы и ждёт, пока пользователь не нажмёт Enter (поток при этом спит).
+        :raise InputCancelled: ожидание отменено (`cancel_input`)
+        """
         self.inputting = True
         self.setReadOnly(False)
-        wait_for_input_t = Thread(target=self._wait_for_input)
-        wait_for_input_t.start()
-        wait_for_input_t.join()
+        self.input_completed.wait()
 
-        self.input_completed = False
+        self.input_completed.clear()
         self.inputting = False
         self.setReadOnly(True)
         input_text = self.input_text
         self.input_text = ''
+        if self.input_cancelled:
+            raise InputCancelled
         return input_text
+
+    def cancel_input(self) -> None:
+        """Отменяет ожидание ввода: программа, которая ждёт или начнёт ждать ввода, остановится."""
+        self.input_cancelled = True
+        self.input_completed.set()
+
+    def reset_input(self) -> None:
+        """Готовит консоль к вводу новой программы после `cancel_input`."""
+        self.input_cancelled = False
+        self.input_completed.clear()
+        self.input_text = ''
@@ -121,6 +121,7 @@ class MainWindow(QWidget):
                 event.ignore()
                 return
         if self.runner_thread is not None:
+            self.runner.stop()
             self.runner_thread.join()
         event.accept()
 
@@ -219,6 +220,8 @@ class MainWindow(QWidget):
 
     def run_code(self):
         if self.runner_thread is not None:
+            # предыдущая программа могла остаться ждать ввода
+            self.runner.stop()
             self.runner_thread.join()
 
         code = self.codeinput.toPlainText()
@@ -3,7 +3,10 @@ from datetime import datetime
 from PyQt6.QtCore import pyqtSignal
 from interpreter import code2bc, KumirException, SyntaxException, RuntimeException, VM
 
-from .console import Console
+from .console import Console, InputCancelled
+
+# вывод программы передаётся в консоль не позже, чем через столько секунд (таймер `OutputBuffer`)
+OUTPUT_FLUSH_INTERVAL = 0.05
 
 
 class Runner:
@@ -24,12 +27,17 @@ class Runner:
         self.cur_file = cur_file
 
     def _output(self, s: str):
-        self.console.output.emit(s)
+        self.console.write(s)
 
     def _input(self) -> str:
         return self.console.input()
 
+    def stop(self) -> None:
+        """Останавливает программу, если она ждёт ввода."""
+        self.console.cancel_input()
+
     def run(self, code: str):
+        self.console.reset_input()
         self.console.output_sys.emit(
             f'>> {datetime.now().strftime("%H:%M:%S")} - '
             f'{self.cur_file if self.cur_file is not None else "Новая программа"} - Начало выполнения\n'
@@ -51,11 +59,14 @@ class Runner:
                 **kwargs,
                 cur_dir=self.cur_dir,
                 cur_file=self.cur_file,
+                output_flush_interval=OUTPUT_FLUSH_INTERVAL,
             )
             try:
                 vm.execute()
             except KumirException as e:
                 self.on_error.emit(e)
+            except InputCancelled:
+                self.console.output_sys.emit('\n>> Выполнение прервано')
         self.console.output_sys.emit(
             f'\n>> {datetime.now().strftime("%H:%M:%S")} - Новая программа - Выполнение завершено\n'
         )
@@ -4,14 +4,30 @@ from .parser import Parser
 
 from .bytecode import BytecodeType
 from .exceptions import KumirException, SyntaxException, RuntimeException
+from .optimizer import DEFAULT_OPT_LEVEL, optimize
 from .vm import VM
 
-__all__ = ('build_bytecode', 'Parser', 'KumirException', 'SyntaxException', 'RuntimeException', 'VM', 'pretty_print_bc')
+__all__ = (
+    'build_bytecode',
+    'optimize',
+    'DEFAULT_OPT_LEVEL',
+    'Parser',
+    'KumirException',
+    'SyntaxException',
+    'RuntimeException',
+    'VM',
+    'pretty_print_bc',
+)
 
 
-def code2bc(code: str) -> tuple[list[BytecodeType], AlgsList]:
+def code2bc(code: str, opt_level: int = DEFAULT_OPT_LEVEL) -> tuple[list[BytecodeType], AlgsList]:
+    """
+    :param code: текст программы
+    :param opt_level: уровень оптимизации байт-кода, `0` - без оптимизаций
+    :return: байт-код программы и словарь алгоритмов
+    """
     p = Parser(code)
-    return build_bytecode(p.parse())
+    return optimize(*build_bytecode(p.parse()), opt_level)
 
 
 def pretty_print_bc(bc: list[BytecodeType], algs: AlgsList) -> None:
@@ -28,9 +44,7 @@ def pretty_print_bc(bc: list[BytecodeType], algs: AlgsList) -> None:
     for inst in bc:
         print(f'{inst[0]:2}  {inst[1].name:20} {inst[2]}')
     for name, alg in algs.items():
-        args = ', '.join(' '.join(arg) for arg in alg[0])
+        args = ', '.join(' '.join(arg) for arg in alg.args)
         print(f'{name!r} ({args}):')
-        tags = alg[2][1]
-        for i, inst in enumerate(alg[2][0]):
-            cur_tags = [str(index) for index, tag in enumerate(tags) if tag == i]
-            print(f'    {",".join(cur_tags) + (":" if cur_tags else ""):4}{inst[0]:2}  {inst[1].name:20} {inst[2]}')
+        for i, inst in enumerate(alg.code):
+            print(f'    {i:3}  {inst[0]:2}  {inst[1].name:20} {inst[2]}')
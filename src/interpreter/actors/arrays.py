@@ -0,0 +1,243 @@
+import itertools
+import operator
+
+from .base import Actor, KumirFunc, KumirValue, KumirRuntimeException
+from ..table import NumpyTable, numpy
+
+
+# операция: функция над числами и имя функции NumPy
+_OPS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+_NUMPY_OPS = {'+': 'add', '-': 'subtract', '*': 'multiply', '/': 'true_divide'}
+# наибольшее число, которое помещается в элемент массива NumPy `цел`
+_INT64_MAX = 2**63 - 1
+
+
+def _is_numpy(*tables: KumirValue) -> bool:
+    """
+    :return: хранятся ли элементы всех таблиц в массивах NumPy (иначе используются списки значений)
+    """
+    return all(isinstance(t.value, NumpyTable) for t in tables)
+
+
+def _check_defined(*tables: KumirValue) -> None:
+    """
+    Проверяет, что значения всех элементов таблиц NumPy определены.
+    """
+    for t in tables:
+        if not t.value.defined.all():
+            raise KumirRuntimeException(-1, 'значение элемента таблицы не определено')
+
+
+def _check_numbers(*tables: KumirValue) -> None:
+    for t in tables:
+        if t.value.typename not in ('цел', 'вещ'):
+            raise KumirRuntimeException(-1, 'таблица должна быть числовой')
+
+
+def _check_same_shape(*tables: KumirValue) -> None:
+    if len({t.value.shape for t in tables}) > 1:
+        raise KumirRuntimeException(-1, 'размеры таблиц не совпадают')
+
+
+def _check_not_empty(table: KumirValue) -> None:
+    if 0 in table.value.shape:
+        raise KumirRuntimeException(-1, 'таблица пуста')
+
+
+def _max_abs(table: KumirValue) -> int:
+    """
+    :return: наибольший модуль элемента таблицы NumPy `цел`, `0` - таблица пуста
+    """
+    array = table.value.array
+    if not array.size:
+        return 0
+    return max(-int(array.min()), int(array.max()))
+
+
+def _int_arrays(bound: int, *tables: KumirValue) -> tuple:
+    """
+    Числа в массивах NumPy `цел` занимают 64 бита и при переполнении молча теряют старшие биты,
+    а `цел` в КуМире не ограничен.
+    :param bound: оценка сверху модуля результата операции и всех промежуточных значений
+    :return: массивы таблиц; если результат может не поместиться в 64 бита - их копии с числами Python
+    """
+    arrays = tuple(t.value.array for t in tables)
+    if bound <= _INT64_MAX:
+        return arrays
+    return tuple(array.astype(object) for array in arrays)
+
+
+def _number(typename: str, x) -> KumirValue:
+    """
+    :param x: число Python или NumPy
+    :return: значение `цел` или `вещ`
+    """
+    return KumirValue(typename, int(x) if typename == 'цел' else float(x))
+
+
+def _result_type(left: KumirValue, right: KumirValue, op: str) -> str:
+    """
+    :return: тип элементов результата поэлементной операции, правила те же, что и у операций над числами
+    """
+    if op == '/' or 'вещ' in (left.value.typename, right.value.typename):
+        return 'вещ'
+    return 'цел'
+
+
+class Arrays(Actor):
+    """
+    Операции сразу над всей таблицей. Когда исполнитель подключён, новые таблицы `цел` и `вещ`
+    хранятся в массивах NumPy, если он установлен, иначе операции выполняются над списками значений.
+    """
+
+    numpy_tables = True
+
+    @staticmethod
+    def _fill(args: list[KumirValue]) -> None:
+        t, x = args
+        _check_numbers(t)
+        if t.value.typename == 'цел' and x.typename != 'цел':
+            raise KumirRuntimeException(-1, f'нельзя "цел := {x.typename}"')
+        if _is_numpy(t):
+            t.value.unshare()
+            try:
+                t.value.array.fill(x.value)
+            except OverflowError:
+                t.value.widen()
+                t.value.array.fill(x.value)
+            t.value.defined.fill(True)
+        else:
+            t.value.assign(-1, itertools.repeat(x.value))
+
+    @staticmethod
+    def _sum(args: list[KumirValue]) -> KumirValue:
+        t = args[0]
+        _check_numbers(t)
+        if _is_numpy(t):
+            _check_defined(t)
+            if t.value.typename == 'цел':
+                (array,) = _int_arrays(_max_abs(t) * t.value.array.size, t)
+                return _number(t.value.typename, array.sum())
+            return _number(t.value.typename, t.value.array.sum())
+        return _number(t.value.typename, sum(t.value.to_list(-1)))
+
+    @staticmethod
+    def _min(args: list[KumirValue]) -> KumirValue:
+        t = args[0]
+        _check_numbers(t)
+        _check_not_empty(t)
+        if _is_numpy(t):
+            _check_defined(t)
+            return _number(t.value.typename, t.value.array.min())
+        return _number(t.value.typename, min(t.value.to_list(-1)))
+
+    @staticmethod
+    def _max(args: list[KumirValue]) -> KumirValue:
+        t = args[0]
+        _check_numbers(t)
+        _check_not_empty(t)
+        if _is_numpy(t):
+            _check_defined(t)
+            return _number(t.value.typename, t.value.array.max())
+        return _number(t.value.typename, max(t.value.to_list(-1)))
+
+    @staticmethod
+    def _dot(args: list[KumirValue]) -> KumirValue:
+        a, b = args
+        _check_numbers(a, b)
+        _check_same_shape(a, b)
+        typename = _result_type(a, b, '*')
+        if _is_numpy(a, b):
+            _check_defined(a, b)
+            if typename == 'цел':
+                arrays = _int_arrays(_max_abs(a) * _max_abs(b) * a.value.array.size, a, b)
+                return _number(typename, numpy.vdot(*arrays))
+            return _number(typename, numpy.vdot(a.value.array, b.value.array))
+        return _number(typename, sum(map(operator.mul, a.value.to_list(-1), b.value.to_list(-1))))
+
+    @staticmethod
+    def _sort(args: list[KumirValue]) -> None:
+        t = args[0]
+        if t.value.dims != 1:
+            raise KumirRuntimeException(-1, 'таблица должна быть одномерной')
+        if _is_numpy(t):
+            _check_defined(t)
+            t.value.unshare()
+            t.value.array.sort()
+        else:
+            t.value.assign(-1, sorted(t.value.to_list(-1)))
+
+    @staticmethod
+    def _cumsum(args: list[KumirValue]) -> None:
+        t = args[0]
+        _check_numbers(t)
+        if _is_numpy(t):
+            _check_defined(t)
+            t.value.unshare()
+            if t.value.typename == 'цел' and _max_abs(t) * t.value.array.size > _INT64_MAX:
+                t.value.widen()
+            numpy.cumsum(t.value.array, out=t.value.array.reshape(-1))
+        else:
+            t.value.assign(-1, itertools.accumulate(t.value.to_list(-1)))
+
+    @staticmethod
+    def _elementwise(op: str, args: list[KumirValue]) -> None:
+        """
+        Записывает в третью таблицу результат операции `op` над элементами первых двух.
+        """
+        a, b, res = args
+        _check_numbers(a, b, res)
+        _check_same_shape(a, b, res)
+        typename = _result_type(a, b, op)
+        if res.value.typename != typename:
+            raise KumirRuntimeException(-1, f'нельзя "{res.value.typename} := {typename}"')
+        if _is_numpy(a, b, res):
+            _check_defined(a, b)
+            if op == '/' and not b.value.array.all():
+                raise KumirRuntimeException(-1, 'деление на ноль')
+            arrays = a.value.array, b.value.array
+            if typename == 'цел':
+                a_max, b_max = _max_abs(a), _max_abs(b)
+                arrays = _int_arrays(a_max * b_max if op == '*' else a_max + b_max, a, b)
+            res.value.unshare()
+            if object in (arrays[0].dtype, arrays[1].dtype):
+                # в одной из таблиц числа больше 64 бит или могут получиться в результате
+                res.value.widen()
+            getattr(numpy, _NUMPY_OPS[op])(*arrays, out=res.value.array)
+            res.value.defined.fill(True)
+        else:
+            a_values, b_values = a.value.to_list(-1), b.value.to_list(-1)
+            if op == '/' and 0 in b_values:
+                raise KumirRuntimeException(-1, 'деление на ноль')
+            res.value.assign(-1, map(_OPS[op], a_values, b_values))
+
+    @staticmethod
+    def _add(args: list[KumirValue]) -> None:
+        Arrays._elementwise('+', args)
+
+    @staticmethod
+    def _sub(args: list[KumirValue]) -> None:
+        Arrays._elementwise('-', args)
+
+    @staticmethod
+    def _mul(args: list[KumirValue]) -> None:
+        Arrays._elementwise('*', args)
+
+    @staticmethod
+    def _div(args: list[KumirValue]) -> None:
+        Arrays._elementwise('/', args)
+
+    # `таб` - таблица любого типа, `число` - `цел` или `вещ` (у значения - `вещ`, если среди таблиц есть `вещтаб`)
+    funcs = {
+        'заполнить': KumirFunc(_fill, '', [('аргрез', 'таб', 'таблица'), ('арг', 'число', 'значение')]),
+        'сумма': KumirFunc(_sum, 'число', [('арг', 'таб', 'таблица')]),
+        'минимум': KumirFunc(_min, 'число', [('арг', 'таб', 'таблица')]),
+        'максимум': KumirFunc(_max, 'число', [('арг', 'таб', 'таблица')]),
+        'скалярное произведение': KumirFunc(_dot, 'число', [('арг', 'таб', 'а'), ('арг', 'таб', 'б')]),
+        'упорядочить': KumirFunc(_sort, '', [('аргрез', 'таб', 'таблица')]),
+        'накопить суммы': KumirFunc(_cumsum, '', [('аргрез', 'таб', 'таблица')]),
+        'сложить': KumirFunc(_add, '', [('арг', 'таб', 'а'), ('арг', 'таб', 'б'), ('аргрез', 'таб', 'результат')]),
+        'вычесть': KumirFunc(_sub, '', [('арг', 'таб', 'а'), ('арг', 'таб', 'б'), ('аргрез', 'таб', 'результат')]),
+        'умножить': KumirFunc(_mul, '', [('арг', 'таб', 'а'), ('арг', 'таб', 'б'), ('аргрез', 'таб', 'результат')]),
+        'разделить': KumirFunc(_div, '', [('арг', 'таб', 'а'), ('арг', 'таб', 'б'), ('аргрез', 'таб', 'результат')]),
+    }
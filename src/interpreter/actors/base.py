@@ -22,8 +22,12 @@ class KumirFunc:
     ret_type: str = ''
     #                kind,type,name
     args: list[tuple[str, str, str]] = field(default_factory=list)
+    # дополнительные именованные аргументы `py_func`, их значения берутся из VM: `work_dir`, `prog_dir`
+    extra_args: tuple[str, ...] = ()
 
 
 class Actor:
     vars: dict[str, tuple[str, KumirValue]] = {}
     funcs: dict[str, KumirFunc] = {}
+    # после подключения исполнителя таблицы `цел` и `вещ` хранятся в массивах NumPy (если он установлен)
+    numpy_tables: bool = False
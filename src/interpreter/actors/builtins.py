@@ -139,7 +139,7 @@ class Builtins(Actor):
     def _to_bool(args: list[KumirValue]) -> KumirValue:
         s, default = args[0].value, args[1]
         if s in ('да', 'нет'):
-            return KumirValue('лог', s)
+            return KumirValue('лог', s == 'да')
         else:
             return default
 
@@ -175,20 +175,20 @@ class Builtins(Actor):
     def _str_to_float(args: list[KumirValue]) -> KumirNamespace:
         try:
             res = float(args[0].value)
-            done = 'да'
+            done = True
         except ValueError:
             res = 0.0
-            done = 'нет'
+            done = False
         return {'знач': KumirValue('вещ', res), 'успех': KumirValue('лог', done)}
 
     @staticmethod
     def _str_to_int(args: list[KumirValue]) -> KumirNamespace:
         try:
             res = int(args[0].value)
-            done = 'да'
+            done = True
         except ValueError:
             res = 0.0
-            done = 'нет'
+            done = False
         return {'знач': KumirValue('цел', res), 'успех': KumirValue('лог', done)}
 
     @staticmethod
@@ -2,6 +2,7 @@ import os
 import shutil
 
 from .base import Actor, KumirFunc, KumirValue, KumirRuntimeException
+from ..token_reader import file_reader, reset_file_reader
 
 
 class Files(Actor):
@@ -30,31 +31,37 @@ class Files(Actor):
 
     @staticmethod
     def _has_data(args: list[KumirValue]) -> KumirValue:
-        b = Files._is_end(args).value
-        return KumirValue('лог', 'нет' if b == 'да' else 'да')
+        f = args[0].value
+        if not f.readable():
+            return KumirValue('лог', not Files._is_end(args).value)
+        # строки, прочитанные заранее, остаются в буфере `ввод`
+        return KumirValue('лог', file_reader(f).has_data())
 
     @staticmethod
     def _start_reading(args: list[KumirValue]) -> None:
         args[0].value.seek(0)
+        reset_file_reader(args[0].value)
 
     @staticmethod
     def _is_end(args: list[KumirValue]) -> KumirValue:
         f = args[0].value
-        return KumirValue('лог', 'да' if f.tell() == os.fstat(f.fileno()).st_size else 'нет')
+        if not f.readable():
+            return KumirValue('лог', f.tell() == os.fstat(f.fileno()).st_size)
+        return KumirValue('лог', file_reader(f).at_end())
 
     @staticmethod
     def _can_read(args: list[KumirValue]) -> KumirValue:
         f = args[0].value
-        return KumirValue('лог', 'да' if os.path.exists(f) and os.access(f, os.R_OK) else 'нет')
+        return KumirValue('лог', os.path.exists(f) and os.access(f, os.R_OK))
 
     @staticmethod
     def _can_write(args: list[KumirValue]) -> KumirValue:
         f = args[0].value
-        return KumirValue('лог', 'да' if os.path.exists(f) and os.access(f, os.W_OK) else 'нет')
+        return KumirValue('лог', os.path.exists(f) and os.access(f, os.W_OK))
 
     @staticmethod
     def _exists(args: list[KumirValue]) -> KumirValue:
-        return KumirValue('лог', 'да' if os.path.exists(args[0].value) else 'нет')
+        return KumirValue('лог', os.path.exists(args[0].value))
 
     @staticmethod
     def _mkdir(args: list[KumirValue], work_dir: str) -> KumirValue:
@@ -65,13 +72,13 @@ class Files(Actor):
             else:
                 os.mkdir(os.path.join(work_dir, path))
         except (PermissionError, FileExistsError, FileNotFoundError):
-            return KumirValue('лог', 'нет')
+            return KumirValue('лог', False)
         else:
-            return KumirValue('лог', 'да')
+            return KumirValue('лог', True)
 
     @staticmethod
     def _is_dir(args: list[KumirValue]) -> KumirValue:
-        return KumirValue('лог', 'да' if os.path.isdir(args[0].value) else 'нет')
+        return KumirValue('лог', os.path.isdir(args[0].value))
 
     @staticmethod
     def _open_for_adding(args: list[KumirValue]) -> KumirValue:
@@ -94,18 +101,18 @@ class Files(Actor):
         try:
             os.remove(args[0].value)
         except (PermissionError, OSError, FileNotFoundError):
-            return KumirValue('лог', 'нет')
+            return KumirValue('лог', False)
         else:
-            return KumirValue('лог', 'да')
+            return KumirValue('лог', True)
 
     @staticmethod
     def _rm_dir(args: list[KumirValue]) -> KumirValue:
         try:
             shutil.rmtree(args[0].value)
         except (PermissionError, OSError, FileNotFoundError):
-            return KumirValue('лог', 'нет')
+            return KumirValue('лог', False)
         else:
-            return KumirValue('лог', 'да')
+            return KumirValue('лог', True)
 
     @staticmethod
     def _set_encoding(args: list[KumirValue]) -> None:
@@ -133,15 +140,15 @@ class Files(Actor):
         'можно открыть на чтение': KumirFunc(_can_read, 'лог', [('арг', 'лит', 'имя файла')]),
         'можно открыть на запись': KumirFunc(_can_write, 'лог', [('арг', 'лит', 'имя файла')]),
         'существует': KumirFunc(_exists, 'лог', [('арг', 'лит', 'имя')]),
-        'создать каталог': KumirFunc(_mkdir, 'лог', [('арг', 'лит', 'имя каталога')]),
+        'создать каталог': KumirFunc(_mkdir, 'лог', [('арг', 'лит', 'имя каталога')], ('work_dir',)),
         'является каталогом': KumirFunc(_is_dir, 'лог', [('арг', 'лит', 'имя')]),
         'открыть на добавление': KumirFunc(_open_for_adding, 'файл', [('арг', 'лит', 'имя файла')]),
         'открыть на запись': KumirFunc(_open_for_writing, 'файл', [('арг', 'лит', 'имя файла')]),
         'открыть на чтение': KumirFunc(_open_for_reading, 'файл', [('арг', 'лит', 'имя файла')]),
-        'полный путь': KumirFunc(_full_path, 'лит', [('арг', 'лит', 'имя')]),
+        'полный путь': KumirFunc(_full_path, 'лит', [('арг', 'лит', 'имя')], ('work_dir',)),
         'удалить_файл': KumirFunc(_rm_file, 'лог', [('арг', 'лит', 'имя файла')]),
         'удалить_каталог': KumirFunc(_rm_dir, 'лог', [('арг', 'лит', 'имя каталога')]),
         'установить кодировку': KumirFunc(_set_encoding, '', [('арг', 'файл', 'имя файла')]),
-        'РАБОЧИЙ КАТАЛОГ': KumirFunc(_work_dir, 'лит', []),
-        'КАТАЛОГ ПРОГРАММЫ': KumirFunc(_prog_dir, 'лит', []),
+        'РАБОЧИЙ КАТАЛОГ': KumirFunc(_work_dir, 'лит', [], ('work_dir',)),
+        'КАТАЛОГ ПРОГРАММЫ': KumirFunc(_prog_dir, 'лит', [], ('prog_dir',)),
     }
@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+
+from .bytecode import BytecodeType
+
+
+@dataclass(slots=True)
+class Algorithm:
+    """Алгоритм программы: заголовок, байт-код и ячейки локальных величин."""
+
+    name: str
+    # (вид, тип, имя) для каждого параметра, параметры занимают первые ячейки локальных величин
+    args: list[tuple[str, str, str]]
+    # тип значения, `''` - алгоритм не возвращает значение (его ячейка `знач` идёт сразу за параметрами)
+    ret_type: str = ''
+    code: list[BytecodeType] = field(default_factory=list)
+    # (имя, тип) для каждой ячейки локальных величин
+    locals: list[tuple[str, str]] = field(default_factory=list)
+
+    # Номера ячеек параметров по видам, вычисляются по `args` один раз при создании алгоритма
+    # значения передаются при вызове (`арг` и `аргрез`)
+    in_slots: tuple[int, ...] = field(init=False)
+    # значения записываются в величины вызывающего после возврата (`рез` и `аргрез`)
+    res_slots: tuple[int, ...] = field(init=False)
+    # присваивать нельзя (`арг`)
+    read_only: frozenset[int] = field(init=False)
+    # таблицы `арг`: алгоритм получает копию таблицы, которая копируется только при первом изменении
+    shared_slots: tuple[int, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.in_slots = tuple(slot for slot, arg in enumerate(self.args) if is_input_arg(arg))
+        self.res_slots = tuple(slot for slot, arg in enumerate(self.args) if 'рез' in arg[0])
+        self.read_only = frozenset(slot for slot, arg in enumerate(self.args) if arg[0] == 'арг')
+        self.shared_slots = tuple(
+            slot for slot, arg in enumerate(self.args) if arg[0] == 'арг' and arg[1].endswith('таб')
+        )
+
+
+def is_input_arg(arg: tuple[str, str, str]) -> bool:
+    """
+    :param arg: (вид, тип, имя) параметра
+    :return: передаётся ли значение аргумента при вызове: у `арг` и `аргрез` - всегда,
+             у `рез` - только у таблиц (алгоритм заполняет таблицу вызывающего)
+    """
+    return arg[0] != 'рез' or arg[1].endswith('таб')
@@ -1,6 +1,8 @@
 from collections.abc import Callable
 
 from .actors import actors
+from .actors.base import KumirFunc
+from .algorithm import Algorithm, is_input_arg
 from .ast_classes import (
     StoreVar,
     Output,
@@ -30,40 +32,98 @@ from .ast_classes import (
     Slice,
     Use,
 )
-from .bytecode import Bytecode, BytecodeType
+from .bytecode import Bytecode, BytecodeType, Scope
 from .constants import AlgsList
 from .exceptions import RuntimeException
-from .value import Value
+from .type_inference import arg_type_matches, bin_op_type, item_type, ret_type, unary_op_type
+from .value import Value, bool_value
+
+# Инструкции перехода, первый аргумент у них - метка (после компоновки - индекс инструкции)
+JUMPS = {
+    Bytecode.JUMP,
+    Bytecode.JUMP_IF_FALSE,
+    Bytecode.JUMP_IF_TRUE,
+    Bytecode.JUMP_IF_FALSE_OR_POP,
+    Bytecode.JUMP_IF_TRUE_OR_POP,
+    Bytecode.SWITCH,
+    Bytecode.COMPARE_AND_JUMP,
+    Bytecode.FOR_RANGE_INIT,
+    Bytecode.FOR_RANGE_NEXT,
+    Bytecode.REPEAT_INIT,
+    Bytecode.REPEAT_NEXT,
+}
+
+# инструкции вызова алгоритма
+_CALLS = (Bytecode.CALL, Bytecode.CALL_NATIVE)
+
 
 def build_bytecode(parsed_code: list) -> tuple[list[BytecodeType], AlgsList]:
     builder = BytecodeBuilder()
     return builder.build(parsed_code)
 
 
+class Names:
+    """Имена величин одной области видимости и номера их ячеек."""
+
+    def __init__(self) -> None:
+        self.slots: dict[str, int] = {}
+        # (имя, тип) для каждой ячейки
+        self.vars: list[tuple[str, str]] = []
+
+    def declare(self, name: str, typename: str) -> int:
+        """
+        Объявляет величину, повторное объявление меняет тип уже существующей ячейки.
+        :return: номер ячейки
+        """
+        if name in self.slots:
+            slot = self.slots[name]
+            self.vars[slot] = (name, typename)
+        else:
+            slot = len(self.vars)
+            self.slots[name] = slot
+            self.vars.append((name, typename))
+        return slot
+
+    def get(self, name: str) -> tuple[int, str] | None:
+        """
+        :return: номер ячейки и тип величины или `None`, если имя не объявлено
+        """
+        slot = self.slots.get(name)
+        if slot is None:
+            return None
+        return slot, self.vars[slot][1]
+
+
 class BytecodeBuilder:
     """Преобразует АСД в байт-код."""
 
     def __init__(self) -> None:
         self.bytecode: list[BytecodeType] = []
         self.algs: AlgsList = {}
-        self.cur_tags: list[int] = []
         self.cur_alg: str | None = None
-        self.cur_inst_n = 0
         self.cur_ns: list[BytecodeType] = []
 
         self.main_alg: str | None = None
         self.last_line = 0
 
-        self._actors = {'__builtins__', 'Файлы'}
-
-        self.loops_with_count_indexes: list[int] = []
-        self.loops_while_indexes: list[int] = []
+        # подключённые исполнители в порядке `использовать`
+        self._actors = ['__builtins__', 'Файлы']
+
+        self.glob_names = Names()
+        self.local_names: Names | None = None
+
+        self.labels_n = 0
+        # Метки (`иначе`, конец) текущих конструкций `если`
+        self.ifs: list[tuple[int, int]] = []
+        self.ifs_with_else: set[int] = set()
+        # Метки (начало тела, конец) текущих циклов, последний - самый вложенный
+        self.loops: list[tuple[int, int]] = []
+        # Номера циклов `нц N раз` и `нц для` (по ним VM хранит счётчики в кадре)
+        self.counted_loops_n = 0
+        self.loops_with_count: list[int] = []
         self.loops_while_stmts: list[Expr] = []
-        self.loops_for_indexes: list[int] = []
-        self.loops_for: list[tuple[str, Expr, Expr, Expr]] = []
-        self.loops_until_indexes: list[int] = []
-        self.ifs: list[int] = []
-        self.tags: dict[int, list[int]] = {}
+        # (область видимости, номер ячейки переменной цикла, номер цикла) для циклов `нц для`
+        self.loops_for: list[tuple[Scope, int, int]] = []
 
         self.HANDLERS: dict[type[Statement], Callable[[Statement], None]] = {
             Use: self._handle_use,
@@ -90,30 +150,108 @@ class BytecodeBuilder:
             SetItem: self._handle_set_item,
         }
 
-    def build(self, parsed_code: list[Statement]) -> tuple[list[BytecodeType], dict]:
-        self.tags, self.algs = _get_all_statements_tags_and_algs(parsed_code)
+    def build(self, parsed_code: list[Statement]) -> tuple[list[BytecodeType], AlgsList]:
+        self.algs = _get_all_algs(parsed_code)
 
-        self.bytecode.append((0, Bytecode.USE, ('__builtins__',)))
-        self.bytecode.append((0, Bytecode.USE, ('Файлы',)))
-        self.cur_inst_n += 2
-        for i, stmt in enumerate(parsed_code):
+        self.bytecode.append((0, Bytecode.LOAD_CONST, (Value('лит', '\n'),)))
+        self.bytecode.append((0, Bytecode.STORE_GLOBAL, (self.glob_names.declare('нс', 'лит'), 'лит')))
+        self.bytecode.append(self._use_bc(0, '__builtins__'))
+        self.bytecode.append(self._use_bc(0, 'Файлы'))
+        for stmt in parsed_code:
             if self.cur_alg is not None:
-                self.cur_ns = self.algs[self.cur_alg][2][0]
+                self.cur_ns = self.algs[self.cur_alg].code
             else:
                 self.cur_ns = self.bytecode
 
             self.HANDLERS[type(stmt)](stmt)
 
         if self.main_alg is not None:
-            self.bytecode.append((self.last_line, Bytecode.CALL, (self.main_alg, 0)))
+            self.bytecode.append((self.last_line, Bytecode.CALL, (self.main_alg, ())))
 
+        self.bytecode[:] = link(self.bytecode)
+        self.bytecode.insert(0, (0, Bytecode.GLOBALS, tuple(self.glob_names.vars)))
         return self.bytecode, self.algs
 
+    def _new_label(self) -> int:
+        self.labels_n += 1
+        return self.labels_n
+
     def _handle_use(self, stmt: Use) -> None:
         name = stmt.name
         if name not in self._actors:
-            self.bytecode.append((stmt.lineno, Bytecode.USE, (name,)))
-            self._actors.add(name)
+            self.bytecode.append(self._use_bc(stmt.lineno, name))
+            self._actors.append(name)
+
+    def _use_bc(self, lineno: int, actor_name: str) -> BytecodeType:
+        """
+        Объявляет глобальные величины исполнителя.
+        :return: инструкция `USE` с номерами ячеек величин исполнителя
+        """
+        actor_vars = actors[actor_name].vars if actor_name in actors else {}
+        slots = tuple((name, self.glob_names.declare(name, var[0])) for name, var in actor_vars.items())
+        return lineno, Bytecode.USE, (actor_name, slots)
+
+    def _resolve(self, name: str) -> tuple[Scope, int, str] | None:
+        """
+        :return: область видимости, номер ячейки и тип величины или `None`, если имя не объявлено
+        """
+        if self.local_names is not None:
+            var = self.local_names.get(name)
+            if var is not None:
+                return Scope.LOCAL, *var
+        var = self.glob_names.get(name)
+        if var is not None:
+            return Scope.GLOBAL, *var
+        return None
+
+    def _declare(self, name: str, typename: str) -> tuple[Scope, int]:
+        """Объявляет величину в текущей области видимости."""
+        if self.local_names is not None:
+            return Scope.LOCAL, self.local_names.declare(name, typename)
+        return Scope.GLOBAL, self.glob_names.declare(name, typename)
+
+    def _load_bc(self, lineno: int, name: str) -> BytecodeType:
+        """
+        :return: загрузка величины, вызов алгоритма без аргументов или ошибка, если имя не определено
+        """
+        var = self._resolve(name)
+        if var is None:
+            alg = self._find_alg(name)
+            if alg is not None:
+                _check_args_n(lineno, alg, 0)
+                return self._call_inst(lineno, name, (), True)
+            return lineno, Bytecode.NAME_ERROR, (name,)
+        if var[2] == 'лит':
+            return lineno, Bytecode.LOAD_STR, var[:2]
+        if var[0] == Scope.LOCAL:
+            return lineno, Bytecode.LOAD_LOCAL, (var[1],)
+        return lineno, Bytecode.LOAD_GLOBAL, (var[1],)
+
+    def _store_bc(self, lineno: int, name: str, typename: str | None = None) -> BytecodeType:
+        """
+        :param typename: тип, если величину нужно объявить, `None` - сохранение в уже объявленную величину
+        """
+        if typename is not None:
+            scope, slot = self._declare(name, typename)
+        else:
+            var = self._resolve(name)
+            if var is None:
+                return lineno, Bytecode.NAME_ERROR, (name,)
+            scope, slot, typename = var
+            self._check_writable(lineno, scope, slot)
+        if scope == Scope.LOCAL:
+            return lineno, Bytecode.STORE_LOCAL, (slot, typename)
+        return lineno, Bytecode.STORE_GLOBAL, (slot, typename)
+
+    def _check_writable(self, lineno: int, scope: Scope, slot: int) -> None:
+        """
+        Присваивать параметрам `арг` текущего алгоритма нельзя. Переменной текущего цикла `нц для` тоже:
+        цикл идёт по своему счётчику и в начале каждого шага записывает его значение в переменную.
+        """
+        if scope == Scope.LOCAL and slot in self.algs[self.cur_alg].read_only:
+            raise RuntimeException(lineno, 'нельзя присвоить аргументу')
+        if any(loop[:2] == (scope, slot) for loop in self.loops_for):
+            raise RuntimeException(lineno, 'нельзя присвоить переменной цикла')
 
     def _handle_store_var(self, stmt: StoreVar) -> None:
         if stmt.typename is not None and 'таб' in stmt.typename:
@@ -122,291 +260,497 @@ class BytecodeBuilder:
                     self.cur_ns.extend(self._expr_bc(stmt.lineno, indexes[0]))
                     self.cur_ns.extend(self._expr_bc(stmt.lineno, indexes[1]))
                 self.cur_ns.append((stmt.lineno, Bytecode.MAKE_TABLE, (stmt.typename, len(value))))
-                self.cur_ns.append((stmt.lineno, Bytecode.STORE, (stmt.typename, name)))
-                self.cur_inst_n += 2
+                self.cur_ns.append(self._store_bc(stmt.lineno, name, stmt.typename))
             return
         elif stmt.value is not None:
-            self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.value))
-        else:
+            if stmt.typename is None and self._append_str_bc(stmt):
+                return
+            value_bc, value_type = self._typed_expr_bc(stmt.lineno, stmt.value)
+            self.cur_ns.extend(value_bc)
+            store = self._store_bc(stmt.lineno, stmt.names[0], stmt.typename)
+            if store[1] != Bytecode.NAME_ERROR:
+                _check_value_type(stmt.lineno, store[2][1], value_type)
+            self.cur_ns.append(store)
+            return
+        for name in stmt.names:  # объявление без значения (`цел а, б`)
             self.cur_ns.append((stmt.lineno, Bytecode.LOAD_CONST, (None,)))
-            self.cur_inst_n += 1
-        self.cur_ns.append((stmt.lineno, Bytecode.STORE, (stmt.typename, stmt.names)))
-        self.cur_inst_n += 1
+            self.cur_ns.append(self._store_bc(stmt.lineno, name, stmt.typename))
+
+    def _append_str_bc(self, stmt: StoreVar) -> bool:
+        """
+        Заменяет `с := с + х` (`с` - величина `лит`) дописыванием `х` в буфер величины.
+        :return: `True`, если байт-код построен
+        """
+        expr, name = stmt.value, stmt.names[0]
+        if not (
+            len(expr) > 2
+            and isinstance(expr[0], Value)
+            and expr[0].typename == 'get-name'
+            and expr[0].value == name
+            and isinstance(expr[-1], Op)
+            and expr[-1].op == '+'
+            and not expr[-1].unary
+            and _is_single_expr(expr[1:-1])
+        ):
+            return False
+        var = self._resolve(name)
+        if var is None or var[2] != 'лит':
+            return False
+        value_bc, value_type = self._typed_expr_bc(stmt.lineno, expr[1:-1])
+        # вызов алгоритма может сам изменить величину, тогда её нужно загрузить до вызова
+        if value_type not in ('лит', 'сим') or any(inst[1] in _CALLS for inst in value_bc):
+            return False
+        self._check_writable(stmt.lineno, *var[:2])
+        self.cur_ns.extend(value_bc)
+        self.cur_ns.append((stmt.lineno, Bytecode.APPEND_STR, var[:2]))
+        return True
 
     def _handle_output(self, stmt: Output) -> None:
         for expr in stmt.exprs:
             self.cur_ns.extend(self._expr_bc(stmt.lineno, expr))
         self.cur_ns.append((stmt.lineno, Bytecode.OUTPUT, (len(stmt.exprs),)))
-        self.cur_inst_n += 1
 
     def _handle_input(self, stmt: Input) -> None:
         targets = []
         for target in stmt.targets:
             if isinstance(target, str):
-                targets.append(target)
-            elif isinstance(target, GetItem):
+                name, indexes_n = target, 0
+            else:
                 for index in target.indexes:
                     self.cur_ns.extend(self._expr_bc(stmt.lineno, index))
-                targets.append((target.table_name, len(target.indexes)))
+                name, indexes_n = target.table_name, len(target.indexes)
+            var = self._resolve(name)
+            if var is None:
+                targets.append((None, name, None, indexes_n))
+            else:
+                self._check_writable(stmt.lineno, *var[:2])
+                targets.append((*var, indexes_n))
         self.cur_ns.append((stmt.lineno, Bytecode.INPUT, tuple(targets)))
-        self.cur_inst_n += 1
 
     def _handle_alg_start(self, stmt: AlgStart) -> None:
         self.cur_alg = stmt.name
         if stmt.is_main:
             self.main_alg = stmt.name
-        self.cur_inst_n = 0
+        # аргументы занимают первые ячейки, следом за ними - `знач`
+        self.local_names = Names()
+        for arg in stmt.args:
+            self.local_names.declare(arg[2], arg[1])
+        if stmt.ret_type:
+            self.local_names.declare('знач', stmt.ret_type)
 
     def _handle_alg_end(self, stmt: AlgEnd) -> None:
         self.cur_ns.append((stmt.lineno, Bytecode.RET, ()))
-        self.cur_inst_n += 1
-        self.algs[self.cur_alg][2][1] = self.cur_tags[:]
-        self.cur_tags.clear()
+        self.cur_ns[:] = link(self.cur_ns)
+        self.algs[self.cur_alg].locals = self.local_names.vars
         self.cur_alg = None
+        self.local_names = None
 
     def _handle_call(self, stmt: Call) -> None:
-        res_var_setted = False
-        if stmt.alg_name in self.algs:
-            alg = self.algs[stmt.alg_name]
-        else:
-            for actor in self._actors:
-                if stmt.alg_name in actors[actor].funcs.keys():
-                    kf = actors[actor].funcs[stmt.alg_name]
-                    alg = (kf.args, kf.ret_type, [[], []])
-                    break
-            else:
-                raise RuntimeException(stmt.lineno, f'имя "{stmt.alg_name}" не определено')
-        for arg, arg_sign in zip(stmt.args, alg[0]):
+        self.cur_ns.extend(self._call_bc(stmt)[0])
+
+    def _call_bc(self, stmt: Call) -> tuple[list[BytecodeType], str | None]:
+        """
+        :return: байт-код вызова и тип значения алгоритма (`None` - неизвестен или значения нет)
+        """
+        res: list[BytecodeType] = []
+        # типы аргументов, которые передаются в алгоритм
+        arg_types: list[str | None] = []
+        # ячейки, в которые записываются значения параметров `рез` и `аргрез`
+        res_targets = []
+        # типы всех аргументов проверены при построении байт-кода
+        types_checked = True
+        alg = self._find_alg(stmt.alg_name)
+        if alg is None:
+            raise RuntimeException(stmt.lineno, f'имя "{stmt.alg_name}" не определено')
+        _check_args_n(stmt.lineno, alg, len(stmt.args))
+        for arg, arg_sign in zip(stmt.args, alg.args):
             if 'рез' in arg_sign[0]:
                 if not (len(arg) == 1 and isinstance(arg[0], Value) and arg[0].typename == 'get-name'):
                     raise RuntimeException(stmt.lineno, 'не величина')
-                self.cur_ns.append((stmt.lineno, Bytecode.SET_RES_VAR, (arg[0].value,)))
-                res_var_setted = True
-                self.cur_inst_n += 1
-            if arg_sign[0] != 'рез':
-                self.cur_ns.extend(self._expr_bc(stmt.lineno, arg))
-
-        if not res_var_setted:
-            self.cur_ns.append((stmt.lineno, Bytecode.SET_RES_VAR, ('знач',)))
+                var = self._resolve(arg[0].value)
+                if var is None:
+                    raise RuntimeException(stmt.lineno, f'имя "{arg[0].value}" не определено')
+                self._check_writable(stmt.lineno, *var[:2])
+                res_targets.append(var[:2])
+            if is_input_arg(arg_sign):
+                arg_bc, typename = self._typed_expr_bc(stmt.lineno, arg)
+                arg_types.append(typename)
+                if typename is None:
+                    types_checked = False
+                elif not arg_type_matches(arg_sign[1], typename):
+                    raise RuntimeException(stmt.lineno, 'неправильный тип аргумента')
+                res.extend(arg_bc)
+
+        res.append(self._call_inst(stmt.lineno, stmt.alg_name, tuple(res_targets), types_checked))
+        return res, ret_type(alg.ret_type, arg_types)
+
+    def _call_inst(
+        self, lineno: int, name: str, res_targets: tuple[tuple[Scope, int], ...], types_checked: bool
+    ) -> BytecodeType:
+        """
+        :param types_checked: типы аргументов проверены, во время выполнения проверять их не нужно
+        :return: `CALL_NATIVE` для алгоритма исполнителя без параметров `рез` и `аргрез`, иначе `CALL`
+        """
+        if name not in self.algs and not res_targets and types_checked:
+            func = self._find_actor_func(name)
+            if func is not None and not any('рез' in arg[0] for arg in func.args):
+                return lineno, Bytecode.CALL_NATIVE, (func, len(func.args))
+        return lineno, Bytecode.CALL, (name, res_targets)
 
-        self.cur_ns.append((stmt.lineno, Bytecode.CALL, (stmt.alg_name, len(stmt.args))))
-        self.cur_inst_n += 2
+    def _find_actor_func(self, name: str) -> KumirFunc | None:
+        """
+        :return: алгоритм подключённого исполнителя; если он есть у нескольких исполнителей -
+                 у подключённого последним (как и в VM, где алгоритмы исполнителей заменяются при `USE`)
+        """
+        for actor_name in reversed(self._actors):
+            # о неизвестном исполнителе сообщает `USE` во время выполнения
+            actor = actors.get(actor_name)
+            func = actor.funcs.get(name) if actor is not None else None
+            if func is not None:
+                return func
+        return None
+
+    def _find_alg(self, name: str) -> Algorithm | None:
+        """
+        :return: алгоритм программы или подключённого исполнителя (у него нет байт-кода),
+                 `None` - такого алгоритма нет
+        """
+        if name in self.algs:
+            return self.algs[name]
+        kf = self._find_actor_func(name)
+        if kf is not None:
+            return Algorithm(name, kf.args, kf.ret_type)
+        return None
 
     def _handle_if_start(self, stmt: IfStart) -> None:
-        self.ifs.append(id(stmt))
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.cond))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_FALSE, (self.tags[id(stmt)][0],)))
-        self.cur_inst_n += 1
+        else_label, end_label = self._new_label(), self._new_label()
+        self.ifs.append((else_label, end_label))
+        self.cur_ns.extend(self._cond_bc(stmt.lineno, stmt.cond))
+        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_IF_FALSE, (else_label,)))
 
     def _handle_else_start(self, stmt: ElseStart) -> None:
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG, (self.tags[self.ifs.pop()][-1],)))
-        self.cur_inst_n += 1
-        self.cur_tags.append(self.cur_inst_n)
+        else_label, end_label = self.ifs[-1]
+        self.ifs_with_else.add(else_label)
+        self.cur_ns.append((stmt.lineno, Bytecode.JUMP, (end_label,)))
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (else_label,)))
+
+    def _handle_if_end(self, stmt: IfEnd) -> None:
+        else_label, end_label = self.ifs.pop()
+        if else_label not in self.ifs_with_else:
+            self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (else_label,)))
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (end_label,)))
+
+    def _start_loop(self) -> tuple[int, int]:
+        """
+        Создаёт метки начала тела и конца нового цикла.
+        :return: метки (начало тела, конец)
+        """
+        labels = self._new_label(), self._new_label()
+        self.loops.append(labels)
+        return labels
 
-    def _handle_if_end(self, _: IfEnd) -> None:
-        self.cur_tags.append(self.cur_inst_n)
+    def _end_loop(self, lineno: int, cond: list[BytecodeType]) -> None:
+        """
+        Завершает текущий цикл: пока условие `cond` истинно, выполнение возвращается в начало тела.
+        """
+        body_label, end_label = self.loops.pop()
+        self.cur_ns.extend(cond)
+        self.cur_ns.append((lineno, Bytecode.JUMP_IF_TRUE, (body_label,)))
+        self.cur_ns.append((lineno, Bytecode.LABEL, (end_label,)))
+
+    def _new_counted_loop(self) -> int:
+        self.counted_loops_n += 1
+        return self.counted_loops_n
 
     def _handle_loop_with_count_start(self, stmt: LoopWithCountStart) -> None:
-        self.loops_with_count_indexes.append(id(stmt))
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.count))
-        self.cur_ns.append((stmt.lineno, Bytecode.STORE, ('цел', (str(id(stmt)),))))
-        self.cur_ns.extend(self._loop_with_count_cond(stmt.lineno, str(id(stmt))))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_FALSE, (self.tags[id(stmt)][1],)))
-        self.cur_inst_n += 2
-        self.cur_tags.append(self.cur_inst_n)
+        body_label, end_label = self._start_loop()
+        loop_n = self._new_counted_loop()
+        self.loops_with_count.append(loop_n)
+        self.cur_ns.extend(self._int_expr_bc(stmt.lineno, stmt.count))
+        self.cur_ns.append((stmt.lineno, Bytecode.REPEAT_INIT, (end_label, loop_n)))
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (body_label,)))
 
     def _handle_loop_with_count_end(self, stmt: LoopWithCountEnd) -> None:
-        stmt_tags = self.tags[self.loops_with_count_indexes[-1]]
-        self.cur_tags.append(self.cur_inst_n)
-        self.cur_ns.extend(self._loop_with_count_cond(stmt.lineno, str(self.loops_with_count_indexes.pop())))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_TRUE, (stmt_tags[0],)))
-        self.cur_inst_n += 2
-        self.cur_tags.append(self.cur_inst_n)
+        body_label, end_label = self.loops.pop()
+        self.cur_ns.append((stmt.lineno, Bytecode.REPEAT_NEXT, (body_label, self.loops_with_count.pop())))
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (end_label,)))
 
     def _handle_loop_while_start(self, stmt: LoopWhileStart) -> None:
+        body_label, end_label = self._start_loop()
         self.loops_while_stmts.append(stmt.cond)
-        self.loops_while_indexes.append(id(stmt))
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.cond))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_FALSE, (self.tags[id(stmt)][1],)))
-        self.cur_inst_n += 1
-        self.cur_tags.append(self.cur_inst_n)
+        self.cur_ns.extend(self._cond_bc(stmt.lineno, stmt.cond))
+        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_IF_FALSE, (end_label,)))
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (body_label,)))
 
     def _handle_loop_while_end(self, stmt: LoopWhileEnd) -> None:
-        stmt_tags = self.tags[self.loops_while_indexes.pop()]
-        self.cur_tags.append(self.cur_inst_n)
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, self.loops_while_stmts.pop()))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_TRUE, (stmt_tags[0],)))
-        self.cur_inst_n += 2
-        self.cur_tags.append(self.cur_inst_n)
+        self._end_loop(stmt.lineno, self._cond_bc(stmt.lineno, self.loops_while_stmts.pop()))
 
     def _handle_loop_for_start(self, stmt: LoopForStart) -> None:
-        self.loops_for_indexes.append(id(stmt))
-        self.loops_for.append((stmt.target, stmt.from_expr, stmt.to_expr, stmt.step))
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.from_expr))
-        self.cur_ns.append((stmt.lineno, Bytecode.STORE, ('цел', (stmt.target,))))
-        self.cur_ns.append((stmt.lineno, Bytecode.LOAD_NAME, (stmt.target,)))
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.to_expr))
-        self.cur_ns.append((stmt.lineno, Bytecode.BIN_OP, ('<=',)))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_FALSE, (self.tags[id(stmt)][1],)))
-        self.cur_inst_n += 4
-        self.cur_tags.append(self.cur_inst_n)
+        body_label, end_label = self._start_loop()
+        loop_n = self._new_counted_loop()
+        # границы и шаг вычисляются один раз, до начала цикла
+        for expr in (stmt.from_expr, stmt.to_expr, stmt.step):
+            self.cur_ns.extend(self._int_expr_bc(stmt.lineno, expr))
+        scope, slot = self._declare(stmt.target, 'цел')
+        self._check_writable(stmt.lineno, scope, slot)
+        self.loops_for.append((scope, slot, loop_n))
+        self.cur_ns.append((stmt.lineno, Bytecode.FOR_RANGE_INIT, (end_label, scope, slot, loop_n)))
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (body_label,)))
 
     def _handle_loop_for_end(self, stmt: LoopForEnd) -> None:
-        stmt_tags = self.tags[self.loops_for_indexes.pop()]
-        loop = self.loops_for.pop()
-        self.cur_tags.append(self.cur_inst_n)
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, loop[1]))
-        self.cur_ns.extend(self._loop_for_cond(stmt.lineno, loop[0], loop[2], loop[3]))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_TRUE, (stmt_tags[0],)))
-        self.cur_inst_n += 2
-        self.cur_tags.append(self.cur_inst_n)
+        body_label, end_label = self.loops.pop()
+        self.cur_ns.append((stmt.lineno, Bytecode.FOR_RANGE_NEXT, (body_label, *self.loops_for.pop())))
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (end_label,)))
 
     def _handle_loop_until_start(self, stmt: LoopUntilStart) -> None:
-        self.loops_until_indexes.append(id(stmt))
-        self.cur_tags.append(self.cur_inst_n)
+        body_label, _ = self._start_loop()
+        self.cur_ns.append((stmt.lineno, Bytecode.LABEL, (body_label,)))
 
     def _handle_loop_until_end(self, stmt: LoopUntilEnd) -> None:
-        stmt_tags = self.tags[self.loops_until_indexes.pop()]
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.cond))
-        self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG_IF_TRUE, (stmt_tags[0],)))
-        self.cur_inst_n += 1
-        self.cur_tags.append(self.cur_inst_n)
+        self._end_loop(stmt.lineno, self._cond_bc(stmt.lineno, stmt.cond))
 
     def _handle_exit(self, stmt: Exit) -> None:
-        loops = (
-            self.loops_with_count_indexes + self.loops_while_indexes + self.loops_for_indexes + self.loops_until_indexes
-        )
-        if loops:
-            last_loop_i = max(loops)
-            loop_tags = self.tags[last_loop_i]
-            self.cur_ns.append((stmt.lineno, Bytecode.JUMP_TAG, (loop_tags[-1],)))
-            self.cur_inst_n += 1
+        if self.loops:
+            self.cur_ns.append((stmt.lineno, Bytecode.JUMP, (self.loops[-1][1],)))
         else:
             self.cur_ns.append((stmt.lineno, Bytecode.RET, ()))
-            self.cur_inst_n += 1
 
     def _handle_assert(self, stmt: Assert) -> None:
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.expr))
+        self.cur_ns.extend(self._cond_bc(stmt.lineno, stmt.expr))
         self.cur_ns.append((stmt.lineno, Bytecode.ASSERT, ()))
-        self.cur_inst_n += 1
 
     def _handle_stop(self, stmt: Stop) -> None:
         self.cur_ns.append((stmt.lineno, Bytecode.STOP, ()))
-        self.cur_inst_n += 1
 
     def _handle_set_item(self, stmt: SetItem) -> None:
-        self.cur_ns.extend(self._expr_bc(stmt.lineno, stmt.expr))
+        value_bc, value_type = self._typed_expr_bc(stmt.lineno, stmt.expr)
+        self.cur_ns.extend(value_bc)
         for index in stmt.indexes:
             self.cur_ns.extend(self._expr_bc(stmt.lineno, index))
-        self.cur_ns.append((stmt.lineno, Bytecode.SET_ITEM, (stmt.table_name, len(stmt.indexes))))
-        self.cur_inst_n += 1
-
-    def _loop_with_count_cond(self, lineno: int, loop_name: str) -> list[BytecodeType]:
-        res = [
-            (lineno, Bytecode.LOAD_NAME, (loop_name,)),
-            (lineno, Bytecode.LOAD_CONST, (Value('цел', 1),)),
-            (lineno, Bytecode.BIN_OP, ('-',)),
-            (lineno, Bytecode.STORE, (None, (loop_name,))),
-            (lineno, Bytecode.LOAD_NAME, (loop_name,)),
-            (lineno, Bytecode.LOAD_CONST, (Value('цел', -1),)),
-            (lineno, Bytecode.BIN_OP, ('>',)),
-        ]
-        self.cur_inst_n += 7
-        return res
+        var = self._resolve(stmt.table_name)
+        if var is None:
+            self.cur_ns.append((stmt.lineno, Bytecode.NAME_ERROR, (stmt.table_name,)))
+        else:
+            scope, slot, typename = var
+            if typename == 'лит' and len(stmt.indexes) == 1:
+                self._check_writable(stmt.lineno, scope, slot)
+                self.cur_ns.append((stmt.lineno, Bytecode.SET_CHAR, (scope, slot)))
+            elif 'таб' in typename:
+                item_typename = typename.removesuffix('таб')
+                _check_value_type(stmt.lineno, item_typename, value_type)
+                # тип значения нужно проверять во время выполнения, только если он пока неизвестен
+                check_type = item_typename if value_type is None else None
+                self.cur_ns.append((stmt.lineno, Bytecode.SET_ITEM_N, (scope, slot, len(stmt.indexes), check_type)))
+            else:
+                self.cur_ns.append((stmt.lineno, Bytecode.SET_ITEM, (*var, len(stmt.indexes))))
 
-    def _loop_for_cond(self, lineno: int, target: str, to_expr: Expr, step: Expr) -> list[BytecodeType]:
-        res = [
-            (lineno, Bytecode.LOAD_NAME, (target,)),
-            *self._expr_bc(lineno, step),
-            (lineno, Bytecode.BIN_OP, ('+',)),
-            (lineno, Bytecode.STORE, (None, (target,))),
-            (lineno, Bytecode.LOAD_NAME, (target,)),
-            *self._expr_bc(lineno, to_expr),
-            (lineno, Bytecode.BIN_OP, ('<=',)),
-        ]
-        self.cur_inst_n += 5
+    def _get_item_bc(self, item: GetItem) -> list[BytecodeType]:
+        """
+        :return: байт-код получения элемента таблицы (одна инструкция `GET_ITEM_N` на все индексы)
+                 или символа строки
+        """
+        res: list[BytecodeType] = []
+        var = self._resolve(item.table_name)
+        if var is not None and 'таб' in var[2]:
+            for index in item.indexes:
+                res.extend(self._expr_bc(item.lineno, index))
+            res.append((item.lineno, Bytecode.GET_ITEM_N, (var[0], var[1], len(item.indexes))))
+            return res
+        if var is not None and var[2] == 'лит' and len(item.indexes) == 1:
+            res.extend(self._expr_bc(item.lineno, item.indexes[0]))
+            res.append((item.lineno, Bytecode.GET_CHAR, var[:2]))
+            return res
+
+        res.append(self._load_bc(item.lineno, item.table_name))
+        for index in item.indexes:
+            res.extend(self._expr_bc(item.lineno, index))
+            res.append((item.lineno, Bytecode.GET_ITEM, ()))
         return res
 
+    def _cond_bc(self, lineno: int, cond: Expr) -> list[BytecodeType]:
+        """
+        :return: байт-код условия, условие известного не логического типа - ошибка
+        """
+        cond_bc, typename = self._typed_expr_bc(lineno, cond)
+        if typename is not None and typename != 'лог':
+            raise RuntimeException(lineno, 'условие не логическое')
+        return cond_bc
+
+    def _int_expr_bc(self, lineno: int, expr: Expr) -> list[BytecodeType]:
+        """
+        :return: байт-код выражения, которое должно быть целым (границы и шаг цикла, число повторений)
+        """
+        expr_bc, typename = self._typed_expr_bc(lineno, expr)
+        _check_value_type(lineno, 'цел', typename)
+        return expr_bc
+
     def _expr_bc(self, lineno: int, expr: Expr) -> list[BytecodeType]:
         """
         Превращает обратную польскую запись вида `2, 3, Op(op='+')`
-        в набор команд байт-кода вида `LOAD 2, LOAD 3, BIN_OP +`.
+        в набор команд байт-кода вида `LOAD 2, LOAD 3, ADD_INT`.
+        """
+        return self._typed_expr_bc(lineno, expr)[0]
+
+    def _typed_expr_bc(self, lineno: int, expr: Expr) -> tuple[list[BytecodeType], str | None]:
+        """
+        Строит байт-код выражения, одновременно выводя типы его частей:
+        для операций над известными типами выбираются отдельные инструкции, несовместимые типы - ошибка.
+        :return: байт-код и тип выражения (`None` - неизвестен до выполнения)
         """
         res: list[BytecodeType] = []
+        types: list[str | None] = []
+        # индекс в `res`, с которого начинается код каждого значения в `types`
+        starts: list[int] = []
         for v in expr:
+            start = len(res)
             if isinstance(v, Op):
                 if v.unary:
-                    res.append((lineno, Bytecode.UNARY_OP, (v.op,)))
+                    typename, opcode = unary_op_type(lineno, v.op, types.pop())
+                    if opcode == Bytecode.UNARY_OP:
+                        res.append((lineno, opcode, (v.op,)))
+                    elif opcode is not None:
+                        res.append((lineno, opcode, ()))
+                    start = starts.pop()
                 else:
-                    res.append((lineno, Bytecode.BIN_OP, (v.op,)))
-                self.cur_inst_n += 1
+                    right = types.pop()
+                    right_start = starts.pop()
+                    inst, typename = _bin_op_bc(lineno, v.op, types.pop(), right)
+                    start = starts.pop()
+                    if inst[1] in _SHORT_CIRCUIT_OPS:
+                        # правая часть `и` / `или` вычисляется, только если от неё зависит результат
+                        end_label = self._new_label()
+                        res.insert(right_start, (lineno, _SHORT_CIRCUIT_OPS[inst[1]], (end_label,)))
+                        res.append((lineno, Bytecode.LABEL, (end_label,)))
+                    else:
+                        res.append(inst)
             elif isinstance(v, Call):
-                last_inst_n = self.cur_inst_n
-                self._handle_call(v)
-                bc = []
-                for _ in range(self.cur_inst_n - last_inst_n):
-                    try:
-                        bc.append(self.cur_ns.pop())
-                    except IndexError:
-                        break
-                res.extend(bc[::-1])
+                call_bc, typename = self._call_bc(v)
+                res.extend(call_bc)
             elif isinstance(v, GetItem):
-                res.append((v.lineno, Bytecode.LOAD_NAME, (v.table_name,)))
-                self.cur_inst_n += 1
-                for index in v.indexes:
-                    res.extend(self._expr_bc(v.lineno, index))
-                    res.append((v.lineno, Bytecode.GET_ITEM, ()))
-                    self.cur_inst_n += 1
+                res.extend(self._get_item_bc(v))
+                typename = item_type(self._name_type(v.table_name), len(v.indexes))
             elif isinstance(v, Slice):
-                res.append((v.lineno, Bytecode.LOAD_NAME, (v.name,)))
-                self.cur_inst_n += 1
                 for index in v.indexes:
-                    self.cur_ns.extend(self._expr_bc(v.lineno, index))
-                res.append((v.lineno, Bytecode.MAKE_SLICE, (v.name,)))
-                self.cur_inst_n += 1
+                    res.extend(self._expr_bc(v.lineno, index))
+                res.append(self._load_bc(v.lineno, v.name))
+                res.append((v.lineno, Bytecode.MAKE_SLICE, ()))
+                typename = 'лит'
             elif v.typename == 'get-name':
-                res.append((lineno, Bytecode.LOAD_NAME, (v.value,)))
-                self.cur_inst_n += 1
-            elif isinstance(v, Value):
+                res.append(self._load_bc(lineno, v.value))
+                typename = self._name_type(v.value)
+            else:
+                if v.typename == 'лог':
+                    # в дереве разбора `да` и `нет` - строки, в байт-коде - общие значения `bool`
+                    v = bool_value(v.value == 'да')
                 res.append((lineno, Bytecode.LOAD_CONST, (v,)))
-                self.cur_inst_n += 1
-        return res
+                typename = v.typename
+            types.append(typename)
+            starts.append(start)
+        return res, types[-1] if types else None
+
+    def _name_type(self, name: str) -> str | None:
+        """
+        :return: тип величины или значения алгоритма без аргументов, `None` - имя не определено
+        """
+        var = self._resolve(name)
+        if var is not None:
+            return var[2]
+        alg = self._find_alg(name)
+        if alg is None:
+            return None
+        # у алгоритма без значения `ret_type` - пустая строка
+        return alg.ret_type or None
 
 
-def _get_all_statements_tags_and_algs(parsed: list[Statement]) -> tuple[dict[int, list[int]], dict]:
+def _get_all_algs(parsed: list[Statement]) -> AlgsList:
     """
-    :return: словарь вида `{индекс_инструкции: [список тегов, которые она должна использовать]}`
+    :return: словарь всех алгоритмов программы, код и список ячеек алгоритмов пока пусты
     """
-    res = {}
-    ifs = []
-    loops = []
     algs = {}
+    for stmt in parsed:
+        if isinstance(stmt, AlgStart):
+            algs[stmt.name] = Algorithm(stmt.name, stmt.args, stmt.ret_type)
+    return algs
 
-    cur_tag_n = 0
 
-    for stmt in parsed:
-        if isinstance(stmt, IfStart):
-            ifs.append(id(stmt))
-            res[id(stmt)] = []
-        elif isinstance(stmt, (LoopWithCountStart, LoopWhileStart, LoopForStart, LoopUntilStart)):
-            loops.append(id(stmt))
-            res[id(stmt)] = [cur_tag_n]
-            cur_tag_n += 1
-
-        elif isinstance(stmt, ElseStart):
-            res[ifs[-1]].append(cur_tag_n)
-            cur_tag_n += 1
-        elif isinstance(stmt, IfEnd):
-            res[ifs.pop()].append(cur_tag_n)
-            cur_tag_n += 1
-        elif isinstance(stmt, (LoopWithCountEnd, LoopWhileEnd, LoopForEnd, LoopUntilEnd)):
-            res[loops.pop()].append(cur_tag_n)
-            cur_tag_n += 1
-
-        elif isinstance(stmt, AlgStart):
-            algs[stmt.name] = (stmt.args, stmt.ret_type, [[], []])
-
-        if isinstance(stmt, AlgEnd):
-            cur_tag_n = 0
-
-    return res, algs
+# логическая операция: переход, который пропускает вычисление правой части
+_SHORT_CIRCUIT_OPS = {
+    Bytecode.AND: Bytecode.JUMP_IF_FALSE_OR_POP,
+    Bytecode.OR: Bytecode.JUMP_IF_TRUE_OR_POP,
+}
+
+
+def _bin_op_bc(lineno: int, op: str, left: str | None, right: str | None) -> tuple[BytecodeType, str | None]:
+    """
+    :param left: тип левого операнда
+    :param right: тип правого операнда
+    :return: инструкция бинарной операции и тип её результата
+    """
+    typename, opcode = bin_op_type(lineno, op, left, right)
+    return (lineno, opcode, (op,) if opcode == Bytecode.BIN_OP else ()), typename
+
+
+def _is_single_expr(expr: Expr) -> bool:
+    """
+    :return: является ли обратная польская запись `expr` ровно одним выражением
+    """
+    depth = 0
+    for v in expr:
+        if isinstance(v, Op):
+            depth -= 0 if v.unary else 1
+            if depth < 1:
+                return False
+        else:
+            depth += 1
+    return depth == 1
+
+
+def _check_args_n(lineno: int, alg: Algorithm, args_n: int) -> None:
+    """
+    :param args_n: количество аргументов в вызове
+    """
+    if args_n != len(alg.args):
+        raise RuntimeException(lineno, 'неправильное количество аргументов')
+
+
+def _check_value_type(lineno: int, typename: str, value_type: str | None) -> None:
+    """
+    :param value_type: тип значения, которое сохраняется в величину типа `typename` (`None` - неизвестен)
+    """
+    if value_type is not None and value_type != typename:
+        raise RuntimeException(lineno, f'нельзя "{typename} := {value_type}"')
+
+
+def link(code: list[BytecodeType]) -> list[BytecodeType]:
+    """
+    Убирает из кода метки (`LABEL`) и заменяет номера меток в инструкциях перехода
+    на индексы инструкций, к которым нужно перейти.
+    """
+    positions: dict[int, int] = {}
+    inst_n = 0
+    for inst in code:
+        if inst[1] == Bytecode.LABEL:
+            positions[inst[2][0]] = inst_n
+        else:
+            inst_n += 1
+    res: list[BytecodeType] = []
+    for inst in code:
+        if inst[1] == Bytecode.SWITCH:
+            cases = {value: positions[label] for value, label in inst[2][1].items()}
+            res.append((inst[0], inst[1], (positions[inst[2][0]], cases)))
+        elif inst[1] in JUMPS:
+            res.append((inst[0], inst[1], (positions[inst[2][0]], *inst[2][1:])))
+        elif inst[1] != Bytecode.LABEL:
+            res.append(inst)
+    return res
+
+
+def jump_targets(inst: BytecodeType) -> tuple[int, ...]:
+    """
+    :return: все цели перехода инструкции (у `SWITCH` их несколько)
+    """
+    if inst[1] == Bytecode.SWITCH:
+        return inst[2][0], *inst[2][1].values()
+    if inst[1] in JUMPS:
+        return (inst[2][0],)
+    return ()
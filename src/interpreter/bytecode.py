@@ -3,26 +3,88 @@ from typing import TypeAlias
 
 
 class Bytecode(Enum):
+    GLOBALS = auto()
     LOAD_CONST = auto()
-    LOAD_NAME = auto()
+    LOAD_GLOBAL = auto()
+    LOAD_LOCAL = auto()
     MAKE_TABLE = auto()
     BIN_OP = auto()
     UNARY_OP = auto()
-    STORE = auto()
-    SET_RES_VAR = auto()
+
+    # Операции с заранее известными типами операндов, выбираются при построении байт-кода вместо `BIN_OP` и `UNARY_OP`
+    ADD_INT = auto()
+    ADD_FLOAT = auto()
+    SUB_INT = auto()
+    SUB_FLOAT = auto()
+    MUL_INT = auto()
+    MUL_FLOAT = auto()
+    DIV = auto()
+    POW_INT = auto()
+    POW_FLOAT = auto()
+    CONCAT_STR = auto()
+    EQ = auto()
+    NE = auto()
+    LT = auto()
+    GT = auto()
+    LE = auto()
+    GE = auto()
+    AND = auto()
+    OR = auto()
+    NOT = auto()
+    NEG_INT = auto()
+    NEG_FLOAT = auto()
+
+    STORE_GLOBAL = auto()
+    STORE_LOCAL = auto()
+    # Сохранение, после которого значение остаётся в стеке (`STORE x, LOAD x` после оптимизации)
+    STORE_GLOBAL_KEEP = auto()
+    STORE_LOCAL_KEEP = auto()
+    NAME_ERROR = auto()
     CALL = auto()
+    # Вызов алгоритма исполнителя, найденного при построении байт-кода: (KumirFunc, количество аргументов)
+    CALL_NATIVE = auto()
     RET = auto()
     OUTPUT = auto()
     INPUT = auto()
-    JUMP_TAG = auto()
-    JUMP_TAG_IF_FALSE = auto()
-    JUMP_TAG_IF_TRUE = auto()
+    JUMP = auto()
+    JUMP_IF_FALSE = auto()
+    JUMP_IF_TRUE = auto()
+    # `и` и `или`: если результат уже известен, переход с условием в стеке, иначе условие удаляется
+    JUMP_IF_FALSE_OR_POP = auto()
+    JUMP_IF_TRUE_OR_POP = auto()
+    # Переход по значению из стека: (цель по умолчанию, {значение: цель}), строится оптимизатором для `выбор`
+    SWITCH = auto()
+    # Сравнение и переход по его результату: (цель, инструкция сравнения, переходить ли при `да`)
+    COMPARE_AND_JUMP = auto()
+    # Циклы `нц для` и `нц N раз`: счётчик, граница и шаг хранятся в кадре вызова
+    FOR_RANGE_INIT = auto()
+    FOR_RANGE_NEXT = auto()
+    REPEAT_INIT = auto()
+    REPEAT_NEXT = auto()
     ASSERT = auto()
     STOP = auto()
     GET_ITEM = auto()
     SET_ITEM = auto()
+    # Элемент таблицы по всем индексам сразу, таблица берётся прямо из ячейки величины
+    GET_ITEM_N = auto()
+    SET_ITEM_N = auto()
+    # Величины `лит`: в ячейке может лежать изменяемый буфер (`StrBuffer`), в стек попадает только `str`
+    LOAD_STR = auto()
+    APPEND_STR = auto()
+    GET_CHAR = auto()
+    SET_CHAR = auto()
     MAKE_SLICE = auto()
     USE = auto()
 
+    # Метка для переходов, есть только в байт-коде до компоновки
+    LABEL = auto()
+
+
+class Scope(Enum):
+    """Область видимости величины."""
+
+    GLOBAL = auto()
+    LOCAL = auto()
+
 
 BytecodeType: TypeAlias = tuple[int, Bytecode, tuple]
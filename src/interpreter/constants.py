@@ -5,14 +5,10 @@
 """
 from typing import TypeAlias
 
-AlgsList: TypeAlias = dict[
-    str,
-    tuple[
-        list[tuple[str, str, str]],
-        str,
-        list[list]
-    ]
-]
+from .algorithm import Algorithm
+
+# имя алгоритма: алгоритм
+AlgsList: TypeAlias = dict[str, Algorithm]
 
 KEYWORDS = {
     'алг',
@@ -0,0 +1,375 @@
+"""
+Оптимизация готового байт-кода:
+ + свёртка констант (`LOAD_CONST 2, LOAD_CONST 3, MUL_INT` -> `LOAD_CONST 6`);
+ + замена переходов по константному условию, удаление ненужных переходов и недостижимого кода
+   после `JUMP`, `RET` и `STOP`;
+ + замена `STORE x, LOAD x` на одну инструкцию, которая сохраняет значение, оставляя его в стеке;
+ + сокращение цепочек переходов (переход на `JUMP` сразу ведёт к его цели);
+ + замена цепочки сравнений одной величины с константами (`выбор при а = 1: ... при а = 2: ...`)
+   одним переходом `SWITCH` по словарю;
+ + объединение сравнения и условного перехода после него в одну инструкцию `COMPARE_AND_JUMP`.
+
+Уровни оптимизации: `0` - байт-код не меняется, `1` - все перечисленные оптимизации.
+"""
+import operator
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from .build_bytecode import JUMPS, jump_targets, link
+from .bytecode import Bytecode, BytecodeType, Scope
+from .constants import AlgsList
+from .value import Value, bool_value
+
+DEFAULT_OPT_LEVEL = 1
+
+# инструкция: (функция, тип результата; `None` - `лог`)
+_FOLDABLE_BIN_OPS: dict[Bytecode, tuple[Callable[[Any, Any], Any], str | None]] = {
+    Bytecode.ADD_INT: (operator.add, 'цел'),
+    Bytecode.ADD_FLOAT: (operator.add, 'вещ'),
+    Bytecode.SUB_INT: (operator.sub, 'цел'),
+    Bytecode.SUB_FLOAT: (operator.sub, 'вещ'),
+    Bytecode.MUL_INT: (operator.mul, 'цел'),
+    Bytecode.MUL_FLOAT: (operator.mul, 'вещ'),
+    Bytecode.DIV: (operator.truediv, 'вещ'),
+    Bytecode.CONCAT_STR: (operator.add, 'лит'),
+    Bytecode.EQ: (operator.eq, None),
+    Bytecode.NE: (operator.ne, None),
+    Bytecode.LT: (operator.lt, None),
+    Bytecode.GT: (operator.gt, None),
+    Bytecode.LE: (operator.le, None),
+    Bytecode.GE: (operator.ge, None),
+    Bytecode.AND: (lambda a, b: a and b, None),
+    Bytecode.OR: (lambda a, b: a or b, None),
+}
+_FOLDABLE_UNARY_OPS: dict[Bytecode, tuple[Callable[[Any], Any], str | None]] = {
+    Bytecode.NEG_INT: (operator.neg, 'цел'),
+    Bytecode.NEG_FLOAT: (operator.neg, 'вещ'),
+    Bytecode.NOT: (operator.not_, None),
+}
+# `STORE` -> (`LOAD` той же ячейки, `STORE`, оставляющий значение в стеке)
+_FORWARDED_STORES = {
+    Bytecode.STORE_GLOBAL: (Bytecode.LOAD_GLOBAL, Bytecode.STORE_GLOBAL_KEEP),
+    Bytecode.STORE_LOCAL: (Bytecode.LOAD_LOCAL, Bytecode.STORE_LOCAL_KEEP),
+}
+# (переход, инструкция на его цели): переход сразу к цели этой инструкции, условие удаляется из стека
+_CONDITION_JUMPS = {
+    (Bytecode.JUMP_IF_FALSE_OR_POP, Bytecode.JUMP_IF_FALSE): Bytecode.JUMP_IF_FALSE,
+    (Bytecode.JUMP_IF_TRUE_OR_POP, Bytecode.JUMP_IF_TRUE): Bytecode.JUMP_IF_TRUE,
+}
+_COMPARE_OPS = {Bytecode.EQ, Bytecode.NE, Bytecode.LT, Bytecode.GT, Bytecode.LE, Bytecode.GE}
+# инструкция: область видимости величины, которую она оставляет в стеке
+_VAR_LOADS = {
+    Bytecode.LOAD_GLOBAL: Scope.GLOBAL,
+    Bytecode.LOAD_LOCAL: Scope.LOCAL,
+    Bytecode.STORE_GLOBAL_KEEP: Scope.GLOBAL,
+    Bytecode.STORE_LOCAL_KEEP: Scope.LOCAL,
+}
+# после этих инструкций выполнение не переходит к следующей
+_NO_FALLTHROUGH = {Bytecode.JUMP, Bytecode.RET, Bytecode.STOP}
+
+
+def optimize(
+    bytecode: list[BytecodeType], algs: AlgsList, opt_level: int = DEFAULT_OPT_LEVEL
+) -> tuple[list[BytecodeType], AlgsList]:
+    """
+    Оптимизирует байт-код программы и всех её алгоритмов (списки кода меняются на месте).
+    :param bytecode: байт-код программы, результат `build_bytecode`
+    :param algs: словарь алгоритмов программы
+    :param opt_level: уровень оптимизации
+    :return: байт-код программы и словарь алгоритмов
+    """
+    if opt_level <= 0:
+        return bytecode, algs
+    bytecode[:] = optimize_code(bytecode)
+    for alg in algs.values():
+        alg.code = optimize_code(alg.code)
+    return bytecode, algs
+
+
+def optimize_code(code: list[BytecodeType]) -> list[BytecodeType]:
+    """
+    Оптимизирует один список инструкций, пока оптимизации что-то меняют.
+    """
+    code = _unlink(code)
+    changed = True
+    while changed:
+        changed = False
+        for opt in (_fold_constants, _thread_jumps, _remove_dead_code, _forward_stores, _build_switches):
+            new_code = opt(code)
+            if new_code != code:
+                code = new_code
+                changed = True
+    # после остальных оптимизаций: им (например, `_build_switches`) нужны отдельные сравнения
+    return link(_fuse_compare_jumps(code))
+
+
+def _unlink(code: list[BytecodeType]) -> list[BytecodeType]:
+    """
+    Действие, обратное компоновке: ставит метку (`LABEL`) перед каждой инструкцией,
+    на которую есть переход, а в инструкциях перехода заменяет индексы на номера меток.
+    Номер метки - индекс инструкции, перед которой она стоит.
+    """
+    targets = {target for inst in code for target in jump_targets(inst)}
+    res: list[BytecodeType] = []
+    for i, inst in enumerate(code):
+        if i in targets:
+            res.append((inst[0], Bytecode.LABEL, (i,)))
+        res.append(inst)
+    if len(code) in targets:  # переход в конец кода
+        res.append((code[-1][0], Bytecode.LABEL, (len(code),)))
+    return res
+
+
+def _fold_constants(code: list[BytecodeType]) -> list[BytecodeType]:
+    res: list[BytecodeType] = []
+    for inst in code:
+        folded = _fold(inst, res)
+        res.extend([inst] if folded is None else folded)
+    return res
+
+
+def _fold(inst: BytecodeType, res: list[BytecodeType]) -> list[BytecodeType] | None:
+    """
+    Пытается выполнить инструкцию `inst` над константами, загруженными последними инструкциями `res`;
+    использованные константы удаляются из `res`.
+    :return: инструкции, которыми заменяется `inst`, `None` - выполнить заранее нельзя
+    """
+    lineno, opcode = inst[0], inst[1]
+    if opcode in _FOLDABLE_BIN_OPS:
+        if len(res) < 2 or not _is_const(res[-1]) or not _is_const(res[-2]):
+            return None
+        func, typename = _FOLDABLE_BIN_OPS[opcode]
+        b, a = res[-2][2][0], res[-1][2][0]
+        try:
+            value = func(b.value, a.value)
+        except ArithmeticError:  # ошибка должна произойти во время выполнения
+            return None
+        del res[-2:]
+        return [(lineno, Bytecode.LOAD_CONST, (_const(typename, value),))]
+    elif opcode in _FOLDABLE_UNARY_OPS:
+        if not res or not _is_const(res[-1]):
+            return None
+        func, typename = _FOLDABLE_UNARY_OPS[opcode]
+        value = func(res.pop()[2][0].value)
+        return [(lineno, Bytecode.LOAD_CONST, (_const(typename, value),))]
+    elif opcode in (Bytecode.JUMP_IF_FALSE, Bytecode.JUMP_IF_TRUE, Bytecode.ASSERT):
+        if not res or not _is_const(res[-1]) or res[-1][2][0].typename != 'лог':
+            return None
+        if opcode == Bytecode.ASSERT and not res[-1][2][0].value:
+            return None  # ложное утверждение - ошибка во время выполнения
+        cond = res.pop()[2][0].value
+        if opcode != Bytecode.ASSERT and cond == (opcode == Bytecode.JUMP_IF_TRUE):
+            return [(lineno, Bytecode.JUMP, inst[2])]
+        return []
+    elif opcode in (Bytecode.JUMP_IF_FALSE_OR_POP, Bytecode.JUMP_IF_TRUE_OR_POP):
+        if not res or not _is_const(res[-1]):
+            return None
+        if res[-1][2][0].value == (opcode == Bytecode.JUMP_IF_TRUE_OR_POP):
+            return [(lineno, Bytecode.JUMP, inst[2])]  # условие остаётся в стеке как результат
+        res.pop()
+        return []
+    return None
+
+
+def _is_const(inst: BytecodeType) -> bool:
+    return inst[1] == Bytecode.LOAD_CONST and inst[2][0] is not None
+
+
+def _const(typename: str | None, value: Any) -> Value:
+    """
+    :param typename: тип значения, `None` - `лог`
+    """
+    if typename is None:
+        return bool_value(value)
+    return Value(typename, value)
+
+
+def _thread_jumps(code: list[BytecodeType]) -> list[BytecodeType]:
+    """
+    Переход на `JUMP` заменяется переходом на его цель, а `JUMP` на `RET` или `STOP` - самой этой инструкцией.
+    `JUMP_IF_FALSE_OR_POP` на `JUMP_IF_FALSE` (`если а и б`) сразу переходит к цели `JUMP_IF_FALSE`.
+    """
+    # номер метки: первая инструкция после неё
+    label_targets: dict[int, BytecodeType | None] = {}
+    next_inst: BytecodeType | None = None
+    for inst in reversed(code):
+        if inst[1] == Bytecode.LABEL:
+            label_targets[inst[2][0]] = next_inst
+        else:
+            next_inst = inst
+
+    res: list[BytecodeType] = []
+    for inst in code:
+        if inst[1] in JUMPS:
+            label = inst[2][0]
+            seen = {label}
+            target = label_targets[label]
+            while target is not None and target[1] == Bytecode.JUMP and target[2][0] not in seen:
+                label = target[2][0]
+                seen.add(label)
+                target = label_targets[label]
+            if inst[1] == Bytecode.JUMP and target is not None and target[1] in (Bytecode.RET, Bytecode.STOP):
+                inst = target
+            elif target is not None and (inst[1], target[1]) in _CONDITION_JUMPS:
+                inst = (inst[0], _CONDITION_JUMPS[inst[1], target[1]], target[2])
+            else:
+                inst = (inst[0], inst[1], (label, *inst[2][1:]))
+        res.append(inst)
+    return res
+
+
+def _remove_dead_code(code: list[BytecodeType]) -> list[BytecodeType]:
+    """
+    Удаляет метки, на которые нет переходов, переходы на следующую инструкцию
+    и недостижимые инструкции после `JUMP`, `RET` и `STOP`.
+    """
+    used_labels = {label for inst in code for label in jump_targets(inst)}
+    res: list[BytecodeType] = []
+    reachable = True
+    for i, inst in enumerate(code):
+        if inst[1] == Bytecode.LABEL:
+            if inst[2][0] in used_labels:
+                res.append(inst)
+                reachable = True
+            continue
+        if not reachable:
+            continue
+        if inst[1] == Bytecode.JUMP and _falls_to_label(code, i + 1, inst[2][0]):
+            continue
+        res.append(inst)
+        if inst[1] in _NO_FALLTHROUGH:
+            reachable = False
+    return res
+
+
+def _falls_to_label(code: list[BytecodeType], start: int, label: int) -> bool:
+    """
+    :return: стоит ли метка `label` среди меток, идущих подряд начиная с `code[start]`
+    """
+    for inst in code[start:]:
+        if inst[1] != Bytecode.LABEL:
+            return False
+        if inst[2][0] == label:
+            return True
+    return False
+
+
+def _forward_stores(code: list[BytecodeType]) -> list[BytecodeType]:
+    res: list[BytecodeType] = []
+    for inst in code:
+        if res and inst[1] in (Bytecode.LOAD_GLOBAL, Bytecode.LOAD_LOCAL):
+            store = res[-1]
+            forwarded = _FORWARDED_STORES.get(store[1])
+            # объявление без значения (`LOAD_CONST None`) не переносится: чтение такой величины - ошибка
+            if (
+                forwarded is not None
+                and forwarded[0] == inst[1]
+                and store[2][0] == inst[2][0]
+                and not (len(res) > 1 and res[-2][1] == Bytecode.LOAD_CONST and res[-2][2][0] is None)
+            ):
+                res[-1] = (store[0], forwarded[1], store[2])
+                continue
+        res.append(inst)
+    return res
+
+
+def _build_switches(code: list[BytecodeType]) -> list[BytecodeType]:
+    """
+    Заменяет цепочку проверок `LOAD а, LOAD_CONST 1, EQ, JUMP_IF_FALSE L1, <ветка>, L1: LOAD а, LOAD_CONST 2, ...`
+    (так выглядит `выбор`, в котором все условия - `а = <константа>`) на `LOAD а, SWITCH`.
+    """
+    refs = Counter(label for inst in code for label in jump_targets(inst))
+    positions = {inst[2][0]: i for i, inst in enumerate(code) if inst[1] == Bytecode.LABEL}
+    next_label = max(positions, default=0) + 1
+
+    res: list[BytecodeType] = []
+    i = 0
+    while i < len(code):
+        chain = _switch_chain(code, i, refs, positions)
+        if chain is None:
+            res.append(code[i])
+            i += 1
+            continue
+        cases, default = chain
+        targets: dict[Any, int] = {}
+        branches: list[BytecodeType] = []
+        for value, body in cases:
+            if value in targets:  # ветка недостижима: раньше уже есть сравнение с тем же значением
+                continue
+            targets[value] = next_label
+            branches.append((code[i][0], Bytecode.LABEL, (next_label,)))
+            branches.extend(body)
+            next_label += 1
+        res.append(code[i])
+        res.append((code[i + 3][0], Bytecode.SWITCH, (default, targets)))
+        res.extend(branches)
+        i = positions[default]
+    return res
+
+
+def _switch_chain(
+    code: list[BytecodeType], i: int, refs: Counter[int], positions: dict[int, int]
+) -> tuple[list[tuple[Any, list[BytecodeType]]], int] | None:
+    """
+    :param refs: номер метки: количество переходов на неё
+    :param positions: номер метки: её индекс в `code`
+    :return: (константа, инструкции ветки) для каждого сравнения цепочки, которая начинается с `code[i]`,
+             и метка, к которой цепочка переходит, если ни одно сравнение не верно;
+             `None` - цепочки из хотя бы двух сравнений нет
+    """
+    var = _loaded_var(code[i], keep=True)
+    if var is None:
+        return None
+    cases: list[tuple[Any, list[BytecodeType]]] = []
+    default = -1
+    while (
+        i + 3 < len(code)
+        and _is_const(code[i + 1])
+        and code[i + 2][1] == Bytecode.EQ
+        and code[i + 3][1] == Bytecode.JUMP_IF_FALSE
+    ):
+        label = code[i + 3][2][0]
+        end = positions[label]
+        if end <= i + 3 or refs[label] != 1:
+            break
+        cases.append((code[i + 1][2][0].value, code[i + 4 : end]))
+        default = label
+        # следующее сравнение идёт сразу после метки (и меток, на которые нет переходов),
+        # а ветка не должна продолжаться в него
+        j = end + 1
+        while j < len(code) and code[j][1] == Bytecode.LABEL and refs[code[j][2][0]] == 0:
+            j += 1
+        if code[end - 1][1] not in _NO_FALLTHROUGH or j >= len(code) or _loaded_var(code[j], keep=False) != var:
+            break
+        i = j
+    if len(cases) < 2:
+        return None
+    return cases, default
+
+
+def _loaded_var(inst: BytecodeType, keep: bool) -> tuple[Scope, int] | None:
+    """
+    :param keep: учитывать ли `STORE_*_KEEP` (оставляет значение величины в стеке)
+    :return: область видимости и ячейка величины, которую инструкция загружает в стек
+    """
+    if inst[1] == Bytecode.LOAD_STR:
+        return inst[2]
+    if inst[1] in _VAR_LOADS and (keep or inst[1] in (Bytecode.LOAD_GLOBAL, Bytecode.LOAD_LOCAL)):
+        return _VAR_LOADS[inst[1]], inst[2][0]
+    return None
+
+
+def _fuse_compare_jumps(code: list[BytecodeType]) -> list[BytecodeType]:
+    """
+    Заменяет сравнение, сразу за которым идёт `JUMP_IF_FALSE` или `JUMP_IF_TRUE`, на `COMPARE_AND_JUMP`:
+    результат сравнения не попадает в стек.
+    """
+    res: list[BytecodeType] = []
+    for inst in code:
+        if inst[1] in (Bytecode.JUMP_IF_FALSE, Bytecode.JUMP_IF_TRUE) and res and res[-1][1] in _COMPARE_OPS:
+            compare = res.pop()
+            res.append((inst[0], Bytecode.COMPARE_AND_JUMP, (inst[2][0], compare[1], inst[1] == Bytecode.JUMP_IF_TRUE)))
+        else:
+            res.append(inst)
+    return res
@@ -0,0 +1,66 @@
+from collections.abc import Callable
+from threading import Lock, Timer
+
+# сколько символов вывода накапливается, прежде чем они будут переданы дальше
+DEFAULT_OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+class OutputBuffer:
+    """
+    Накапливает вывод программы и передаёт его в `output_f` одной строкой:
+    когда накопилось `buffer_size` символов, по команде `flush` (перед вводом, в конце программы,
+    при ошибке) и, если задан `flush_interval`, по таймеру не позже чем через столько секунд после вывода.
+    По таймеру `output_f` вызывается из другого потока.
+    """
+
+    __slots__ = ('output_f', 'buffer_size', 'flush_interval', 'parts', 'size', 'lock', 'timer')
+
+    def __init__(
+        self,
+        output_f: Callable[[str], None],
+        buffer_size: int = DEFAULT_OUTPUT_BUFFER_SIZE,
+        flush_interval: float | None = None,
+    ) -> None:
+        """
+        :param output_f: функция, в неё передаётся строка для вывода
+        :param buffer_size: наибольшее количество накопленных символов, `0` - выводить сразу
+        :param flush_interval: наибольшее время в секундах между выводом и его передачей в `output_f`,
+                               `None` - не ограничено
+        """
+        self.output_f = output_f
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.parts: list[str] = []
+        self.size = 0
+        # `output_f` вызывается под блокировкой, чтобы вывод из разных потоков не перемешался
+        self.lock = Lock()
+        # таймер, который передаст вывод, накопленный после его запуска
+        self.timer: Timer | None = None
+
+    def write(self, text: str) -> None:
+        with self.lock:
+            self.parts.append(text)
+            self.size += len(text)
+            if self.size >= self.buffer_size:
+                self._flush()
+            elif self.flush_interval is not None and self.timer is None:
+                self.timer = Timer(self.flush_interval, self._on_timer)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self) -> None:
+        """Передаёт весь накопленный вывод в `output_f`."""
+        with self.lock:
+            self._flush()
+
+    def _on_timer(self) -> None:
+        with self.lock:
+            self.timer = None
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.parts:
+            text = ''.join(self.parts)
+            self.parts.clear()
+            self.size = 0
+            self.output_f(text)
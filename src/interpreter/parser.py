@@ -242,6 +242,9 @@ class Parser:
         if self.cur_token.kind == 'TYPE':
             typename = self.cur_token.value
             self._next_token()
+            if self.cur_token.value == 'таб':
+                typename += 'таб'
+                self._next_token()
         else:
             typename = ''
 
@@ -250,9 +253,25 @@ class Parser:
         else:
             name = self.cur_token.value
         self._next_token()
+        if self.cur_token.value == '[':
+            self._skip_table_bounds()
 
         return kind, typename, name
 
+    def _skip_table_bounds(self) -> None:
+        """Пропускает границы таблицы-параметра (`[1:n]`), границы таблицы-аргумента не проверяются."""
+        depth = 0
+        while True:
+            if self.cur_token.value == '[':
+                depth += 1
+            elif self.cur_token.value == ']':
+                depth -= 1
+            elif self.cur_token.kind == 'NEWLINE':
+                raise SyntaxException(self.line, self.cur_token.value)
+            self._next_token()
+            if depth == 0:
+                return
+
     def _handle_statement(self) -> None:
         if self.cur_token.value == 'использовать' and Env.INTRODUCTION in self.envs:
             self._handle_use()
@@ -656,9 +675,10 @@ class Parser:
                 open_table_brackets += 1
             elif self.cur_token.value == ']':
                 close_table_brackets += 1
-            if (in_alg_call and close_brackets - open_brackets == 1) or (
-                in_getitem and close_table_brackets - open_table_brackets == 1
-            ):
+            if in_alg_call and close_brackets - open_brackets == 1:
+                # закрывающая скобка вызова пропускается в `_parse_call`, после неё аргументы закончились
+                break
+            if in_getitem and close_table_brackets - open_table_brackets == 1:
                 self._next_token()
                 break
 
@@ -736,8 +756,9 @@ class Parser:
             self._next_token()
             args.append(self._parse_expr(in_alg_call=True))
 
-        while self.cur_token.value == ')':
-            self._next_token()
+        if self.cur_token.value != ')':
+            raise SyntaxException(self.line, self.cur_token.value, 'нет ")"')
+        self._next_token()
 
         if self.cur_token.value == '\n':
             return Call(self.line - 1, name, args)
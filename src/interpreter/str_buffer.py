@@ -0,0 +1,40 @@
+import sys
+from array import array
+
+# код типа `array` для символов Unicode (`'u'` устарел начиная с Python 3.13)
+_TYPECODE = 'w' if sys.version_info >= (3, 13) else 'u'
+
+
+class StrBuffer:
+    """
+    Изменяемое значение `лит`: символы хранятся в `array`, поэтому дописывание в конец (`с := с + х`)
+    и замена символа (`с[i] := х`) не копируют всю строку.
+    Буфер хранится только в ячейке величины, наружу (в стек) строка выходит как `str`,
+    которая запоминается до следующего изменения.
+    """
+
+    __slots__ = ('chars', 'text')
+
+    def __init__(self, text: str) -> None:
+        self.chars = array(_TYPECODE, text)
+        # строка, равная содержимому буфера, `None` - буфер изменился после её создания
+        self.text: str | None = text
+
+    def __str__(self) -> str:
+        if self.text is None:
+            self.text = self.chars.tounicode()
+        return self.text
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def __getitem__(self, index: int) -> str:
+        return self.chars[index]
+
+    def __setitem__(self, index: int, char: str) -> None:
+        self.chars[index] = char
+        self.text = None
+
+    def append(self, text: str) -> None:
+        self.chars.fromunicode(text)
+        self.text = None
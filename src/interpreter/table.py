@@ -0,0 +1,341 @@
+import itertools
+import math
+from array import array
+from collections.abc import Iterable, Sequence
+
+from .exceptions import RuntimeException
+from .value import Value, bool_value
+
+try:
+    import numpy
+except ImportError:  # таблицы NumPy недоступны, используются только таблицы `Table`
+    numpy = None
+
+# тип элементов: код типа `array`; элементы остальных типов хранятся в списке
+ARRAY_TYPECODES = {
+    'цел': 'q',
+    'вещ': 'd',
+    'лог': 'b',
+}
+
+
+# тип элементов: тип элементов массива NumPy (в `NumpyTable` хранятся только числа)
+NUMPY_DTYPES = {
+    'цел': 'int64',
+    'вещ': 'float64',
+}
+
+# элементы хранятся страницами по `PAGE_SIZE` штук, страница создаётся при первой записи в неё
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+# размер ссылки на элемент в списке (для элементов, которые хранятся не в `array`)
+POINTER_SIZE = 8
+
+
+class Table:
+    """
+    Таблица: элементы всех измерений хранятся подряд в одном буфере (`array` для `цел`, `вещ` и `лог`),
+    индекс элемента в буфере вычисляется по нижним границам и шагам измерений.
+    Буфер разбит на страницы, которые создаются при первой записи, поэтому объявление
+    огромной таблицы ничего не стоит, пока в неё ничего не записано.
+    Какие элементы уже получили значение, отмечается в битовой карте каждой страницы.
+    Страница `цел`, в которую записано число больше 64 бит, становится списком: `цел` не ограничен по размеру.
+    Копия таблицы (`share`) использует те же страницы, пока одна из таблиц не изменится (копирование при записи).
+    """
+
+    __slots__ = ('typename', 'bounds', 'strides', 'offset', 'pages', 'defined', 'refs')
+
+    def __init__(self, typename: str, bounds: Sequence[tuple[int, int]]) -> None:
+        """
+        :param typename: тип элементов, например `'цел'` для `целтаб`
+        :param bounds: (нижняя граница, верхняя граница) для каждого измерения
+        """
+        self.typename = typename
+        self.bounds = tuple(bounds)
+        # на сколько элементов сдвигается позиция в буфере при увеличении индекса измерения на 1
+        strides = []
+        size = 1
+        for first, last in reversed(self.bounds):
+            strides.append(size)
+            size *= max(last - first + 1, 0)
+        self.strides = tuple(reversed(strides))
+        # позиция первого элемента в буфере (не 0 у строк многомерных таблиц)
+        self.offset = 0
+        # номер страницы: элементы и битовая карта; страниц, в которые ничего не записано, в словарях нет
+        self.pages: dict[int, array | list] = {}
+        self.defined: dict[int, bytearray] = {}
+        # сколько таблиц используют эти страницы (список общий у всех таких таблиц)
+        self.refs = [1]
+
+    @staticmethod
+    def memory_size(typename: str, bounds: Sequence[tuple[int, int]]) -> int:
+        """
+        :return: сколько байт займут элементы таблицы, если записать значения во все
+        """
+        size = 1
+        for first, last in bounds:
+            size *= max(last - first + 1, 0)
+        if typename in ARRAY_TYPECODES:
+            return size * array(ARRAY_TYPECODES[typename]).itemsize
+        return size * POINTER_SIZE
+
+    @property
+    def dims(self) -> int:
+        return len(self.bounds)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Количество элементов по каждому измерению."""
+        return tuple(max(last - first + 1, 0) for first, last in self.bounds)
+
+    def position(self, lineno: int, indexes: Sequence[int]) -> int:
+        """
+        :param indexes: индексы по всем измерениям таблицы
+        :return: позиция элемента в буфере
+        """
+        pos = self.offset
+        for index, (first, last), stride in zip(indexes, self.bounds, self.strides):
+            if not first <= index <= last:
+                raise RuntimeException(lineno, 'выход за границу таблицы')
+            pos += (index - first) * stride
+        return pos
+
+    def get(self, lineno: int, indexes: Sequence[int]) -> Value | None:
+        """
+        :return: значение элемента, `None` - значение элементу ещё не присвоено
+        """
+        pos = self.position(lineno, indexes)
+        page_n = pos >> PAGE_BITS
+        defined = self.defined.get(page_n)
+        i = pos & PAGE_MASK
+        if defined is None or not defined[i >> 3] & (1 << (i & 7)):
+            return None
+        if self.typename == 'лог':
+            return bool_value(self.pages[page_n][i])
+        return Value(self.typename, self.pages[page_n][i])
+
+    def set(self, lineno: int, indexes: Sequence[int], value: Value) -> None:
+        self._store(lineno, self.position(lineno, indexes), value.value)
+
+    def to_list(self, lineno: int) -> list:
+        """
+        :return: значения всех элементов подряд (как они лежат в буфере)
+        """
+        res = []
+        # элементы таблицы (и строки таблицы) занимают в буфере непрерывный участок
+        for pos in range(self.offset, self.offset + math.prod(self.shape)):
+            page_n = pos >> PAGE_BITS
+            defined = self.defined.get(page_n)
+            i = pos & PAGE_MASK
+            if defined is None or not defined[i >> 3] & (1 << (i & 7)):
+                raise RuntimeException(lineno, 'значение элемента таблицы не определено')
+            res.append(self.pages[page_n][i])
+        if self.typename == 'лог':
+            return [bool(v) for v in res]
+        return res
+
+    def assign(self, lineno: int, values: Iterable) -> None:
+        """
+        Присваивает значения всем элементам подряд, `values` - значения в порядке `to_list`.
+        """
+        for pos, value in zip(range(self.offset, self.offset + math.prod(self.shape)), values):
+            self._store(lineno, pos, value)
+
+    def share(self) -> 'Table':
+        """
+        :return: копия таблицы, страницы копируются только при первом изменении одной из таблиц
+        """
+        copy = Table.__new__(Table)
+        for attr in Table.__slots__:
+            setattr(copy, attr, getattr(self, attr))
+        self.refs[0] += 1
+        return copy
+
+    def release(self) -> None:
+        """Копия таблицы больше не нужна: её страницы снова принадлежат только другой таблице."""
+        self.refs[0] -= 1
+
+    def unshare(self) -> None:
+        """Копирует страницы, если их использует ещё и другая таблица."""
+        if self.refs[0] > 1:
+            self.refs[0] -= 1
+            self.refs = [1]
+            self.pages = {page_n: page[:] for page_n, page in self.pages.items()}
+            self.defined = {page_n: bytearray(bitmap) for page_n, bitmap in self.defined.items()}
+
+    def _store(self, lineno: int, pos: int, value) -> None:
+        if self.refs[0] > 1:
+            self.unshare()
+        page_n = pos >> PAGE_BITS
+        page = self.pages.get(page_n)
+        if page is None:
+            page = self.pages[page_n] = self._new_page()
+            self.defined[page_n] = bytearray(PAGE_SIZE >> 3)
+        i = pos & PAGE_MASK
+        try:
+            page[i] = value
+        except OverflowError:
+            page = self.pages[page_n] = page.tolist()
+            page[i] = value
+        self.defined[page_n][i >> 3] |= 1 << (i & 7)
+
+    def _new_page(self) -> array | list:
+        if self.typename in ARRAY_TYPECODES:
+            return array(ARRAY_TYPECODES[self.typename], [0]) * PAGE_SIZE
+        return [''] * PAGE_SIZE
+
+    def row(self, lineno: int, index: int) -> 'Table':
+        """
+        :return: таблица без первого измерения, которая использует тот же буфер (`а[i]` у таблицы `а[1:n, 1:m]`)
+        """
+        pos = self.position(lineno, (index,))
+        row = Table.__new__(Table)
+        row.typename = self.typename
+        row.bounds = self.bounds[1:]
+        row.strides = self.strides[1:]
+        row.offset = pos
+        row.pages = self.pages
+        row.defined = self.defined
+        row.refs = self.refs
+        return row
+
+
+class NumpyTable:
+    """
+    Таблица `цел` или `вещ`, элементы которой хранятся в массиве NumPy (`array`),
+    её используют операции над всей таблицей сразу (исполнитель `Массивы`).
+    Поддерживает те же операции, что и `Table`, включая копирование при записи.
+    Если значение `цел` не помещается в 64 бита, массив становится массивом объектов Python (`widen`).
+    """
+
+    __slots__ = ('typename', 'bounds', 'base', 'prefix', 'defined', 'refs')
+
+    def __init__(self, typename: str, bounds: Sequence[tuple[int, int]]) -> None:
+        """
+        :param typename: тип элементов, `'цел'` или `'вещ'`
+        :param bounds: (нижняя граница, верхняя граница) для каждого измерения
+        """
+        self.typename = typename
+        self.bounds = tuple(bounds)
+        shape = self.shape
+        # массив всей таблицы (общий у таблицы и её строк) и индексы строки в нём (`()` - вся таблица)
+        self.base = [numpy.zeros(shape, NUMPY_DTYPES[typename])]
+        self.prefix: tuple[int, ...] = ()
+        # отметки элементов, которым уже присвоено значение
+        self.defined = numpy.zeros(shape, bool)
+        self.refs = [1]
+
+    dims = Table.dims
+    shape = Table.shape
+
+    @property
+    def array(self):
+        """Элементы таблицы (для строки таблицы - часть массива всей таблицы)."""
+        return self.base[0][self.prefix]
+
+    def widen(self) -> None:
+        """Переводит массив в массив объектов Python, чтобы в нём поместились числа больше 64 бит."""
+        if self.base[0].dtype != object:
+            self.base[0] = self.base[0].astype(object)
+
+    def index(self, lineno: int, indexes: Sequence[int]) -> tuple[int, ...]:
+        """
+        :param indexes: индексы по всем измерениям таблицы
+        :return: индекс элемента в массиве NumPy
+        """
+        res = []
+        for index, (first, last) in zip(indexes, self.bounds):
+            if not first <= index <= last:
+                raise RuntimeException(lineno, 'выход за границу таблицы')
+            res.append(index - first)
+        return tuple(res)
+
+    def get(self, lineno: int, indexes: Sequence[int]) -> Value | None:
+        """
+        :return: значение элемента, `None` - значение элементу ещё не присвоено
+        """
+        i = self.index(lineno, indexes)
+        if not self.defined[i]:
+            return None
+        value = self.array[i]
+        # в массиве объектов лежат числа Python, в остальных - числа NumPy
+        return Value(self.typename, value if value.__class__ is int else value.item())
+
+    def set(self, lineno: int, indexes: Sequence[int], value: Value) -> None:
+        i = self.index(lineno, indexes)
+        if self.refs[0] > 1:
+            self.unshare()
+        try:
+            self.array[i] = value.value
+        except OverflowError:
+            self.widen()
+            self.array[i] = value.value
+        self.defined[i] = True
+
+    def to_list(self, lineno: int) -> list:
+        """
+        :return: значения всех элементов подряд
+        """
+        if not self.defined.all():
+            raise RuntimeException(lineno, 'значение элемента таблицы не определено')
+        return self.array.ravel().tolist()
+
+    def assign(self, lineno: int, values: Iterable) -> None:
+        """
+        Присваивает значения всем элементам подряд, `values` - значения в порядке `to_list`.
+        """
+        self.unshare()
+        array = self.array
+        values = list(itertools.islice(values, array.size))
+        try:
+            array[...] = numpy.array(values, array.dtype).reshape(array.shape)
+        except OverflowError:
+            self.widen()
+            self.array[...] = numpy.array(values, object).reshape(array.shape)
+        self.defined[...] = True
+
+    def share(self) -> 'NumpyTable':
+        """
+        :return: копия таблицы, массивы копируются только при первом изменении одной из таблиц
+        """
+        copy = NumpyTable.__new__(NumpyTable)
+        for attr in NumpyTable.__slots__:
+            setattr(copy, attr, getattr(self, attr))
+        self.refs[0] += 1
+        return copy
+
+    release = Table.release
+
+    def unshare(self) -> None:
+        """Копирует массивы, если их использует ещё и другая таблица (нужно перед любым изменением)."""
+        if self.refs[0] > 1:
+            self.refs[0] -= 1
+            self.refs = [1]
+            self.base = [self.array.copy()]
+            self.prefix = ()
+            self.defined = self.defined.copy()
+
+    def row(self, lineno: int, index: int) -> 'NumpyTable':
+        """
+        :return: таблица без первого измерения, которая использует тот же массив
+        """
+        i = self.index(lineno, (index,))
+        row = NumpyTable.__new__(NumpyTable)
+        row.typename = self.typename
+        row.bounds = self.bounds[1:]
+        row.base = self.base
+        row.prefix = self.prefix + i
+        row.defined = self.defined[i]
+        row.refs = self.refs
+        return row
+
+
+def new_table(typename: str, bounds: Sequence[tuple[int, int]], use_numpy: bool = False) -> Table | NumpyTable:
+    """
+    :param typename: тип элементов
+    :param use_numpy: хранить элементы в массиве NumPy, если NumPy установлен и тип элементов - число
+    """
+    if use_numpy and numpy is not None and typename in NUMPY_DTYPES:
+        return NumpyTable(typename, bounds)
+    return Table(typename, bounds)
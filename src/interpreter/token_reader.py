@@ -0,0 +1,147 @@
+import codecs
+import io
+import re
+from collections import deque
+from collections.abc import Callable, Iterator
+from typing import BinaryIO, TextIO
+from weakref import WeakKeyDictionary, ref
+
+# слово ввода: числа и логические значения отделяются друг от друга пробельными символами
+_TOKEN = re.compile(r'\S+')
+# сколько байт читается из потока за раз
+CHUNK_SIZE = 1 << 16
+
+
+class TokenReader:
+    """
+    Ввод по требованию: строки читаются по одной, только когда прочитано всё введённое раньше.
+    Числа, `лог` и `сим` вводятся по словам, `лит` - до конца строки.
+    """
+
+    __slots__ = ('read_line', 'line', 'pos', 'ahead')
+
+    def __init__(self, read_line: Callable[[], str]) -> None:
+        """
+        :param read_line: функция, возвращает следующую строку вместе с `'\\n'`, пустая строка - ввод закончился
+        """
+        self.read_line = read_line
+        # текущая строка и позиция первого непрочитанного символа в ней
+        self.line = ''
+        self.pos = 0
+        # строки, прочитанные заранее (`has_data`), но ещё не ставшие текущей
+        self.ahead: deque[str] = deque()
+
+    def token(self) -> str:
+        """
+        :return: следующее слово, `''` - ввод закончился
+        """
+        while self._fill():
+            match = _TOKEN.search(self.line, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return match.group()
+            self.pos = len(self.line)
+        return ''
+
+    def line_rest(self) -> str:
+        """
+        :return: непрочитанная часть текущей строки без перевода строки (если после последнего
+                 прочитанного слова строка закончилась - следующая строка), `''` - ввод закончился
+        """
+        if self.pos:
+            # пропускается разделитель после слова
+            self.pos = len(self.line) if not self.line[self.pos :].strip() else self.pos + 1
+        if not self._fill():
+            return ''
+        rest = self.line[self.pos :]
+        self.pos = len(self.line)
+        return rest.removesuffix('\n')
+
+    def at_end(self) -> bool:
+        """
+        :return: прочитан ли весь ввод (включая пробельные символы)
+        """
+        if self.pos < len(self.line):
+            return False
+        if not self.ahead:
+            self.ahead.append(self.read_line())
+        return not self.ahead[0]
+
+    def has_data(self) -> bool:
+        """
+        :return: остались ли непрочитанные непробельные символы, строки при этом не пропускаются
+        """
+        if _TOKEN.search(self.line, self.pos) is not None:
+            return True
+        for line in self.ahead:
+            if not line:
+                return False
+            if not line.isspace():
+                return True
+        while line := self.read_line():
+            self.ahead.append(line)
+            if not line.isspace():
+                return True
+        self.ahead.append('')
+        return False
+
+    def _fill(self) -> bool:
+        """
+        Делает текущей следующую строку, если текущая прочитана.
+        :return: `False` - ввод закончился
+        """
+        if self.pos >= len(self.line):
+            self.line = self.ahead.popleft() if self.ahead else self.read_line()
+            self.pos = 0
+        return self.pos < len(self.line)
+
+
+# открытый файл: читатель его строк (удаляется вместе с файлом)
+_file_readers: WeakKeyDictionary[TextIO, TokenReader] = WeakKeyDictionary()
+
+
+def file_reader(file: TextIO) -> TokenReader:
+    """
+    :return: читатель файла, один и тот же для всех `ввод` из этого файла
+    """
+    reader = _file_readers.get(file)
+    if reader is None:
+        # читатель не должен ссылаться на файл, иначе файл никогда не будет удалён из словаря
+        file_ref = ref(file)
+        reader = _file_readers[file] = TokenReader(lambda: file_ref().readline())
+    return reader
+
+
+def reset_file_reader(file: TextIO) -> None:
+    """Забывает прочитанное заранее, например, после перехода в начало файла."""
+    _file_readers.pop(file, None)
+
+
+def stream_lines(stream: BinaryIO, encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE) -> Callable[[], str]:
+    """
+    :param stream: двоичный поток, например `sys.stdin.buffer` или файл с вводом для проверки программы
+    :return: функция для `TokenReader`: возвращает следующую строку потока, который читается
+             кусками до `chunk_size` байт (`read1` не ждёт, пока наберётся весь кусок)
+    """
+    lines = _iter_lines(stream, encoding, chunk_size)
+    return lambda: next(lines, '')
+
+
+def _iter_lines(stream: BinaryIO, encoding: str, chunk_size: int) -> Iterator[str]:
+    # `'\r\n'` заменяется на `'\n'`, даже если попал на границу кусков
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    read = getattr(stream, 'read1', stream.read)
+    # начало строки, которая не закончилась в прочитанных кусках
+    tail: list[str] = []
+    while chunk := read(chunk_size):
+        lines = decoder.decode(chunk).split('\n')
+        if len(lines) > 1:
+            tail.append(lines[0])
+            yield ''.join(tail) + '\n'
+            for line in lines[1:-1]:
+                yield line + '\n'
+            tail = []
+        tail.append(lines[-1])
+    tail.append(decoder.decode(b'', final=True))
+    if last := ''.join(tail):
+        yield last
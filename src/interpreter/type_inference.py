@@ -0,0 +1,125 @@
+"""
+Правила вывода типов выражений во время построения байт-кода.
+
+Тип `None` означает, что тип выражения до выполнения неизвестен (например, это вызов
+необъявленного алгоритма) - тогда проверка откладывается до выполнения и используются
+общие инструкции `BIN_OP` и `UNARY_OP`.
+"""
+from .bytecode import Bytecode
+from .exceptions import RuntimeException
+
+NUMBERS = ('цел', 'вещ')
+
+# оператор: (инструкция для `цел`, инструкция для `вещ`)
+_ARITHMETIC_OPS = {
+    '+': (Bytecode.ADD_INT, Bytecode.ADD_FLOAT),
+    '-': (Bytecode.SUB_INT, Bytecode.SUB_FLOAT),
+    '*': (Bytecode.MUL_INT, Bytecode.MUL_FLOAT),
+    '/': (Bytecode.DIV, Bytecode.DIV),
+    '**': (Bytecode.POW_INT, Bytecode.POW_FLOAT),
+}
+_COMPARE_OPS = {
+    '=': Bytecode.EQ,
+    '<>': Bytecode.NE,
+    '<': Bytecode.LT,
+    '>': Bytecode.GT,
+    '<=': Bytecode.LE,
+    '>=': Bytecode.GE,
+}
+_LOGIC_OPS = {
+    'и': Bytecode.AND,
+    'или': Bytecode.OR,
+}
+
+
+def bin_op_type(lineno: int, op: str, left: str | None, right: str | None) -> tuple[str | None, Bytecode]:
+    """
+    Выводит тип результата бинарной операции, правила те же, что и у `VM.bin_op`.
+    :param left: тип левого операнда
+    :param right: тип правого операнда
+    :return: тип результата и инструкция для операции
+             (`BIN_OP`, если типы операндов неизвестны или для них нет отдельной инструкции)
+    """
+    if left is None or right is None:
+        return None, Bytecode.BIN_OP
+
+    # операции над разными типами можно проводить, только если это `цел` и `вещ` или `лит` и `сим`
+    if {left, right} == {'цел', 'вещ'}:
+        typename = 'вещ'
+    elif {left, right} == {'лит', 'сим'}:
+        typename = 'лит'
+    elif left != right:
+        raise RuntimeException(lineno, f'нельзя "{left} {op} {right}"')
+    else:
+        typename = right
+
+    if op in _ARITHMETIC_OPS and right in NUMBERS:
+        if op == '/':
+            typename = 'вещ'
+        return typename, _ARITHMETIC_OPS[op][typename == 'вещ']
+    elif op == '+' and right in ('лит', 'сим'):
+        return 'лит', Bytecode.CONCAT_STR  # <сим> + <сим> = <лит>
+    elif op in ('=', '<>', '<', '>') or (op in ('<=', '>=') and right in NUMBERS):
+        return 'лог', _COMPARE_OPS[op]
+    elif op in _LOGIC_OPS and typename == 'лог':
+        return 'лог', _LOGIC_OPS[op]
+    raise RuntimeException(lineno, f'нельзя "{left} {op} {right}"')
+
+
+def unary_op_type(lineno: int, op: str, operand: str | None) -> tuple[str | None, Bytecode | None]:
+    """
+    Выводит тип результата унарной операции, правила те же, что и у `VM.unary_op`.
+    :return: тип результата и инструкция для операции (`None` - инструкция не нужна, как у `+x`)
+    """
+    if operand is None:
+        return None, Bytecode.UNARY_OP
+    if op == 'не':
+        if operand != 'лог':
+            raise RuntimeException(lineno, f'нельзя "не {operand}"')
+        return 'лог', Bytecode.NOT
+    if operand not in NUMBERS:
+        raise RuntimeException(lineno, f'нельзя "{op}{operand}"')
+    if op == '+':
+        return operand, None
+    return operand, Bytecode.NEG_INT if operand == 'цел' else Bytecode.NEG_FLOAT
+
+
+def arg_type_matches(arg_type: str, typename: str) -> bool:
+    """
+    :param arg_type: тип параметра; у алгоритмов исполнителей бывают общие типы:
+                     `таб` - таблица любого типа, `число` - `цел` или `вещ`
+    :param typename: тип аргумента
+    """
+    if arg_type == 'таб':
+        return typename.endswith('таб')
+    if arg_type == 'число':
+        return typename in NUMBERS
+    return arg_type == typename
+
+
+def ret_type(alg_ret_type: str, arg_types: list[str | None]) -> str | None:
+    """
+    :param alg_ret_type: тип значения алгоритма; у алгоритмов исполнителей бывает общий тип
+                         `число` - `вещ`, если среди аргументов есть `вещ` или `вещтаб`, иначе `цел`
+    :param arg_types: типы аргументов
+    :return: тип значения вызова или `None`, если он неизвестен или у алгоритма нет значения
+    """
+    if alg_ret_type != 'число':
+        return alg_ret_type or None
+    if None in arg_types:
+        return None
+    return 'вещ' if any(typename.removesuffix('таб') == 'вещ' for typename in arg_types) else 'цел'
+
+
+def item_type(typename: str | None, indexes_n: int) -> str | None:
+    """
+    :param typename: тип величины, из которой берётся элемент
+    :param indexes_n: количество индексов
+    :return: тип элемента или `None`, если он неизвестен
+    """
+    if typename == 'лит' and indexes_n == 1:
+        return 'сим'
+    if typename is not None and typename.endswith('таб') and typename != 'таб':
+        # индексы берутся все сразу (`GET_ITEM_N`), их количество проверяется во время выполнения
+        return typename.removesuffix('таб')
+    return None
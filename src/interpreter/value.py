@@ -1,10 +1,30 @@
 from dataclasses import dataclass
-from typing import Optional, Union, TextIO, TypeAlias
-
-Table: TypeAlias = dict[int, Optional['Value']]
+from typing import Any, TextIO
 
 
 @dataclass
 class Value:
     typename: str
-    value: str | int | float | TextIO | dict[int, Optional[Union['Value', Table]]]
+    # для таблиц - `table.Table`
+    value: str | int | float | bool | TextIO | Any
+
+
+# Значения типа `лог` хранятся как `bool`, эти два значения общие для всей программы
+TRUE = Value('лог', True)
+FALSE = Value('лог', False)
+
+
+def bool_value(b: bool) -> Value:
+    """
+    :return: общее значение типа `лог` для `b`
+    """
+    return TRUE if b else FALSE
+
+
+def format_value(value: Value) -> str:
+    """
+    :return: значение в том виде, в котором оно выводится пользователю (`лог` - `да` или `нет`)
+    """
+    if value.typename == 'лог':
+        return 'да' if value.value else 'нет'
+    return str(value.value)
@@ -1,16 +1,58 @@
-import re
+import operator
 from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import TypeAlias, Any, TextIO
 
 from .actors import actors
-from .actors.base import KumirFunc, KumirValue
-from .bytecode import Bytecode, BytecodeType
+from .actors.base import KumirFunc
+from .algorithm import is_input_arg
+from .bytecode import Bytecode, BytecodeType, Scope
 from .constants import AlgsList
 from .exceptions import RuntimeException
-from .value import Value
-
-Namespace: TypeAlias = dict[str, tuple[str, Value | None]]
+from .output_buffer import DEFAULT_OUTPUT_BUFFER_SIZE, OutputBuffer
+from .str_buffer import StrBuffer
+from .table import Table, new_table
+from .token_reader import TokenReader, file_reader
+from .type_inference import arg_type_matches
+from .value import Value, FALSE, TRUE, bool_value, format_value
+
+# Ячейки величин одной области видимости
+Slots: TypeAlias = list[Value | None]
+# Декодированная инструкция; возвращает `True`, если сменился текущий кадр или программа остановлена
+Handler: TypeAlias = Callable[[], bool | None]
+
+DEFAULT_MAX_CALL_DEPTH = 10_000
+# инструкция сравнения: функция сравнения для COMPARE_AND_JUMP
+_COMPARE_FUNCS = {
+    Bytecode.EQ: operator.eq,
+    Bytecode.NE: operator.ne,
+    Bytecode.LT: operator.lt,
+    Bytecode.GT: operator.gt,
+    Bytecode.LE: operator.le,
+    Bytecode.GE: operator.ge,
+}
+# наибольший размер значений одной таблицы в байтах
+DEFAULT_TABLE_MEMORY_LIMIT = 2**30
+
+
+@dataclass(slots=True)
+class Frame:
+    """Кадр вызова: состояние выполнения кода программы или одного вызова алгоритма."""
+
+    code: list[Handler]
+    # номер следующей инструкции
+    pc: int = 0
+    locals: Slots = field(default_factory=list)
+    # имя алгоритма, `None` - код вне алгоритмов
+    alg: str | None = None
+    # ячейки, в которые нужно записать значения параметров `рез` и `аргрез`
+    res_targets: tuple[tuple[Scope, int], ...] = ()
+    # номер цикла: [счётчик, граница, шаг] для `нц для` или [осталось повторений] для `нц N раз`
+    loops: dict[int, list[int]] = field(default_factory=dict)
+    # копии таблиц-аргументов `арг`, которые используют память таблиц вызывающего
+    shared_tables: tuple[Any, ...] = ()
 
 
 class VM:
@@ -18,149 +60,258 @@ class VM:
         self,
         bytecode: list[BytecodeType],
         output_f: Callable[[str], None],
-        input_f: Callable[[], str],
+        input_f: Callable[[], str] | None = None,
         algs: AlgsList | None = None,
         work_dir: str = Path.home() / 'Kumir',
         cur_dir: str | None = None,
         cur_file: str | None = None,
+        max_call_depth: int = DEFAULT_MAX_CALL_DEPTH,
+        table_memory_limit: int = DEFAULT_TABLE_MEMORY_LIMIT,
+        output_buffer_size: int = DEFAULT_OUTPUT_BUFFER_SIZE,
+        output_flush_interval: float | None = None,
+        input_reader: TokenReader | None = None,
     ) -> None:
         """
         :param bytecode: список команд байт-кода
         :param output_f: функция, в неё передаётся строка для вывода
-        :param input_f: функция, вызывается для получения ввода пользователя
+        :param input_f: функция, вызывается для получения ввода пользователя (строки)
         :param algs: словарь алгоритмов в программе
+        :param max_call_depth: наибольшая глубина вложенных вызовов алгоритмов
+        :param table_memory_limit: наибольший размер значений одной таблицы в байтах,
+                                   объявление таблицы большего размера - ошибка
+        :param output_buffer_size: сколько символов вывода накапливать перед передачей в `output_f`,
+                                   `0` - передавать сразу
+        :param output_flush_interval: наибольшее время в секундах, которое вывод может оставаться
+                                      в буфере, `None` - не ограничено
+        :param input_reader: источник ввода по словам (например, из `sys.stdin`) вместо `input_f`;
+                             задать нужно ровно одно из них
         """
+        if (input_f is None) == (input_reader is None):
+            raise ValueError('нужно задать либо input_f, либо input_reader')
         self.output_f = output_f
+        # вывод на экран; передаётся в `output_f` перед вводом, при остановке, ошибке и в конце программы
+        self.output_buffer = OutputBuffer(output_f, output_buffer_size, output_flush_interval)
         self.input_f = input_f
+        self.input_reader = input_reader
         self.bytecode = bytecode
         self.algs = algs or {}
-        self.actors_algs: dict[
-            str,
-            tuple[
-                list[tuple[str, str, str]],
-                str,
-                Callable[[list[Value]], Value | None] | Callable[[list[KumirValue], Any], KumirValue | None],
-            ],
-        ] = {}
+        self.actors_algs: dict[str, KumirFunc] = {}
 
         self.work_dir = work_dir
         self.cur_dir = cur_dir
         self.cur_file = cur_file
-
-        self.glob_vars: Namespace = {'нс': ('лит', Value('лит', '\n'))}
+        self.max_call_depth = max_call_depth
+        self.table_memory_limit = table_memory_limit
+        # хранить новые таблицы `цел` и `вещ` в массивах NumPy (включается исполнителем `Массивы`)
+        self.numpy_tables = False
+
+        # (имя, тип) и значения глобальных величин
+        self.glob_names: tuple[tuple[str, str], ...] = ()
+        self.globals: Slots = []
         self.stack: list[Value | None] = []
 
-        # Локальные переменные текущих функций
-        self.call_stack: list[Namespace] = []
-        self.in_alg = False
-
-        self.cur_tags: list[int] = []
-
-        self.cur_algs: list[str] = []
-        self.cur_algs_inst_n: list[int] = [0]
-
-        self.res_vars: list[str] = []
+        # Кадры текущих вызовов, последний - выполняемый сейчас
+        self.frames: list[Frame] = []
+        self.frame: Frame | None = None
+        # Локальные величины текущего кадра
+        self.locals: Slots = []
 
         self.stopped = False
 
-        self.CALL_TRANSITIONS = {
-            Bytecode.LOAD_CONST: lambda inst: self.stack.append(inst[2][0]),
-            Bytecode.LOAD_NAME: lambda inst: self.load_name(inst[0], inst[2][0]),
-            Bytecode.MAKE_TABLE: lambda inst: self.make_table(*inst[2]),
-            Bytecode.BIN_OP: lambda inst: self.bin_op(inst[0], inst[2][0]),
-            Bytecode.UNARY_OP: lambda inst: self.unary_op(inst[0], inst[2][0]),
-            Bytecode.STORE: lambda inst: self.store_var(inst[0], inst[2][0], inst[2][1]),
-            Bytecode.OUTPUT: lambda inst: self.output(inst[0], inst[2][0]),
-            Bytecode.INPUT: lambda inst: self.input(inst[0], inst[2]),
-            Bytecode.SET_RES_VAR: lambda inst: self.res_vars.append(inst[2][0]),
-            Bytecode.CALL: lambda inst: self.call(inst[0], inst[2][0]),
-            Bytecode.RET: lambda inst: self.ret(inst[0]),
-            Bytecode.JUMP_TAG: lambda inst: self.jump_tag(inst[2][0]),
-            Bytecode.JUMP_TAG_IF_FALSE: lambda inst: self.jump_tag_if_false(inst[0], inst[2][0]),
-            Bytecode.JUMP_TAG_IF_TRUE: lambda inst: self.jump_tag_if_true(inst[0], inst[2][0]),
-            Bytecode.ASSERT: lambda inst: self.assert_(inst[0]),
-            Bytecode.STOP: lambda inst: self.stop(),
-            Bytecode.GET_ITEM: lambda inst: self.get_item(inst[0]),
-            Bytecode.SET_ITEM: lambda inst: self.set_item(inst[0], *inst[2]),
-            Bytecode.MAKE_SLICE: lambda inst: self.slice(inst[0]),
-            Bytecode.USE: lambda inst: self.use(inst[0], inst[2][0]),
+        # Декодеры: превращают инструкцию байт-кода в функцию без аргументов
+        # с заранее распакованными операндами
+        self.DECODERS: dict[Bytecode, Callable[[int, tuple], Handler]] = {
+            Bytecode.GLOBALS: lambda lineno, args: partial(self.make_globals, args),
+            Bytecode.LOAD_CONST: lambda lineno, args: partial(self.stack.append, args[0]),
+            Bytecode.LOAD_GLOBAL: lambda lineno, args: partial(self.load_global, lineno, args[0]),
+            Bytecode.LOAD_LOCAL: lambda lineno, args: partial(self.load_local, lineno, args[0]),
+            Bytecode.MAKE_TABLE: lambda lineno, args: partial(self.make_table, lineno, *args),
+            Bytecode.BIN_OP: lambda lineno, args: partial(self.bin_op, lineno, args[0]),
+            Bytecode.UNARY_OP: lambda lineno, args: partial(self.unary_op, lineno, args[0]),
+            Bytecode.ADD_INT: lambda lineno, args: self.add_int,
+            Bytecode.ADD_FLOAT: lambda lineno, args: self.add_float,
+            Bytecode.SUB_INT: lambda lineno, args: self.sub_int,
+            Bytecode.SUB_FLOAT: lambda lineno, args: self.sub_float,
+            Bytecode.MUL_INT: lambda lineno, args: self.mul_int,
+            Bytecode.MUL_FLOAT: lambda lineno, args: self.mul_float,
+            Bytecode.DIV: lambda lineno, args: self.div,
+            Bytecode.POW_INT: lambda lineno, args: self.pow_int,
+            Bytecode.POW_FLOAT: lambda lineno, args: self.pow_float,
+            Bytecode.CONCAT_STR: lambda lineno, args: self.concat_str,
+            Bytecode.EQ: lambda lineno, args: self.eq,
+            Bytecode.NE: lambda lineno, args: self.ne,
+            Bytecode.LT: lambda lineno, args: self.lt,
+            Bytecode.GT: lambda lineno, args: self.gt,
+            Bytecode.LE: lambda lineno, args: self.le,
+            Bytecode.GE: lambda lineno, args: self.ge,
+            Bytecode.AND: lambda lineno, args: self.and_,
+            Bytecode.OR: lambda lineno, args: self.or_,
+            Bytecode.NOT: lambda lineno, args: self.not_,
+            Bytecode.NEG_INT: lambda lineno, args: self.neg_int,
+            Bytecode.NEG_FLOAT: lambda lineno, args: self.neg_float,
+            Bytecode.STORE_GLOBAL: lambda lineno, args: partial(self.store_global, lineno, *args),
+            Bytecode.STORE_LOCAL: lambda lineno, args: partial(self.store_local, lineno, *args),
+            Bytecode.STORE_GLOBAL_KEEP: lambda lineno, args: partial(self.store_global_keep, lineno, *args),
+            Bytecode.STORE_LOCAL_KEEP: lambda lineno, args: partial(self.store_local_keep, lineno, *args),
+            Bytecode.NAME_ERROR: lambda lineno, args: partial(self.name_error, lineno, args[0]),
+            Bytecode.OUTPUT: lambda lineno, args: partial(self.output, lineno, args[0]),
+            Bytecode.INPUT: lambda lineno, args: partial(self.input, lineno, args),
+            Bytecode.CALL: lambda lineno, args: partial(self.call, lineno, *args),
+            Bytecode.CALL_NATIVE: lambda lineno, args: partial(
+                self.call_native, lineno, args[0].py_func, args[1], self._extra_args(args[0])
+            ),
+            Bytecode.RET: lambda lineno, args: partial(self.ret, lineno),
+            Bytecode.JUMP: lambda lineno, args: partial(self.jump, args[0]),
+            Bytecode.JUMP_IF_FALSE: lambda lineno, args: partial(self.jump_if_false, lineno, args[0]),
+            Bytecode.JUMP_IF_TRUE: lambda lineno, args: partial(self.jump_if_true, lineno, args[0]),
+            Bytecode.JUMP_IF_FALSE_OR_POP: lambda lineno, args: partial(self.jump_if_false_or_pop, args[0]),
+            Bytecode.JUMP_IF_TRUE_OR_POP: lambda lineno, args: partial(self.jump_if_true_or_pop, args[0]),
+            Bytecode.SWITCH: lambda lineno, args: partial(self.switch, *args),
+            Bytecode.COMPARE_AND_JUMP: lambda lineno, args: partial(
+                self.compare_and_jump_if_true if args[2] else self.compare_and_jump_if_false,
+                args[0],
+                _COMPARE_FUNCS[args[1]],
+            ),
+            Bytecode.FOR_RANGE_INIT: lambda lineno, args: partial(self.for_range_init, lineno, *args),
+            Bytecode.FOR_RANGE_NEXT: lambda lineno, args: partial(self.for_range_next, *args),
+            Bytecode.REPEAT_INIT: lambda lineno, args: partial(self.repeat_init, lineno, *args),
+            Bytecode.REPEAT_NEXT: lambda lineno, args: partial(self.repeat_next, *args),
+            Bytecode.ASSERT: lambda lineno, args: partial(self.assert_, lineno),
+            Bytecode.STOP: lambda lineno, args: self.stop,
+            Bytecode.GET_ITEM: lambda lineno, args: partial(self.get_item, lineno),
+            Bytecode.SET_ITEM: lambda lineno, args: partial(self.set_item, lineno, *args),
+            Bytecode.GET_ITEM_N: lambda lineno, args: partial(self.get_item_n, lineno, *args),
+            Bytecode.SET_ITEM_N: lambda lineno, args: partial(self.set_item_n, lineno, *args),
+            Bytecode.LOAD_STR: lambda lineno, args: partial(self.load_str, lineno, *args),
+            Bytecode.APPEND_STR: lambda lineno, args: partial(self.append_str, lineno, *args),
+            Bytecode.GET_CHAR: lambda lineno, args: partial(self.get_char, lineno, *args),
+            Bytecode.SET_CHAR: lambda lineno, args: partial(self.set_char, lineno, *args),
+            Bytecode.MAKE_SLICE: lambda lineno, args: partial(self.slice, lineno),
+            Bytecode.USE: lambda lineno, args: partial(self.use, lineno, *args),
         }
 
-        self.INSTS_WITHOUT_INCREASE_COUNTER = {
-            Bytecode.JUMP_TAG,
-            Bytecode.JUMP_TAG_IF_FALSE,
-            Bytecode.JUMP_TAG_IF_TRUE,
-        }
+        # после кода программы выполнение заканчивается
+        self.code = self._decode(bytecode) + [self._halt]
+        self.algs_code = {name: self._decode(alg.code) for name, alg in self.algs.items()}
+
+    def _decode(self, bc: list[BytecodeType]) -> list[Handler]:
+        """
+        Превращает список инструкций байт-кода в список обработчиков,
+        которые можно вызывать без аргументов.
+        """
+        return [self.DECODERS[inst[1]](inst[0], inst[2]) for inst in bc]
 
     def execute(self) -> None:
-        self._execute(self.bytecode)
-
-    def _execute(self, bc: list[BytecodeType]) -> None:
-        while self.cur_algs_inst_n[-1] < len(bc):
-            inst = bc[self.cur_algs_inst_n[-1]]
-            self.CALL_TRANSITIONS[inst[1]](inst)
-            if inst[1] == Bytecode.RET:
-                break
-            elif inst[1] == Bytecode.STOP:
-                self.stopped = True
-                break
-            if inst[1] not in self.INSTS_WITHOUT_INCREASE_COUNTER:
-                self.cur_algs_inst_n[-1] += 1
-
-            if self.stopped:
-                break
-
-    def store_var(self, lineno: int, typename: str | None, names: tuple[str, ...]) -> None:
-        """
-        Обрабатывает инструкцию STORE
+        self.frame = Frame(self.code)
+        self.frames = [self.frame]
+        try:
+            self._execute()
+        finally:
+            self.output_buffer.flush()
+
+    def _execute(self) -> None:
+        """
+        Выполняет обработчики текущего кадра, пока программа не закончится или не будет остановлена.
+        Вызовы алгоритмов не используют стек Python: `CALL` и `RET` только меняют текущий кадр.
+        """
+        frame = self.frame
+        code = frame.code
+        while True:
+            pc = frame.pc
+            frame.pc = pc + 1
+            if code[pc]():
+                if self.stopped or not self.frames:
+                    return
+                frame = self.frame
+                code = frame.code
+
+    def _halt(self) -> bool:
+        self.frames.pop()
+        self.frame = None
+        return True
+
+    @property
+    def glob_vars(self) -> dict[str, tuple[str, Value | None]]:
+        """
+        :return: словарь глобальных величин вида `{имя: (тип, значение)}`
+        """
+        return {name: (typename, value) for (name, typename), value in zip(self.glob_names, self.globals)}
+
+    def make_globals(self, names: tuple[tuple[str, str], ...]) -> None:
+        """
+        Обрабатывает инструкцию GLOBALS
+        :param names: (имя, тип) для каждой ячейки глобальных величин
+        """
+        self.glob_names = names
+        self.globals = [None] * len(names)
+
+    def load_global(self, lineno: int, slot: int) -> None:
+        value = self.globals[slot]
+        if value is None:
+            raise RuntimeException(lineno, 'нет значения у величины')
+        self.stack.append(value)
+
+    def load_local(self, lineno: int, slot: int) -> None:
+        value = self.locals[slot]
+        if value is None:
+            raise RuntimeException(lineno, 'нет значения у величины')
+        self.stack.append(value)
+
+    def store_global(self, lineno: int, slot: int, typename: str) -> None:
+        """
+        Обрабатывает инструкцию STORE_GLOBAL
         :param lineno: номер текущей строки
-        :param typename: тип переменной(ых), `None`, если нужно сохранить значения в уже объявленную переменную
-        :param names: имя/имена переменной(ых)
+        :param slot: номер ячейки величины
+        :param typename: тип величины
         """
-        if self.cur_algs:
-            for arg in self.algs[self.cur_algs[-1]][0]:
-                if arg[0] == 'арг' and arg[2] in names:
-                    raise RuntimeException(lineno, 'нельзя присвоить аргументу')
         value = self.stack.pop()
-        if typename is None:  # сохранение значения в уже объявленную переменную
-            if not self._var_defined(names[0]):
-                raise RuntimeException(lineno, f'имя "{names[0]}" не определено')
-            var = self._get_all_namespaces()[names[0]]
-            self._save_var(lineno, var[0], names[0], value)
-            return
-        if len(names) == 1:
-            self._save_var(lineno, typename, names[0], value)
-        else:  # объявление нескольких переменных (`цел а, б`)
-            for name in names:
-                self._save_var(lineno, typename, name, None)
-
-    def load_name(self, lineno: int, name: str) -> None:
-        try:
-            var = self.get_var(lineno, name)
-        except RuntimeException as e1:
-            if re.fullmatch(r'имя "[\w ]+" не определено \(строка \d+\)', e1.args[0]) is not None:
-                try:
-                    self.call(lineno, name)
-                except RuntimeException as e2:
-                    raise e2 from None
-            else:
-                raise e1 from None
-        else:
-            self.stack.append(var)
+        _check_value_type(lineno, typename, value)
+        self.globals[slot] = value
+
+    def store_local(self, lineno: int, slot: int, typename: str) -> None:
+        """
+        Обрабатывает инструкцию STORE_LOCAL
+        :param lineno: номер текущей строки
+        :param slot: номер ячейки величины
+        :param typename: тип величины
+        """
+        value = self.stack.pop()
+        _check_value_type(lineno, typename, value)
+        self.locals[slot] = value
+
+    def store_global_keep(self, lineno: int, slot: int, typename: str) -> None:
+        """Обрабатывает инструкцию STORE_GLOBAL_KEEP: как STORE_GLOBAL, но значение остаётся в стеке"""
+        value = self.stack[-1]
+        _check_value_type(lineno, typename, value)
+        self.globals[slot] = value
+
+    def store_local_keep(self, lineno: int, slot: int, typename: str) -> None:
+        """Обрабатывает инструкцию STORE_LOCAL_KEEP: как STORE_LOCAL, но значение остаётся в стеке"""
+        value = self.stack[-1]
+        _check_value_type(lineno, typename, value)
+        self.locals[slot] = value
+
+    def _slots(self, scope: Scope) -> Slots:
+        return self.locals if scope == Scope.LOCAL else self.globals
+
+    def name_error(self, lineno: int, name: str) -> None:
+        raise RuntimeException(lineno, f'имя "{name}" не определено')
 
-    def make_table(self, typename: str, length: int) -> None:
-        indexes: list[tuple[int, int]] = []
+    def make_table(self, lineno: int, typename: str, length: int) -> None:
+        """
+        Обрабатывает инструкцию MAKE_TABLE: элементы таблицы не создаются, пока в них ничего не записано
+        :param typename: тип таблицы, например `'целтаб'`
+        :param length: количество измерений (границы загружаются из стека)
+        """
+        bounds: list[tuple[int, int]] = []
         for _ in range(length):
             last_i = self.stack.pop().value
             first_i = self.stack.pop().value
-            indexes.append((first_i, last_i))
-        self.stack.append(Value(typename, self._build_table(indexes, len(indexes))))
-
-    def _build_table(self, indexes: list[tuple[int, int]], depth: int):
-        start_i, last_i = indexes[0]
-        return {
-            i: None if depth == 1 else self._build_table(indexes[1:], depth - 1) for i in range(start_i, last_i + 1)
-        }
+            bounds.append((first_i, last_i))
+        item_typename = typename.removesuffix('таб')
+        if Table.memory_size(item_typename, bounds) > self.table_memory_limit:
+            raise RuntimeException(lineno, 'слишком большая таблица')
+        self.stack.append(Value(typename, new_table(item_typename, bounds, self.numpy_tables)))
 
     def bin_op(self, lineno: int, op: str) -> None:
         """
@@ -193,21 +344,21 @@ class VM:
         elif op == '**' and a.typename in ('цел', 'вещ'):
             self.stack.append(Value(typename, b.value**a.value))
         elif op == '>=' and a.typename in ('цел', 'вещ'):
-            self.stack.append(Value('лог', _bool_to_str(b.value >= a.value)))
+            self.stack.append(TRUE if b.value >= a.value else FALSE)
         elif op == '<=' and a.typename in ('цел', 'вещ'):
-            self.stack.append(Value('лог', _bool_to_str(b.value <= a.value)))
+            self.stack.append(TRUE if b.value <= a.value else FALSE)
         elif op == '=':
-            self.stack.append(Value('лог', _bool_to_str(b.value == a.value)))
+            self.stack.append(TRUE if b.value == a.value else FALSE)
         elif op == '<>':
-            self.stack.append(Value('лог', _bool_to_str(b.value != a.value)))
+            self.stack.append(TRUE if b.value != a.value else FALSE)
         elif op == '>':
-            self.stack.append(Value('лог', _bool_to_str(b.value > a.value)))
+            self.stack.append(TRUE if b.value > a.value else FALSE)
         elif op == '<':
-            self.stack.append(Value('лог', _bool_to_str(b.value < a.value)))
+            self.stack.append(TRUE if b.value < a.value else FALSE)
         elif op == 'или' and typename == 'лог':
-            self.stack.append(Value('лог', _bool_to_str(_str_to_bool(b.value) or _str_to_bool(a.value))))
+            self.stack.append(TRUE if b.value or a.value else FALSE)
         elif op == 'и' and typename == 'лог':
-            self.stack.append(Value('лог', _bool_to_str(_str_to_bool(b.value) and _str_to_bool(a.value))))
+            self.stack.append(TRUE if b.value and a.value else FALSE)
         else:
             raise RuntimeException(lineno, f'нельзя "{b.typename} {op} {a.typename}"')
 
@@ -216,7 +367,7 @@ class VM:
         if op == 'не':
             if a.typename != 'лог':
                 raise RuntimeException(lineno, f'нельзя "не {a.typename}"')
-            self.stack.append(Value('лог', _bool_to_str(not _str_to_bool(a.value))))
+            self.stack.append(FALSE if a.value else TRUE)
         elif op in ('+', '-'):
             if a.typename not in ('цел', 'вещ'):
                 raise RuntimeException(lineno, f'нельзя "{op}{a.typename}"')
@@ -226,6 +377,110 @@ class VM:
             else:
                 self.stack.append(a)
 
+    # Операции с типами, проверенными при построении байт-кода: левый операнд заменяется результатом
+
+    def add_int(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('цел', stack[-1].value + a.value)
+
+    def add_float(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('вещ', stack[-1].value + a.value)
+
+    def sub_int(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('цел', stack[-1].value - a.value)
+
+    def sub_float(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('вещ', stack[-1].value - a.value)
+
+    def mul_int(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('цел', stack[-1].value * a.value)
+
+    def mul_float(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('вещ', stack[-1].value * a.value)
+
+    def div(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('вещ', stack[-1].value / a.value)
+
+    def pow_int(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('цел', stack[-1].value ** a.value)
+
+    def pow_float(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('вещ', stack[-1].value ** a.value)
+
+    def concat_str(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = Value('лит', stack[-1].value + a.value)
+
+    def eq(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value == a.value else FALSE
+
+    def ne(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value != a.value else FALSE
+
+    def lt(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value < a.value else FALSE
+
+    def gt(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value > a.value else FALSE
+
+    def le(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value <= a.value else FALSE
+
+    def ge(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value >= a.value else FALSE
+
+    def and_(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value and a.value else FALSE
+
+    def or_(self) -> None:
+        a = self.stack.pop()
+        stack = self.stack
+        stack[-1] = TRUE if stack[-1].value or a.value else FALSE
+
+    def not_(self) -> None:
+        stack = self.stack
+        stack[-1] = FALSE if stack[-1].value else TRUE
+
+    def neg_int(self) -> None:
+        stack = self.stack
+        stack[-1] = Value('цел', -stack[-1].value)
+
+    def neg_float(self) -> None:
+        stack = self.stack
+        stack[-1] = Value('вещ', -stack[-1].value)
+
     def output(self, lineno: int, exprs_num: int) -> None:
         """
         Обрабатывает инструкцию OUTPUT
@@ -240,195 +495,284 @@ class VM:
         if any('таб' in expr.typename for expr in exprs):
             raise RuntimeException(lineno, 'нет индексов у таблицы')
 
-        text = ''.join(map(lambda e: str(e.value), exprs))
+        text = ''.join(map(format_value, exprs))
         if to_file is None:
-            self.output_f(text)
+            self.output_buffer.write(text)
         else:
             to_file.write(text)
 
-    def input(self, lineno: int, targets: list[str | tuple[str, int]]) -> None:
+    def input(self, lineno: int, targets: tuple[tuple[Scope | None, int | str, str | None, int], ...]) -> None:
         """
         Обрабатывает инструкцию INPUT
         :param lineno: номер текущей строки кода
-        :param targets: список имён переменных, в которые необходимо записать ввод пользователя
+        :param targets: (область видимости, номер ячейки, тип, количество индексов) для каждой величины,
+                        в которую необходимо записать ввод пользователя; для необъявленной величины
+                        область видимости и тип - `None`, а вместо номера ячейки - имя
         """
-        from_file: TextIO | None = None
+        indexes = self._pop_indexes(lineno, sum(target[3] for target in targets))
+        for target in targets:
+            if target[0] is None:
+                raise RuntimeException(lineno, f'имя "{target[1]}" не определено')
+
+        reader = self.input_reader
+        if targets[0][2] == 'файл':
+            reader = file_reader(self._load_var(lineno, *targets[0][:2]).value)
+            targets = targets[1:]
+        elif reader is not None:
+            self.output_buffer.flush()
+
+        tokens: list[str] = []
+        for scope, slot, typename, indexes_n in targets:
+            target_indexes = indexes[:indexes_n]
+            indexes = indexes[indexes_n:]
+            var_type = typename.removesuffix('таб') if indexes_n else typename
+
+            if reader is not None:
+                inputted = reader.line_rest() if var_type == 'лит' else reader.token()
+            elif var_type == 'лит':
+                inputted = self._read_input()
+            else:
+                if not tokens:
+                    tokens = self._read_input().split(' ')[::-1]
+                inputted = tokens.pop()
 
-        cur_target_i = 0
-        while cur_target_i < len(targets):
-            indexes = []
-            target = targets[cur_target_i]
+            value = _convert_string_to_type(lineno, inputted, var_type)
+            if target_indexes:
+                self._set_item_table(lineno, target_indexes, value, self._load_var(lineno, scope, slot))
+            else:
+                _check_value_type(lineno, typename, value)
+                self._slots(scope)[slot] = value
 
-            (target_var, target_var_type, target_var_name, new_indexes) = self._get_target(lineno, target)
-            indexes.extend(new_indexes)
+    def _read_input(self) -> str:
+        # выведенное перед вводом (например, подсказка) должно быть видно, пока программа ждёт ввода
+        self.output_buffer.flush()
+        return self.input_f()
 
-            if cur_target_i == 0 and target_var_type == 'файл':
-                from_file = target_var[1].value
-                cur_target_i += 1
-                continue
+    def _pop_indexes(self, lineno: int, indexes_n: int) -> list[int]:
+        """
+        :return: `indexes_n` индексов из стека в том порядке, в котором они туда загружались
+        """
+        indexes: list[int] = []
+        for _ in range(indexes_n):
+            index = self.stack.pop()
+            _check_index_type(lineno, index)
+            indexes.append(index.value)
+        indexes.reverse()
+        return indexes
 
-            if from_file is None:
-                inputted = self.input_f()
-            else:
-                inputted = from_file.read()
-
-            if target_var_type == 'лит':
-                self._save_inputted(
-                    lineno,
-                    target_var_type,
-                    target_var_name,
-                    _convert_string_to_type(lineno, inputted, target_var_type),
-                    indexes,
-                )
-                cur_target_i += 1
-            elif 'таб' in target_var_type:
-                self._save_inputted(
-                    lineno,
-                    target_var_type,
-                    target_var_name,
-                    _convert_string_to_type(lineno, inputted, target_var_type.removesuffix('таб')),
-                    indexes,
-                )
-                cur_target_i += 1
-            else:
-                for text in inputted.split(' '):
-                    if cur_target_i >= len(targets):
-                        break
-                    target = targets[cur_target_i]
-                    (target_var, target_var_type, target_var_name, new_indexes) = self._get_target(lineno, target)
-                    self._save_inputted(
-                        lineno,
-                        target_var_type,
-                        target_var_name,
-                        _convert_string_to_type(lineno, text, target_var_type),
-                        indexes,
-                    )
-                    cur_target_i += 1
-
-    def _get_target(self, lineno: int, target: str | tuple[str, int]):
-        indexes = []
-        if isinstance(target, str):
-            try:
-                target_var = self._get_all_namespaces()[target]
-            except KeyError:
-                raise RuntimeException(lineno, f'имя "{target}" не определено') from None
-            target_var_type = target_var[0]
-            target_var_name = target
-        else:
-            target_var_name = target[0]
-            for _ in range(target[1]):
-                index = self.stack.pop()
-                if index.typename != 'цел':
-                    raise RuntimeException(lineno, 'индекс - не целое число')
-                indexes.append(index.value)
-            target_var = self._get_all_namespaces()[target_var_name]
-            target_var_type = target_var[0]
-
-        return target_var, target_var_type, target_var_name, indexes
-
-    def _save_inputted(
-        self,
-        lineno: int,
-        var_type: str,
-        var_name: str,
-        value: Value,
-        indexes: list[int],
-    ) -> None:
-        if indexes:
-            var = self._get_all_namespaces()[var_name][1]
-            self._set_item_table(lineno, var_name, indexes, value, var)
-        else:
-            self._save_var(lineno, var_type, var_name, value)
+    def _load_var(self, lineno: int, scope: Scope, slot: int) -> Value:
+        value = self._slots(scope)[slot]
+        if value is None:
+            raise RuntimeException(lineno, 'нет значения у величины')
+        return value
 
-    def call(self, lineno: int, name: str) -> None:
+    def call(self, lineno: int, name: str, res_targets: tuple[tuple[Scope, int], ...]) -> bool | None:
         """
         Обрабатывает инструкцию CALL
         :param lineno: номер текущей строки кода
         :param name: имя алгоритма, который нужно вызвать
+        :param res_targets: ячейки, в которые нужно записать значения параметров `рез` и `аргрез`
+        :return: `True`, если начато выполнение алгоритма программы (сменился текущий кадр)
         """
         if name in self.algs:
+            if len(self.frames) > self.max_call_depth:
+                raise RuntimeException(lineno, 'слишком глубокая рекурсия')
             alg = self.algs[name]
-            self.call_stack.append(self._load_args(lineno, alg[0]))
-            if alg[1]:  # ret_type
-                self.call_stack[-1]['знач'] = (alg[1], None)
-
-            for arg in alg[0]:
-                if arg[0] == 'рез':
-                    self.call_stack[-1][arg[2]] = (arg[1], None)
-
-            self.in_alg = True
-            self.cur_tags = alg[2][1]
-            self.cur_algs.append(name)
-            self.cur_algs_inst_n.append(0)
-            self._execute(alg[2][0])
+            local_vars: Slots = [None] * len(alg.locals)
+            # аргументы занимают первые ячейки алгоритма
+            for slot, value in zip(alg.in_slots, self._pop_args(lineno, alg.args)):
+                local_vars[slot] = value
+            # таблицы `арг` копируются только при изменении, `рез` и `аргрез` передаются без копирования
+            shared_tables = []
+            for slot in alg.shared_slots:
+                table = local_vars[slot].value.share()
+                local_vars[slot] = Value(local_vars[slot].typename, table)
+                shared_tables.append(table)
+
+            self.frame = Frame(
+                self.algs_code[name], 0, local_vars, name, res_targets, shared_tables=tuple(shared_tables)
+            )
+            self.frames.append(self.frame)
+            self.locals = local_vars
+            return True
         elif name in self.actors_algs:
-            alg = self.actors_algs[name]
-            args = self._load_args(lineno, alg[0])
-            py_args = [arg[1] for arg in args.values()]
+            func = self.actors_algs[name]
+            py_args = self._pop_args(lineno, func.args)
             try:
-                ret_v = alg[2](py_args, **self._get_extra_args(name))
+                ret_v = func.py_func(py_args, **self._extra_args(func))
             except RuntimeException as e:
-                raise RuntimeException(lineno, ' '.join(e.args[0].split()[:-2])) from None
+                raise RuntimeException(lineno, e.args[0]) from None
             else:
                 if isinstance(ret_v, Value):
                     self.stack.append(ret_v)
                 elif isinstance(ret_v, dict):
                     self.stack.append(ret_v['знач'])
-                    for arg in self.actors_algs[name][0]:
-                        if arg[0] == 'рез':
-                            self.call_stack[-1][arg[2]] = (arg[1], ret_v[arg[2]])
+                    res_args = [arg for arg in func.args if arg[0] == 'рез']
+                    for (scope, slot), arg in zip(res_targets, res_args):
+                        self._slots(scope)[slot] = ret_v[arg[2]]
         else:
             raise RuntimeException(lineno, f'имя "{name}" не определено')
 
-    def ret(self, lineno: int):
-        ret_type = self.algs[self.cur_algs[-1]][1]
-        if ret_type:
-            ret_v = self.call_stack[-1]['знач'][1]
+    def call_native(
+        self, lineno: int, py_func: Callable[..., Value | None], arity: int, extra_args: dict[str, Any]
+    ) -> None:
+        """
+        Обрабатывает инструкцию CALL_NATIVE: вызывает алгоритм исполнителя, типы аргументов которого уже проверены
+        :param py_func: функция алгоритма
+        :param arity: количество аргументов в стеке
+        :param extra_args: дополнительные именованные аргументы функции (`work_dir`, `prog_dir`)
+        """
+        stack = self.stack
+        start = len(stack) - arity
+        args = stack[start:]
+        del stack[start:]
+        try:
+            ret_v = py_func(args, **extra_args)
+        except RuntimeException as e:
+            raise RuntimeException(lineno, e.args[0]) from None
+        if ret_v is not None:
+            stack.append(ret_v)
+
+    def ret(self, lineno: int) -> bool:
+        frame = self.frames.pop()
+        alg = self.algs[frame.alg]
+        for table in frame.shared_tables:
+            table.release()
+        if alg.ret_type:
+            ret_v = frame.locals[len(alg.args)]
             if ret_v is not None:
-                self.stack.append(ret_v)
+                self.stack.append(_str_value(ret_v))
             else:
                 raise RuntimeException(lineno, 'функция должна возвращать значение')
-        for arg in self.algs[self.cur_algs[-1]][0]:
-            if 'рез' in arg[0]:
-                if arg[2] in self.call_stack[-1]:
-                    self.call_stack[-2][self.res_vars.pop()] = self.call_stack[-1][arg[2]]
 
-        self.cur_algs.pop()
-        if self.cur_algs:
-            self.cur_tags = self.algs[self.cur_algs[-1]][2][1]
-        self.cur_algs_inst_n.pop()
-        self.call_stack.pop()
+        self.frame = self.frames[-1]
+        self.locals = self.frame.locals
+        for (scope, slot), alg_slot in zip(frame.res_targets, alg.res_slots):
+            self._slots(scope)[slot] = frame.locals[alg_slot]
+        return True
 
-    def jump_tag(self, tag: int) -> None:
-        self.cur_algs_inst_n[-1] = self.cur_tags[tag]
+    def jump(self, target: int) -> None:
+        self.frame.pc = target
 
-    def jump_tag_if_false(self, lineno: int, tag: int) -> None:
+    def jump_if_false(self, lineno: int, target: int) -> None:
         cond = self.stack.pop()
         if cond.typename != 'лог':
             raise RuntimeException(lineno, 'условие не логическое')
-        if cond.value == 'нет':
-            self.jump_tag(tag)
-        else:
-            self.cur_algs_inst_n[-1] += 1
+        if not cond.value:
+            self.frame.pc = target
 
-    def jump_tag_if_true(self, lineno: int, tag: int) -> None:
+    def jump_if_true(self, lineno: int, target: int) -> None:
         cond = self.stack.pop()
         if cond.typename != 'лог':
             raise RuntimeException(lineno, 'условие не логическое')
-        if cond.value == 'да':
-            self.jump_tag(tag)
+        if cond.value:
+            self.frame.pc = target
+
+    def jump_if_false_or_pop(self, target: int) -> None:
+        """
+        Обрабатывает инструкцию JUMP_IF_FALSE_OR_POP (тип условия проверен при построении байт-кода)
+        """
+        if self.stack[-1].value:
+            self.stack.pop()
+        else:
+            self.frame.pc = target
+
+    def jump_if_true_or_pop(self, target: int) -> None:
+        if self.stack[-1].value:
+            self.frame.pc = target
         else:
-            self.cur_algs_inst_n[-1] += 1
+            self.stack.pop()
+
+    def compare_and_jump_if_false(self, target: int, compare: Callable[[Any, Any], bool]) -> None:
+        """
+        Обрабатывает инструкцию COMPARE_AND_JUMP, которая переходит, если сравнение неверно.
+        :param target: индекс инструкции, к которой нужно перейти
+        :param compare: функция сравнения (например, `operator.lt`)
+        """
+        a = self.stack.pop()
+        if not compare(self.stack.pop().value, a.value):
+            self.frame.pc = target
+
+    def compare_and_jump_if_true(self, target: int, compare: Callable[[Any, Any], bool]) -> None:
+        """Обрабатывает инструкцию COMPARE_AND_JUMP, которая переходит, если сравнение верно."""
+        a = self.stack.pop()
+        if compare(self.stack.pop().value, a.value):
+            self.frame.pc = target
+
+    def switch(self, default: int, cases: dict[Any, int]) -> None:
+        """
+        Обрабатывает инструкцию SWITCH: переходит к ветке `выбор`, значение для сравнения берётся из стека
+        :param default: индекс инструкции, если значение не равно ни одной константе
+        :param cases: константа: индекс первой инструкции ветки
+        """
+        self.frame.pc = cases.get(self.stack.pop().value, default)
+
+    def for_range_init(self, lineno: int, end: int, scope: Scope, slot: int, loop_n: int) -> None:
+        """
+        Обрабатывает инструкцию FOR_RANGE_INIT: начинает цикл `нц для`, начало, конец и шаг берутся из стека
+        :param end: индекс инструкции, к которой нужно перейти, если тело цикла не выполнится ни разу
+        :param scope: область видимости переменной цикла
+        :param slot: номер ячейки переменной цикла
+        :param loop_n: номер цикла
+        """
+        step, to, start = self.stack.pop(), self.stack.pop(), self.stack.pop()
+        for value in (start, to, step):
+            _check_value_type(lineno, 'цел', value)
+        if step.value == 0:
+            raise RuntimeException(lineno, 'шаг цикла равен нулю')
+
+        self._slots(scope)[slot] = start
+        self.frame.loops[loop_n] = [start.value, to.value, step.value]
+        if start.value > to.value if step.value > 0 else start.value < to.value:
+            self.frame.pc = end
+
+    def for_range_next(self, body: int, scope: Scope, slot: int, loop_n: int) -> None:
+        """
+        Обрабатывает инструкцию FOR_RANGE_NEXT: переходит к следующему значению переменной цикла `нц для`
+        :param body: индекс первой инструкции тела цикла
+        """
+        frame = self.frame
+        loop = frame.loops[loop_n]
+        i = loop[0] = loop[0] + loop[2]
+        (frame.locals if scope is Scope.LOCAL else self.globals)[slot] = Value('цел', i)
+        if i <= loop[1] if loop[2] > 0 else i >= loop[1]:
+            frame.pc = body
+
+    def repeat_init(self, lineno: int, end: int, loop_n: int) -> None:
+        """
+        Обрабатывает инструкцию REPEAT_INIT: начинает цикл `нц N раз`, число повторений берётся из стека
+        :param end: индекс инструкции, к которой нужно перейти, если тело цикла не выполнится ни разу
+        :param loop_n: номер цикла
+        """
+        count = self.stack.pop()
+        _check_value_type(lineno, 'цел', count)
+        if count.value > 0:
+            self.frame.loops[loop_n] = [count.value]
+        else:
+            self.frame.pc = end
+
+    def repeat_next(self, body: int, loop_n: int) -> None:
+        """
+        Обрабатывает инструкцию REPEAT_NEXT
+        :param body: индекс первой инструкции тела цикла
+        """
+        frame = self.frame
+        loop = frame.loops[loop_n]
+        loop[0] -= 1
+        if loop[0]:
+            frame.pc = body
 
     def assert_(self, lineno: int) -> None:
         cond = self.stack.pop()
         if cond.typename != 'лог':
             raise RuntimeException(lineno, 'условие не логическое')
-        if cond.value == 'нет':
+        if not cond.value:
             raise RuntimeException(lineno, 'условие ложно')
 
-    def stop(self) -> None:
-        self.output_f('СТОП.')
+    def stop(self) -> bool:
+        self.output_buffer.write('СТОП.')
+        self.stopped = True
+        return True
 
     def get_item(self, lineno: int) -> None:
         index = self.stack.pop()
@@ -436,10 +780,11 @@ class VM:
 
         var = self.stack.pop()
         if 'таб' in var.typename:
-            _check_table_index(lineno, index.value, var.value)
-            res = var.value[index.value]
-            if isinstance(res, dict):
-                res = Value(var.typename, res)
+            table = var.value
+            if table.dims > 1:
+                res = Value(var.typename, table.row(lineno, index.value))
+            else:
+                res = table.get(lineno, (index.value,))
         elif var.typename == 'лит':
             _check_str_index(lineno, index, var.value)
             res = Value('сим', var.value[index.value - 1])
@@ -450,47 +795,100 @@ class VM:
             raise RuntimeException(lineno, 'значение элемента таблицы не определено')
         self.stack.append(res)
 
-    def set_item(self, lineno: int, name: str, len_indexes: int) -> None:
-        indexes: list[int] = []
-        for _ in range(len_indexes):
-            index = self.stack.pop()
-            _check_index_type(lineno, index)
-            indexes.append(index.value)
-        indexes.reverse()
-
+    def set_item(self, lineno: int, scope: Scope, slot: int, typename: str, len_indexes: int) -> None:
+        indexes = self._pop_indexes(lineno, len_indexes)
         value = self.stack.pop()
-        var = self.get_var(lineno, name)
-        if 'таб' in var.typename:
-            self._set_item_table(lineno, name, indexes, value, var)
-        elif var.typename == 'лит':
+        var = self._load_var(lineno, scope, slot)
+        if 'таб' in typename:
+            self._set_item_table(lineno, indexes, value, var)
+        elif typename == 'лит':
             if len(indexes) > 1:
                 raise RuntimeException(lineno, 'лишние индексы')
-            self._set_item_str(lineno, name, indexes[0], value, var)
+            self._slots(scope)[slot] = _set_item_str(lineno, indexes[0], value, var)
         else:
             raise RuntimeException(lineno, 'лишние индексы')
 
-    def _set_item_table(self, lineno: int, var_name: str, indexes: list[int], value: Value, var: Value) -> None:
-        table_type = var.typename.removesuffix('таб')
-        if table_type != value.typename:
-            raise RuntimeException(lineno, f'нельзя "{table_type} := {value.typename}"')
+    def get_item_n(self, lineno: int, scope: Scope, slot: int, indexes_n: int) -> None:
+        """
+        Обрабатывает инструкцию GET_ITEM_N
+        :param scope: область видимости таблицы
+        :param slot: номер ячейки таблицы
+        :param indexes_n: количество индексов (они загружаются из стека)
+        """
+        indexes = self._pop_indexes(lineno, indexes_n)
+        table = self._load_var(lineno, scope, slot).value
+        _check_indexes_n(lineno, indexes_n, table.dims)
+        res = table.get(lineno, indexes)
+        if res is None:
+            raise RuntimeException(lineno, 'значение элемента таблицы не определено')
+        self.stack.append(res)
+
+    def set_item_n(self, lineno: int, scope: Scope, slot: int, indexes_n: int, check_type: str | None) -> None:
+        """
+        Обрабатывает инструкцию SET_ITEM_N: элемент меняется прямо в таблице, величина не перезаписывается
+        :param check_type: тип элементов, если тип значения нужно проверить во время выполнения
+        """
+        indexes = self._pop_indexes(lineno, indexes_n)
+        value = self.stack.pop()
+        if check_type is not None:
+            _check_value_type(lineno, check_type, value)
+        table = self._load_var(lineno, scope, slot).value
+        _check_indexes_n(lineno, indexes_n, table.dims)
+        table.set(lineno, indexes, value)
 
-        table_part = var.value
-        for index in indexes[:-1]:
-            _check_table_index(lineno, index, table_part)
-            table_part = table_part[index]
+    def load_str(self, lineno: int, scope: Scope, slot: int) -> None:
+        """
+        Обрабатывает инструкцию LOAD_STR: загружает величину `лит`, буфер превращается в `str`
+        """
+        self.stack.append(_str_value(self._load_var(lineno, scope, slot)))
 
-        _check_table_index(lineno, indexes[-1], table_part)
-        table_part[indexes[-1]] = value
+    def append_str(self, lineno: int, scope: Scope, slot: int) -> None:
+        """
+        Обрабатывает инструкцию APPEND_STR (`с := с + х`): дописывает значение из стека в буфер величины `лит`
+        """
+        value = self.stack.pop()
+        self._str_buffer(lineno, scope, slot).append(value.value)
 
-        self._save_var(lineno, var.typename, var_name, Value(var.typename, var.value))
+    def get_char(self, lineno: int, scope: Scope, slot: int) -> None:
+        """
+        Обрабатывает инструкцию GET_CHAR (`с[i]`), индекс загружается из стека
+        """
+        index = self.stack.pop()
+        string = self._load_var(lineno, scope, slot).value
+        _check_str_index(lineno, index, string)
+        self.stack.append(Value('сим', string[index.value - 1]))
 
-    def _set_item_str(self, lineno: int, var_name: str, index: int, value: Value, var: Value) -> None:
-        if value.typename == 'сим' or (value.typename == 'лит' and len(value.value) == 1):
-            new_val = var.value
-            new_val = new_val[: index - 1] + value.value + new_val[index:]
-            self._save_var(lineno, var.typename, var_name, Value('лит', new_val))
-        else:
+    def set_char(self, lineno: int, scope: Scope, slot: int) -> None:
+        """
+        Обрабатывает инструкцию SET_CHAR (`с[i] := х`): символ меняется прямо в буфере величины `лит`
+        """
+        index = self.stack.pop()
+        value = self.stack.pop()
+        if not (value.typename == 'сим' or (value.typename == 'лит' and len(value.value) == 1)):
             raise RuntimeException(lineno, f'нельзя "сим := {value.typename}"')
+        buffer = self._str_buffer(lineno, scope, slot)
+        _check_str_index(lineno, index, buffer)
+        buffer[index.value - 1] = value.value
+
+    def _str_buffer(self, lineno: int, scope: Scope, slot: int) -> StrBuffer:
+        """
+        :return: буфер величины `лит`, при первом изменении величины её строка заменяется буфером
+        """
+        var = self._load_var(lineno, scope, slot)
+        if var.value.__class__ is StrBuffer:
+            return var.value
+        buffer = StrBuffer(var.value)
+        self._slots(scope)[slot] = Value('лит', buffer)
+        return buffer
+
+    def _set_item_table(self, lineno: int, indexes: list[int], value: Value, var: Value) -> None:
+        table_type = var.typename.removesuffix('таб')
+        if table_type != value.typename:
+            raise RuntimeException(lineno, f'нельзя "{table_type} := {value.typename}"')
+
+        table = var.value
+        _check_indexes_n(lineno, len(indexes), table.dims)
+        table.set(lineno, indexes, value)
 
     def slice(self, lineno: int) -> None:
         var = self.stack.pop()
@@ -511,96 +909,74 @@ class VM:
 
         self.stack.append(Value('лит', res))
 
-    def use(self, lineno: int, actor_name: str) -> None:
+    def use(self, lineno: int, actor_name: str, var_slots: tuple[tuple[str, int], ...]) -> None:
+        """
+        Обрабатывает инструкцию USE
+        :param lineno: номер текущей строки кода
+        :param actor_name: имя исполнителя
+        :param var_slots: (имя, номер ячейки) для каждой глобальной величины исполнителя
+        """
         if actor_name not in actors.keys():
             raise RuntimeException(lineno, f'нет такого исполнителя')
-        self._load_actors_vars(actors[actor_name].vars)
-        self._load_actors_algs(actors[actor_name].funcs)
-
-    def _load_actors_vars(self, actor_vars: dict[str, tuple[str, KumirValue]]) -> None:
-        for name, var in actor_vars.items():
-            self.glob_vars[name] = var
+        actor = actors[actor_name]
+        self.numpy_tables |= actor.numpy_tables
+        for name, slot in var_slots:
+            self.globals[slot] = actor.vars[name][1]
+        self._load_actors_algs(actor.funcs)
 
     def _load_actors_algs(self, funcs: dict[str, KumirFunc]) -> None:
-        for name, func in funcs.items():
-            self.actors_algs[name] = (func.args, func.ret_type, func.py_func)
-
-    def _load_args(self, lineno: int, args: list[tuple[str, str, str]]) -> Namespace:
-        res: Namespace = {}
-        args_values = []
-        for arg in args:
-            if arg[0] != 'рез':
-                args_values.append(self.stack.pop())
-        for arg, value in zip(args, args_values[::-1]):
-            if arg[1] != value.typename:
-                raise RuntimeException(lineno, 'неправильный тип аргумента')
-            res[arg[2]] = (arg[1], value)
-        return res
-
-    def _save_var(self, lineno: int, typename: str, name: str, value: Value | None) -> None:
-        """
-        Создаёт переменную
-        :param lineno: номер текущей строки кода
-        :param typename: тип переменной
-        :param name: имя переменной
-        :param value: значение переменной (`None` - объявлена, но не определена)
-        """
-        namespace = self.call_stack[-1] if self.in_alg else self.glob_vars
-        if value is None:
-            namespace[name] = (typename, None)
-            return
-        value_type = value.typename
-        if value_type == typename:  # типы целевой переменной и значения совпадают
-            namespace[name] = (typename, value)
-        else:
-            raise RuntimeException(lineno, message=f'нельзя "{typename} := {value_type}"')
+        self.actors_algs.update(funcs)
 
-    def get_var(self, lineno: int, name: str) -> Value:
+    def _pop_args(self, lineno: int, args: list[tuple[str, str, str]]) -> list[Value]:
         """
-        :param lineno: номер текущей строки кода
-        :param name: имя переменной
-        :return: экземпляр класса `Value` - значение переменной
-        :raise: RuntimeException - если имя не определено
+        :return: значения аргументов (кроме параметров `рез`) из стека в порядке их объявления
         """
-        var = _find_var_in_namespace(lineno, name, self._get_all_namespaces())
-        if var is not None:
-            return var
-        raise RuntimeException(lineno, f'имя "{name}" не определено')
+        in_args = [arg for arg in args if is_input_arg(arg)]
+        values = [self.stack.pop() for _ in in_args]
+        values.reverse()
+        for arg, value in zip(in_args, values):
+            if not arg_type_matches(arg[1], value.typename):
+                raise RuntimeException(lineno, 'неправильный тип аргумента')
+        return values
 
-    def _var_defined(self, name: str) -> bool:
+    def _extra_args(self, func: KumirFunc) -> dict[str, Any]:
         """
-        :param name: имя переменной
-        :return: `True`, если имя объявлено, иначе `False`
+        :return: значения дополнительных именованных аргументов функции исполнителя
         """
-        return name in self._get_all_namespaces()
+        values = {'work_dir': self.work_dir, 'prog_dir': self.cur_dir}
+        return {name: values[name] for name in func.extra_args}
 
-    def _get_all_namespaces(self) -> Namespace:
-        """
-        :return: словарь - все доступные переменные
-        """
-        res = self.glob_vars
-        if self.call_stack:
-            res |= self.call_stack[-1]
-        return res
 
-    def _get_extra_args(self, name: str) -> dict[str, str]:
-        extra_args = {}
-        if name in ('РАБОЧИЙ КАТАЛОГ', 'создать каталог', 'полный путь'):
-            extra_args['work_dir'] = self.work_dir
-        elif name == 'КАТАЛОГ ПРОГРАММЫ':
-            extra_args['prog_dir'] = self.cur_dir
-        return extra_args
+def _check_value_type(lineno: int, typename: str, value: Value | None) -> None:
+    """
+    :param value: значение, которое сохраняется в величину типа `typename` (`None` - величина только объявлена)
+    """
+    if value is not None and value.typename != typename:
+        raise RuntimeException(lineno, f'нельзя "{typename} := {value.typename}"')
 
 
-def _str_to_bool(v: str) -> bool:
-    return v == 'да'
+def _str_value(value: Value) -> Value:
+    """
+    :return: значение, в котором буфер `StrBuffer` заменён на `str` (буфер не должен попасть в стек)
+    """
+    if value.value.__class__ is StrBuffer:
+        return Value('лит', str(value.value))
+    return value
 
 
-def _bool_to_str(b: bool) -> str:
-    return 'да' if b else 'нет'
+def _set_item_str(lineno: int, index: int, value: Value, var: Value) -> Value:
+    """
+    :return: новое значение строки `var`, в которой символ с индексом `index` заменён на `value`
+    """
+    if value.typename == 'сим' or (value.typename == 'лит' and len(value.value) == 1):
+        new_val = var.value
+        new_val = new_val[: index - 1] + value.value + new_val[index:]
+        return Value('лит', new_val)
+    else:
+        raise RuntimeException(lineno, f'нельзя "сим := {value.typename}"')
 
 
-def _check_str_index(lineno: int, index: Value, string: str) -> None:
+def _check_str_index(lineno: int, index: Value, string: str | StrBuffer) -> None:
     _check_index_type(lineno, index)
     val = index.value
     if val > len(string):
@@ -609,9 +985,11 @@ def _check_str_index(lineno: int, index: Value, string: str) -> None:
         raise RuntimeException(lineno, 'отрицательный индекс')
 
 
-def _check_table_index(lineno: int, index: int, table: dict[int, Value | None]) -> None:
-    if index not in table:
-        raise RuntimeException(lineno, 'выход за границу таблицы')
+def _check_indexes_n(lineno: int, indexes_n: int, dims: int) -> None:
+    if indexes_n > dims:
+        raise RuntimeException(lineno, 'лишние индексы')
+    if indexes_n < dims:
+        raise RuntimeException(lineno, 'не хватает индексов')
 
 
 def _check_index_type(lineno: int, index: Value) -> None:
@@ -637,26 +1015,12 @@ def _convert_string_to_type(lineno: int, string: str, var_type: str) -> Value:
         except ValueError:
             raise RuntimeException(lineno, 'ошибка ввода вещественного числа') from None
     elif var_type == 'лог':
-        return Value('лог', string)
+        if string not in ('да', 'нет'):
+            raise RuntimeException(lineno, 'ошибка ввода логического значения')
+        return bool_value(string == 'да')
     elif var_type == 'сим':
         if len(string) > 1:
             raise RuntimeException(lineno, 'ошибка ввода: введено лишнее')
         return Value('сим', string)
     else:
         return Value('лит', string)
-
-
-def _find_var_in_namespace(lineno: int, name: str, namespace: Namespace) -> Value | None:
-    """
-    :param name: имя переменной
-    :param namespace: словарь всех переменных
-    :return: `None` если переменная не найдена, иначе `Value`
-    :raise: RuntimeException - если переменная объявлена, но ей не присвоено значение
-    """
-    try:
-        var = namespace[name]
-    except KeyError:
-        return None
-    if var[1] is None:
-        raise RuntimeException(lineno, 'нет значения у величины')
-    return var[1]
@@ -0,0 +1,143 @@
+import importlib
+import os
+from pathlib import Path
+import sys
+from threading import Thread
+import time
+
+import pytest
+
+pytest.importorskip('PyQt6.QtWidgets')
+# окна не показываются, тесты работают и без дисплея
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEvent, Qt  # noqa: E402
+from PyQt6.QtGui import QKeyEvent, QTextCursor  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
+
+sys.path.append(str(PATH_TO_SRC.absolute()))
+
+console_module = importlib.import_module('interface.console')
+runner_module = importlib.import_module('interface.runner')
+Console, InputCancelled, Runner = console_module.Console, console_module.InputCancelled, runner_module.Runner
+
+INPUT_PROGRAM = '''
+алг нач
+    цел а
+    ввод а
+    вывод а * 2
+кон'''
+
+
+class ErrorSignalMock:
+    def __init__(self):
+        self.errors = []
+
+    def emit(self, e: Exception) -> None:
+        self.errors.append(e)
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def console(app):
+    return Console()
+
+
+def wait_for(app, cond, timeout: float = 5.0) -> bool:
+    """Обрабатывает события Qt, пока условие не выполнится или не пройдёт `timeout` секунд."""
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.01)
+    return True
+
+
+def type_text(console, text: str) -> None:
+    for char in text:
+        console.keyPressEvent(QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_unknown, Qt.KeyboardModifier.NoModifier, char))
+    console.keyPressEvent(QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Return, Qt.KeyboardModifier.NoModifier, '\r'))
+
+
+def console_text(app, console) -> str:
+    app.processEvents()
+    console._flush_output()
+    return console.toPlainText()
+
+
+def test_input_completed(app, console):
+    res = []
+    t = Thread(target=lambda: res.append(console.input()))
+    t.start()
+    assert wait_for(app, lambda: console.inputting)
+    type_text(console, '42')
+    t.join(5)
+    assert not t.is_alive()
+    assert res == ['42']
+
+
+def test_cancel_during_input(app, console):
+    errors = ErrorSignalMock()
+    runner = Runner(console, errors)
+    t = Thread(target=runner.run, args=(INPUT_PROGRAM,))
+    t.start()
+    assert wait_for(app, lambda: console.inputting)
+    runner.stop()
+    t.join(5)
+    assert not t.is_alive()
+    assert errors.errors == []
+    assert 'Выполнение прервано' in console_text(app, console)
+
+
+def test_cancelled_input_raises(app, console):
+    console.cancel_input()
+    with pytest.raises(InputCancelled):
+        console.input()
+
+
+def test_new_run_after_cancel_waits_for_input(app, console):
+    runner = Runner(console, ErrorSignalMock())
+    runner.stop()
+    t = Thread(target=runner.run, args=(INPUT_PROGRAM,))
+    t.start()
+    assert wait_for(app, lambda: console.inputting)
+    # отмена предыдущей программы не должна завершить ожидание ввода новой
+    time.sleep(0.1)
+    assert t.is_alive()
+    type_text(console, '7')
+    t.join(5)
+    assert not t.is_alive()
+    assert '14' in console_text(app, console)
+
+
+def test_output_batched_with_line_cap(app):
+    console = Console(max_lines=1000)
+    lines_n = 100_000
+    t = Thread(target=lambda: [console.write(f'<b>{i}</b>\n') for i in range(lines_n)])
+    t.start()
+    t.join()
+    # вывод добавляется по таймеру консоли
+    assert wait_for(app, lambda: not console.pending)
+    text = console.toPlainText()
+    assert console.document().blockCount() <= 1001
+    # вывод программы - обычный текст, а не HTML
+    assert text.endswith(f'<b>{lines_n - 1}</b>\n')
+
+
+def test_output_after_message_has_default_format(app, console):
+    console.output_err.emit('ошибка\n')
+    console.write('текст')
+    console._flush_output()
+    cursor = console.textCursor()
+    cursor.movePosition(QTextCursor.MoveOperation.End)
+    char_format = cursor.charFormat()
+    assert char_format.foreground().style() == Qt.BrushStyle.NoBrush
+    assert not char_format.fontItalic()
+    assert console.toPlainText().endswith('ошибка\nтекст')
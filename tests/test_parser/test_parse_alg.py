@@ -94,6 +94,21 @@ def test_parse_alg_with_args():
     ]
 
 
+def test_parse_alg_with_table_args():
+    code = """
+    алг тест(арг цел таб а[1:n, 0:2], рез вещтаб б[1:3]) нач
+    кон
+    """
+    parser = Parser(code)
+    parsed = parser.parse()
+    assert parsed[0] == ast_classes.AlgStart(
+        lineno=1,
+        is_main=True,
+        name='тест',
+        args=[['арг', 'целтаб', 'а'], ['рез', 'вещтаб', 'б']],
+    )
+
+
 def test_parse_call():
     code = """
     алг нач
@@ -244,6 +259,36 @@ def test_parse_nested_call():
     ]
 
 
+def test_parse_call_then_output_items():
+    code = 'вывод тест(тест(1), 2), нс'
+    parser = Parser(code)
+    parsed = parser.parse()
+    assert parsed == [
+        ast_classes.Output(
+            lineno=0,
+            exprs=[
+                [
+                    ast_classes.Call(
+                        lineno=0,
+                        alg_name='тест',
+                        args=[
+                            [ast_classes.Call(lineno=0, alg_name='тест', args=[[Value(typename='цел', value=1)]])],
+                            [Value(typename='цел', value=2)],
+                        ],
+                    )
+                ],
+                [Value(typename='get-name', value='нс')],
+            ],
+        )
+    ]
+
+
+def test_call_without_close_bracket_error():
+    parser = Parser('вывод тест(1, 2')
+    with pytest.raises(SyntaxException):
+        parser.parse()
+
+
 def test_without_start_keyword_error():
     code = """алг
     цел а := 5
@@ -96,6 +96,33 @@ def test_alg_with_return():
     assert print_mock.printed_text == '3'
 
 
+def test_alg_with_return_then_output_items():
+    bytecode = code2bc("""
+    алг нач
+        вывод сумма(1, 2), нс
+        вывод сумма(сумма(1, 2), 3), " ", sqrt(4.0), нс
+    кон
+
+    алг цел сумма(арг цел а, арг цел б) нач
+        знач := а + б
+    кон""")
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '3\n6 2.0\n'
+
+
+def test_wrong_args_n_error():
+    with pytest.raises(RuntimeException):
+        code2bc("""
+        алг нач
+            вывод сумма(1, 2, 3)
+        кон
+
+        алг цел сумма(арг цел а, арг цел б) нач
+            знач := а + б
+        кон""")
+
+
 def test_alg_with_result():
     bytecode = code2bc('''
     алг нач
@@ -115,6 +142,35 @@ def test_alg_with_result():
     vm.execute()
     assert print_mock.printed_text == 'тест'
 
+def test_alg_with_two_results():
+    bytecode = code2bc('''
+    алг нач
+        цел а, б
+        тест(а, 5, б)
+        вывод а, " ", б
+    кон
+
+    алг тест(рез цел x, арг цел y, рез цел z) нач
+        x := y + 1
+        z := y + 2
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '6 7'
+
+
+def test_actor_alg_with_result():
+    bytecode = code2bc('''
+    алг нач
+        лог готово
+        цел а := лит_в_цел("12", готово)
+        вывод а, " ", готово
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '12 да'
+
+
 def test_alg_with_start_and_end_asserts():
     bytecode = code2bc('''
     алг нач
@@ -133,6 +189,147 @@ def test_alg_with_start_and_end_asserts():
     assert print_mock.printed_text == '2'
 
 
+def test_alg_without_args_in_expr():
+    bytecode = code2bc('''
+    алг нач
+        вывод пять + 1, " ", время >= 0
+    кон
+
+    алг цел пять нач
+        знач := 5
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '6 да'
+
+
+def test_undef_name_in_expr_error():
+    bytecode = code2bc('алг\nнач\nвывод тест + 1\nкон')
+    vm = create_vm(*bytecode)
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
 def test_call_undef_alg_error():
     with pytest.raises(RuntimeException):
         code2bc('алг\nнач\nтест\nкон')
+
+
+def test_wrong_arg_type_error():
+    with pytest.raises(RuntimeException):
+        code2bc('''
+        алг нач
+            вывод квадрат(2.5)
+        кон
+
+        алг цел квадрат(цел x) нач
+            знач := x * x
+        кон''')
+
+
+def test_assign_to_arg_error():
+    with pytest.raises(RuntimeException):
+        code2bc('''
+        алг нач
+            вывод квадрат(2)
+        кон
+
+        алг цел квадрат(арг цел x) нач
+            x := x * x
+            знач := x
+        кон''')
+
+
+def test_assign_to_argres():
+    bytecode = code2bc('''
+    алг нач
+        цел а := 3
+        удвоить(а)
+        вывод а
+    кон
+
+    алг удвоить(аргрез цел x) нач
+        x := x * 2
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '6'
+
+
+def test_deep_recursion():
+    bytecode = code2bc('''
+    алг нач
+        вывод сумма(5000)
+    кон
+
+    алг цел сумма(арг цел н) нач
+        если н = 0 то
+            знач := 0
+        иначе
+            знач := н + сумма(н - 1)
+        все
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == str(5000 * 5001 // 2)
+
+
+def test_max_call_depth_error():
+    bytecode = code2bc('''
+    алг нач
+        тест
+    кон
+
+    алг тест нач
+        тест
+    кон''')
+    vm = VM(bytecode[0], output_f=print_mock.print, input_f=lambda: '', algs=bytecode[1], max_call_depth=100)
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_table_arg_copied_on_write():
+    bytecode = code2bc('''
+    цел таб а[1:3]
+
+    алг нач
+        а[1] := 1
+        изменить(а)
+        вывод а[1]
+    кон
+
+    алг изменить(арг цел таб т[1:3])
+    нач
+        а[1] := 2
+        вывод т[1]
+        т[1] := 3
+        вывод т[1]
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '132'
+
+
+def test_table_argres_and_res_by_reference():
+    bytecode = code2bc('''
+    алг нач
+        цел таб а[1:2]
+        а[1] := 1
+        увеличить(а)
+        заполнить(а)
+        вывод а[1]
+        вывод а[2]
+    кон
+
+    алг увеличить(аргрез цел таб т[1:2])
+    нач
+        т[1] := т[1] + 1
+    кон
+
+    алг заполнить(рез цел таб т[1:2])
+    нач
+        т[2] := 5
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '25'
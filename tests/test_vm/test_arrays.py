@@ -0,0 +1,256 @@
+import importlib
+from pathlib import Path
+import sys
+
+import pytest
+
+from mocks import PrintMock
+
+PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
+
+sys.path.append(str(PATH_TO_SRC.absolute()))
+
+interpreter = importlib.import_module('interpreter')
+code2bc, RuntimeException, VM = (
+    interpreter.code2bc,
+    interpreter.RuntimeException,
+    interpreter.VM,
+)
+table = importlib.import_module('interpreter.table')
+
+
+print_mock = PrintMock()
+
+def create_vm(bc, algs):
+    return VM(bc, output_f=print_mock.print, input_f=lambda: None, algs=algs)
+
+
+def setup_function(_) -> None:
+    print_mock.printed_text = ''
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(table, 'numpy', None)
+    return request.param
+
+
+def test_fill_and_reduce(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        вещ таб а[1:5]
+        нц для i от 1 до 5
+            а[i] := 6.0 - i
+        кц
+        вывод сумма(а)
+        вывод " "
+        вывод минимум(а)
+        вывод " "
+        вывод максимум(а)
+        вывод " "
+        цел таб б[0:4]
+        заполнить(б, 2)
+        вывод скалярное произведение(а, б)
+    кон
+    ''')
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '15.0 1.0 5.0 30.0'
+
+
+def test_sort_and_cumsum(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        цел таб а[1:4]
+        а[1] := 3
+        а[2] := 1
+        а[3] := 4
+        а[4] := 2
+        упорядочить(а)
+        вывод а[1]
+        вывод " "
+        вывод а[4]
+        вывод " "
+        накопить суммы(а)
+        вывод а[4]
+    кон
+    ''')
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '1 4 10'
+
+
+def test_elementwise(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        цел таб а[1:2, 1:2]
+        цел таб б[1:2, 1:2]
+        цел таб в[1:2, 1:2]
+        вещ таб г[1:2, 1:2]
+        заполнить(а, 6)
+        заполнить(б, 4)
+        сложить(а, б, в)
+        вывод в[2, 2]
+        вывод " "
+        вычесть(а, б, в)
+        вывод в[1, 2]
+        вывод " "
+        умножить(а, б, в)
+        вывод в[2, 1]
+        вывод " "
+        разделить(а, б, г)
+        вывод г[1, 1]
+    кон
+    ''')
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '10 2 24 1.5'
+
+
+def test_different_shapes_error(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        вещ таб а[1:3]
+        вещ таб б[1:4]
+        заполнить(а, 1.0)
+        заполнить(б, 1.0)
+        вывод скалярное произведение(а, б)
+    кон
+    ''')
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_undefined_element_error(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        цел таб а[1:3]
+        а[1] := 1
+        вывод сумма(а)
+    кон
+    ''')
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_wrong_result_type_error(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        цел таб а[1:3]
+        заполнить(а, 1)
+        разделить(а, а, а)
+    кон
+    ''')
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_not_table_arg_error():
+    with pytest.raises(RuntimeException):
+        code2bc('''
+        использовать Массивы
+
+        алг нач
+            цел а := 1
+            вывод сумма(а)
+        кон
+        ''')
+
+
+def test_big_int_elements(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        цел таб а[1:2, 1:2]
+        цел таб б[1:2, 1:2]
+        цел таб в[1:2, 1:2]
+        заполнить(а, 2 ** 62)
+        заполнить(б, 2 ** 62)
+        а[1, 1] := 2 ** 64
+        сложить(а, б, в)
+        вывод в[1, 1]
+        вывод " "
+        заполнить(б, 2 ** 70)
+        вывод б[2, 2]
+    кон
+    ''')
+    vm = create_vm(*bc)
+    vm.execute()
+    assert print_mock.printed_text == f'{2 ** 64 + 2 ** 62} {2 ** 70}'
+
+
+def test_int_overflow_widens(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        цел таб а[1:3]
+        цел таб б[1:3]
+        заполнить(а, 9000000000000000000)
+        сложить(а, а, б)
+        вывод б[1]
+        вывод " "
+        умножить(а, а, б)
+        вывод б[2]
+        вывод " "
+        вычесть(б, а, б)
+        вывод б[3]
+        вывод " "
+        накопить суммы(а)
+        вывод а[3]
+        вывод " "
+        вывод сумма(а)
+        вывод " "
+        вывод скалярное произведение(а, а)
+    кон
+    ''')
+    vm = create_vm(*bc)
+    vm.execute()
+    x = 9 * 10**18
+    assert print_mock.printed_text == f'{2 * x} {x * x} {x * x - x} {3 * x} {6 * x} {14 * x * x}'
+
+
+def test_int_table_reduce_is_int(backend):
+    bc = code2bc('''
+    использовать Массивы
+
+    алг нач
+        цел таб а[1:3]
+        вещ таб б[1:3]
+        нц для i от 1 до 3
+            а[i] := i
+        кц
+        заполнить(б, 0.5)
+        цел s := сумма(а)
+        вывод s, " ", минимум(а), " ", максимум(а), " ", скалярное произведение(а, а)
+        вывод " ", скалярное произведение(а, б)
+    кон
+    ''')
+    vm = create_vm(*bc)
+    vm.execute()
+    assert print_mock.printed_text == '6 1 3 14 3.0'
@@ -120,13 +120,47 @@ def test_if_with_inner_loop():
 
 
 def test_if_cond_not_bool_error():
+    with pytest.raises(RuntimeException):
+        code2bc("""
+        алг нач
+            если 1 то
+                вывод 1
+            все
+        кон""")
+
+
+def test_and_or_short_circuit():
     bc = code2bc("""
     алг нач
-        если 1 то
+        цел таб а[1:2]
+        а[1] := 1
+        цел i := 3
+        если i <= 2 и а[i] > 0 то
             вывод 1
+        иначе
+            вывод 2
         все
+        если i > 2 или а[i] > 0 то
+            вывод 3
+        все
+        лог х := i <= 2 и а[i] > 0
+        вывод х
     кон""")
     vm = create_vm(*bc)
+    vm.execute()
 
-    with pytest.raises(RuntimeException):
-        vm.execute()
+    assert print_mock.printed_text == '23нет'
+
+
+def test_and_or_evaluate_right_operand():
+    bc = code2bc("""
+    алг нач
+        цел i := 1
+        вывод i > 0 и i < 2
+        вывод i > 5 или i = 1
+        вывод i > 0 и i > 2
+    кон""", opt_level=0)
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == 'даданет'
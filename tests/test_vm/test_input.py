@@ -1,4 +1,5 @@
 import importlib
+import io
 from pathlib import Path
 import sys
 
@@ -11,10 +12,12 @@ PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
 sys.path.append(str(PATH_TO_SRC.absolute()))
 
 interpreter = importlib.import_module('interpreter')
-code2bc, RuntimeException, VM = (
+code2bc, RuntimeException, VM, TokenReader, stream_lines = (
     interpreter.code2bc,
     interpreter.RuntimeException,
     interpreter.VM,
+    interpreter.token_reader.TokenReader,
+    interpreter.token_reader.stream_lines,
 )
 
 input_mock = InputMock()
@@ -100,3 +103,66 @@ def test_input_string_to_char_error():
     vm = create_vm(*bytecode)
     with pytest.raises(RuntimeException):
         vm.execute()
+
+
+def test_input_string_to_bool_error():
+    input_mock.entered_text = 'тест'
+    bytecode = code2bc('лог а\nввод а\nвывод а')
+    vm = create_vm(*bytecode)
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_input_from_file_by_tokens(tmp_path):
+    path = tmp_path / 'input.txt'
+    path.write_text('3 4\n  5\nпервая строка\n\nвторая строка\n\n', encoding='utf-8')
+    bytecode = code2bc(f'''
+    алг нач
+        файл ф
+        цел а
+        цел сумма := 0
+        лит с
+        ф := открыть на чтение("{path}")
+        нц 3 раз
+            ввод ф, а
+            сумма := сумма + а
+        кц
+        вывод сумма
+        нц пока есть данные(ф)
+            ввод ф, с
+            вывод "[", с, "]"
+        кц
+        вывод конец файла(ф)
+        закрыть(ф)
+    кон''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '12[первая строка][][вторая строка]нет'
+
+
+def test_input_from_stream_reader():
+    stream = io.BytesIO('1   2\r\n\n  3\r\nимя и фамилия\r\nда'.encode())
+    # маленькие куски, чтобы строки, буквы и '\r\n' попадали на их границы
+    reader = TokenReader(stream_lines(stream, chunk_size=3))
+    bytecode = code2bc('''
+    алг нач
+        цел а, б, в
+        лит с
+        лог л
+        ввод а, б, в
+        ввод с
+        ввод л
+        вывод а + б + в
+        вывод с
+        вывод л
+    кон''')
+    vm = VM(bytecode[0], output_f=print_mock.print, algs=bytecode[1], input_reader=reader)
+    vm.execute()
+    assert print_mock.printed_text == '6имя и фамилияда'
+
+
+def test_input_f_and_reader_together_error():
+    bytecode = code2bc('цел а')
+    reader = TokenReader(stream_lines(io.BytesIO(b'1')))
+    with pytest.raises(ValueError):
+        VM(bytecode[0], output_f=print_mock.print, input_f=input_mock.input, algs=bytecode[1], input_reader=reader)
@@ -127,6 +127,63 @@ def test_loop_for_with_step():
     assert print_mock.printed_text == '0\n2\n4\n'
 
 
+def test_loop_for_with_negative_step():
+    bc = code2bc("""
+    алг нач
+        нц для а от 5 до 1 шаг -2
+            вывод а, нс
+        кц
+    кон""")
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '5\n3\n1\n'
+
+
+def test_loop_for_bounds_evaluated_once():
+    bc = code2bc("""
+    алг нач
+        цел н := 3
+        нц для а от 1 до н
+            н := н + 1
+            вывод а
+        кц
+    кон""")
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '123'
+
+
+def test_loop_for_empty_range():
+    bc = code2bc("""
+    алг нач
+        нц для а от 5 до 1
+            вывод а
+        кц
+        нц 0 раз
+            вывод "тест"
+        кц
+    кон""")
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == ''
+
+
+def test_loop_for_zero_step_error():
+    bc = code2bc("""
+    алг нач
+        нц для а от 1 до 5 шаг 0
+            вывод а
+        кц
+    кон""")
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
 def test_loop_until():
     bc = code2bc("""
     алг нач
@@ -160,14 +217,79 @@ def test_infinite_loop_with_exit():
     assert print_mock.printed_text == '0\n1\n2\n3\n4\n5\n6\n'
 
 
-def test_loop_with_count_expr_not_int_error():
+def test_exit_from_loop_while():
     bc = code2bc("""
     алг нач
-        нц "5" раз
-            вывод "тест", нс
+        цел а := 0
+        нц пока а < 10
+            а := а + 1
+            если а = 3 то
+                выход
+            все
         кц
+        вывод а
     кон""")
     vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '3'
+
+
+def test_exit_from_inner_loop():
+    bc = code2bc("""
+    алг нач
+        нц для а от 1 до 3
+            нц для б от 1 до 3
+                если б = 2 то
+                    выход
+                все
+                вывод а, б, " "
+            кц
+        кц
+    кон""")
+    vm = create_vm(*bc)
+    vm.execute()
 
+    assert print_mock.printed_text == '11 21 31 '
+
+
+@pytest.mark.parametrize('stmt', ['а := а + 1', 'ввод а', 'нц для а от 1 до 2\nкц', 'изменить(а)'])
+def test_assign_to_loop_var_error(stmt):
+    with pytest.raises(RuntimeException, match='нельзя присвоить переменной цикла'):
+        code2bc(f"""
+        алг нач
+            нц для а от 1 до 3
+                {stmt}
+            кц
+        кон
+
+        алг изменить(аргрез цел х)
+        нач
+            х := 0
+        кон""")
+
+
+def test_assign_to_loop_var_after_loop():
+    bc = code2bc("""
+    алг нач
+        цел а
+        нц для а от 1 до 3
+            вывод а
+        кц
+        а := 10
+        вывод " ", а
+    кон""")
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '123 10'
+
+
+def test_loop_with_count_expr_not_int_error():
     with pytest.raises(RuntimeException):
-        vm.execute()
+        code2bc("""
+        алг нач
+            нц "5" раз
+                вывод "тест", нс
+            кц
+        кон""")
@@ -79,3 +79,39 @@ def test_get_local_var_from_local_call_error():
 
     with pytest.raises(RuntimeException):
         vm.execute()
+
+
+def test_local_vars_not_in_globals():
+    bytecode = code2bc("""
+    цел а := 1
+    алг
+    нач
+      цел б := 2
+      вывод а + б
+    кон""")
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '3'
+    assert 'б' not in vm.glob_vars
+
+
+def test_recursive_alg_locals():
+    bytecode = code2bc("""
+    алг
+    нач
+      вывод сумма(4)
+    кон
+
+    алг цел сумма(арг цел н)
+    нач
+      цел предыдущее
+      если н = 0 то
+        знач := 0
+      иначе
+        предыдущее := сумма(н - 1)
+        знач := предыдущее + н
+      все
+    кон""")
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == '10'
@@ -0,0 +1,163 @@
+import importlib
+from pathlib import Path
+import sys
+
+import pytest
+
+from mocks import PrintMock
+
+PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
+
+sys.path.append(str(PATH_TO_SRC.absolute()))
+
+interpreter = importlib.import_module('interpreter')
+code2bc, RuntimeException, VM, Bytecode = (
+    interpreter.code2bc,
+    interpreter.RuntimeException,
+    interpreter.VM,
+    interpreter.bytecode.Bytecode,
+)
+
+print_mock = PrintMock()
+
+
+def create_vm(bc, algs):
+    return VM(bc, output_f=print_mock.print, input_f=lambda: None, algs=algs)
+
+
+def setup_function(_):
+    print_mock.printed_text = ''
+
+
+def opcodes(bc):
+    return [inst[1] for inst in bc]
+
+
+def test_constant_folding():
+    bc, algs = code2bc('цел n := 1\nцел а := 2 * 3 + n\nвывод а, " ", -(2 + 3) * 2.0, " ", 1 < 2')
+    assert Bytecode.MUL_INT not in opcodes(bc)
+    assert Bytecode.MUL_FLOAT not in opcodes(bc)
+    assert Bytecode.LT not in opcodes(bc)
+    vm = create_vm(bc, algs)
+    vm.execute()
+    assert print_mock.printed_text == '7 -10.0 да'
+
+
+def test_no_optimizations():
+    bc, _ = code2bc('цел а := 2 * 3', opt_level=0)
+    assert Bytecode.MUL_INT in opcodes(bc)
+
+
+def test_division_by_zero_not_folded():
+    bc, algs = code2bc('вещ а := 1 / 0')
+    assert Bytecode.DIV in opcodes(bc)
+    vm = create_vm(bc, algs)
+    with pytest.raises(ZeroDivisionError):
+        vm.execute()
+
+
+def test_dead_code_removed():
+    bc, algs = code2bc("""
+    алг нач
+        если нет то
+            вывод 1
+        все
+        нц пока да
+            вывод 2
+            стоп
+            вывод 3
+        кц
+    кон""")
+    alg_code = algs[''].code
+    assert opcodes(alg_code).count(Bytecode.OUTPUT) == 1
+    assert Bytecode.JUMP_IF_FALSE not in opcodes(alg_code)
+    vm = create_vm(bc, algs)
+    vm.execute()
+    assert print_mock.printed_text == '2СТОП.'
+
+
+def test_store_load_forwarding():
+    bc, algs = code2bc("""
+    алг нач
+        цел а := 0
+        нц пока а < 5
+            а := а + 1
+        кц
+        вывод а
+    кон""")
+    assert Bytecode.STORE_LOCAL_KEEP in opcodes(algs[''].code)
+    vm = create_vm(bc, algs)
+    vm.execute()
+    assert print_mock.printed_text == '5'
+
+
+def test_load_after_declaration_not_forwarded():
+    bc, algs = code2bc('цел а\nвывод а')
+    vm = create_vm(bc, algs)
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_jump_threading():
+    bc, algs = code2bc("""
+    алг нач
+        цел а := 0
+        нц пока а < 3
+            если а = 1 то
+                а := а + 2
+            иначе
+                а := а + 1
+            все
+        кц
+        вывод а
+    кон""")
+    alg_code = algs[''].code
+    for inst in alg_code:
+        if inst[1] == Bytecode.JUMP:
+            assert alg_code[inst[2][0]][1] != Bytecode.JUMP
+    vm = create_vm(bc, algs)
+    vm.execute()
+    assert print_mock.printed_text == '3'
+
+
+def test_switch_jump_table():
+    bc, algs = code2bc("""
+    алг нач
+        нц для а от 0 до 3
+            выбор
+                при а = 0: вывод "н"
+                при а = 1: вывод "о"
+                при а = 2: вывод "д"
+                иначе вывод "?"
+            все
+        кц
+    кон""")
+    alg_code = algs[''].code
+    assert Bytecode.SWITCH in opcodes(alg_code)
+    assert Bytecode.EQ not in opcodes(alg_code)
+    vm = create_vm(bc, algs)
+    vm.execute()
+    assert print_mock.printed_text == 'нод?'
+
+
+def test_compare_and_jump_fused():
+    bc, algs = code2bc("""
+    алг нач
+        цел а := 0
+        нц
+            а := а + 1
+        кц при а < 4
+        нц пока а > 0
+            вывод а
+            а := а - 1
+        кц
+        если "б" < "а" то
+            вывод "!"
+        все
+    кон""")
+    alg_code = algs[''].code
+    assert opcodes(alg_code).count(Bytecode.COMPARE_AND_JUMP) == 3
+    assert Bytecode.GT not in opcodes(alg_code)
+    vm = create_vm(bc, algs)
+    vm.execute()
+    assert print_mock.printed_text == '4321'
@@ -2,6 +2,8 @@ import importlib
 from pathlib import Path
 import sys
 
+import pytest
+
 from mocks import PrintMock
 
 PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
@@ -9,7 +11,7 @@ PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
 sys.path.append(str(PATH_TO_SRC.absolute()))
 
 interpreter = importlib.import_module('interpreter')
-code2bc, VM = interpreter.code2bc, interpreter.VM
+code2bc, RuntimeException, VM = interpreter.code2bc, interpreter.RuntimeException, interpreter.VM
 
 print_mock = PrintMock()
 
@@ -48,3 +50,52 @@ def test_output_many_exprs():
     vm = create_vm(*bytecode)
     vm.execute()
     assert print_mock.printed_text == 'привет, мир!'
+
+
+def test_output_buffered():
+    chunks = []
+    bytecode = code2bc('''
+    алг нач
+        цел а
+        нц для i от 1 до 3
+            вывод i
+        кц
+        ввод а
+        вывод а
+        утв а = 0
+    кон''')
+    vm = VM(bytecode[0], output_f=chunks.append, input_f=lambda: '4', algs=bytecode[1])
+    with pytest.raises(RuntimeException):
+        vm.execute()
+    # вывод до ввода передан одним куском перед вводом, остальной - при ошибке
+    assert chunks == ['123', '4']
+
+
+def test_output_unbuffered():
+    chunks = []
+    bytecode = code2bc('вывод 1\nвывод 2\nстоп')
+    vm = VM(bytecode[0], output_f=chunks.append, input_f=lambda: None, algs=bytecode[1], output_buffer_size=0)
+    vm.execute()
+    assert chunks == ['1', '2', 'СТОП.']
+
+
+def test_output_flushed_by_timer():
+    chunks = []
+    finished = False
+    bytecode = code2bc('''
+    алг нач
+        вывод "готово"
+        нц для i от 1 до 200000
+        кц
+    кон''')
+    vm = VM(
+        bytecode[0],
+        output_f=lambda s: chunks.append((s, finished)),
+        input_f=lambda: None,
+        algs=bytecode[1],
+        output_flush_interval=0.01,
+    )
+    vm.execute()
+    finished = True
+    # вывод передан по таймеру во время цикла, хотя после него ничего не выводилось
+    assert chunks == [('готово', False)]
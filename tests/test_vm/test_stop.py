@@ -31,3 +31,23 @@ def test_stop():
     vm = create_vm(*bc)
     vm.execute()
     assert print_mock.printed_text == '1\nСТОП.'
+
+
+def test_stop_in_alg():
+    bc = code2bc("""
+    алг нач
+        нц 3 раз
+            тест
+        кц
+        вывод 2
+    кон
+
+    алг тест
+    нач
+        вывод 1, нс
+        стоп
+    кон
+    """)
+    vm = create_vm(*bc)
+    vm.execute()
+    assert print_mock.printed_text == '1\nСТОП.'
@@ -42,3 +42,43 @@ def test_switch():
     vm.execute()
 
     assert print_mock.printed_text == '1'
+
+
+def test_switch_on_char_with_repeated_value():
+    bc = code2bc("""
+    алг нач
+        лит с := "абвг"
+        нц для i от 1 до 4
+            сим х := с[i]
+            выбор
+                при х = "а": вывод 1
+                при х = "б": вывод 2
+                при х = "б": вывод 3
+                при х = "в": вывод 4
+                иначе вывод 0
+            все
+        кц
+    кон
+    """)
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '1240'
+
+
+def test_switch_with_general_conditions():
+    bc = code2bc("""
+    алг нач
+        цел а := 5
+        выбор
+            при а = 1: вывод 1
+            при а = 2: вывод 2
+            при а > 3: вывод 3
+            иначе вывод 0
+        все
+    кон
+    """)
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '3'
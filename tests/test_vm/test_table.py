@@ -2,6 +2,8 @@ import importlib
 from pathlib import Path
 import sys
 
+import pytest
+
 from mocks import PrintMock
 
 PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
@@ -9,7 +11,7 @@ PATH_TO_SRC = Path(__file__).parent.parent.parent.absolute() / 'src'
 sys.path.append(str(PATH_TO_SRC.absolute()))
 
 interpreter = importlib.import_module('interpreter')
-code2bc, VM = interpreter.code2bc, interpreter.VM
+code2bc, RuntimeException, VM = interpreter.code2bc, interpreter.RuntimeException, interpreter.VM
 
 print_mock = PrintMock()
 
@@ -44,3 +46,129 @@ def test_3d_table():
     vm.execute()
 
     assert print_mock.printed_text == '5'
+
+
+def test_2d_table_rows():
+    bc = code2bc("""
+    алг нач
+        цел таб а[1:3, 1:3]
+        нц для i от 1 до 3
+            нц для j от 1 до 3
+                а[i, j] := i * 10 + j
+            кц
+        кц
+        вывод а[2, 3]
+        вывод а[3, 1]
+    кон
+    """)
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '2331'
+
+
+def test_tables_of_other_types():
+    bc = code2bc("""
+    вещ таб числа[1:2]
+    лог таб флаги[1:2]
+    лит таб слова[1:2]
+    числа[1] := 1.5
+    флаги[2] := да
+    слова[1] := "тест"
+    вывод числа[1]
+    вывод флаги[2]
+    вывод слова[1]
+    """)
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '1.5датест'
+
+
+def test_undefined_element_error():
+    bc = code2bc("""
+    цел таб а[1:5]
+    а[1] := 1
+    вывод а[2]
+    """)
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_index_out_of_bounds_error():
+    bc = code2bc("""
+    цел таб а[1:5, 1:5]
+    а[1, 6] := 1
+    """)
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_not_enough_indexes_error():
+    bc = code2bc("""
+    цел таб а[1:5, 1:5]
+    а[1, 1] := 1
+    вывод а[1]
+    """)
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_too_many_indexes_error():
+    bc = code2bc("""
+    цел таб а[1:5]
+    а[1, 1] := 1
+    """)
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_huge_sparse_table():
+    bc = code2bc("""
+    алг нач
+        цел таб а[1:10000, 1:10000]
+        нц для i от 1 до 10000
+            а[i, i] := i
+        кц
+        вывод а[1, 1] + а[10000, 10000]
+    кон
+    """)
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '10001'
+
+
+def test_table_memory_limit_error():
+    bc = code2bc('цел таб а[1:1000000, 1:1000000]')
+    vm = create_vm(*bc)
+
+    with pytest.raises(RuntimeException):
+        vm.execute()
+
+
+def test_big_int_in_table():
+    bc = code2bc("""
+    алг нач
+        цел таб а[1:3]
+        цел б := 2 ** 70
+        а[1] := 1
+        а[2] := 2 ** 70
+        а[3] := а[2] + а[1]
+        вывод а[1]
+        вывод " "
+        вывод а[3] - б
+    кон
+    """)
+    vm = create_vm(*bc)
+    vm.execute()
+
+    assert print_mock.printed_text == '1 1'
@@ -17,6 +17,8 @@ code2bc, RuntimeException, VM, Value = (
     interpreter.VM,
     interpreter.value.Value,
 )
+actors_module = importlib.import_module('interpreter.actors')
+base = importlib.import_module('interpreter.actors.base')
 
 
 print_mock = PrintMock()
@@ -48,5 +50,61 @@ def test_use_non_exists_actor():
     ''')
     vm = create_vm(*bytecode)
 
+    with pytest.raises(RuntimeException, match='нет такого исполнителя'):
+        vm.execute()
+
+
+def test_use_non_exists_actor_then_call_builtin():
+    bytecode = code2bc('''
+    использовать InvalidActor
+    алг нач
+        вывод sqrt(4.0)
+    кон
+    ''')
+    vm = create_vm(*bytecode)
+
+    with pytest.raises(RuntimeException, match='нет такого исполнителя'):
+        vm.execute()
+    assert print_mock.printed_text == ''
+
+
+def test_actor_alg_called_natively():
+    bc, algs = code2bc('''
+    алг нач
+        лог готово
+        вывод КАТАЛОГ ПРОГРАММЫ
+        вывод mod(7, 3)
+        вывод лит_в_цел("5", готово)
+    кон''')
+    Bytecode = interpreter.bytecode.Bytecode
+    opcodes = [inst[1] for inst in algs[''].code]
+    assert opcodes.count(Bytecode.CALL_NATIVE) == 2
+    assert Bytecode.CALL in opcodes  # у `лит_в_цел` есть параметр `рез`
+    vm = VM(bc, output_f=print_mock.print, input_f=lambda: None, algs=algs, cur_dir='/prog')
+    vm.execute()
+    assert print_mock.printed_text == '/prog15'
+
+
+def test_actor_alg_wrong_args_n_error():
     with pytest.raises(RuntimeException):
+        code2bc('вывод mod(7)')
+    with pytest.raises(RuntimeException):
+        code2bc('вывод mod')
+
+
+def test_same_alg_in_two_actors(monkeypatch):
+    class First(base.Actor):
+        funcs = {'имя': base.KumirFunc(lambda args: Value('лит', 'первый'), 'лит')}
+
+    class Second(base.Actor):
+        funcs = {'имя': base.KumirFunc(lambda args: Value('лит', 'второй'), 'лит')}
+
+    monkeypatch.setitem(actors_module.actors, 'Первый', First())
+    monkeypatch.setitem(actors_module.actors, 'Второй', Second())
+    # используется алгоритм исполнителя, подключённого последним
+    for first, second, expected in (('Первый', 'Второй', 'второй'), ('Второй', 'Первый', 'первый')):
+        print_mock.printed_text = ''
+        bc, algs = code2bc(f'использовать {first}\nиспользовать {second}\nвывод имя')
+        vm = create_vm(bc, algs)
         vm.execute()
+        assert print_mock.printed_text == expected
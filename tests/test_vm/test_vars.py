@@ -121,6 +121,13 @@ def test_slice():
     assert print_mock.printed_text == 'test'
 
 
+def test_slice_after_operand():
+    bytecode = code2bc('лит а := "gtestfht"\nвывод "x" + а[2:5]')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == 'xtest'
+
+
 def test_not_name():
     bytecode = code2bc('лог завтра дождь := да\nвывод завтра не дождь')
     vm = create_vm(*bytecode)
@@ -128,6 +135,13 @@ def test_not_name():
     assert print_mock.printed_text == 'нет'
 
 
+def test_compare_result_output():
+    bytecode = code2bc('лог а := 2 > 1\nвывод а, " ", а и 1 = 2, " ", а = да')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == 'да нет да'
+
+
 def test_assign_to_not_defined_error():
     bytecode = code2bc('а := 5')
     vm = create_vm(*bytecode)
@@ -136,10 +150,8 @@ def test_assign_to_not_defined_error():
 
 
 def test_define_with_wrong_type_error():
-    bytecode = code2bc('цел а := "привет"')
-    vm = create_vm(*bytecode)
     with pytest.raises(RuntimeException):
-        vm.execute()
+        code2bc('цел а := "привет"')
 
 
 def test_use_without_value_error():
@@ -157,10 +169,13 @@ def test_use_without_define_error():
 
 
 def test_op_with_different_types_error():
-    bytecode = code2bc('цел а := 1 + "привет"')
-    vm = create_vm(*bytecode)
     with pytest.raises(RuntimeException):
-        vm.execute()
+        code2bc('цел а := 1 + "привет"')
+
+
+def test_op_with_table_element_error():
+    with pytest.raises(RuntimeException):
+        code2bc('целтаб а[1:2]\nа[1] := 1\nвывод а[1] + "привет"')
 
 
 def test_use_not_assigned_var_error():
@@ -168,3 +183,52 @@ def test_use_not_assigned_var_error():
     vm = create_vm(*bytecode)
     with pytest.raises(RuntimeException):
         vm.execute()
+
+
+def test_str_append_and_set_char():
+    bytecode = code2bc('''
+    алг нач
+        лит с := ""
+        нц для i от 1 до 5
+            с := с + "а"
+        кц
+        лит т := с
+        с[2] := "б"
+        с := с + "в"
+        вывод с
+        вывод " "
+        вывод т
+        вывод " "
+        вывод с[2]
+    кон
+    ''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == 'абааав ааааа б'
+
+
+def test_str_append_in_alg():
+    bytecode = code2bc('''
+    алг нач
+        лит с := "а"
+        вывод удвоить(с)
+        вывод " "
+        вывод с
+    кон
+
+    алг лит удвоить(лит с)
+    нач
+        знач := с
+        знач := знач + с
+    кон
+    ''')
+    vm = create_vm(*bytecode)
+    vm.execute()
+    assert print_mock.printed_text == 'аа а'
+
+
+def test_str_set_char_out_of_bounds_error():
+    bytecode = code2bc('лит с := "аб"\nс[3] := "в"')
+    vm = create_vm(*bytecode)
+    with pytest.raises(RuntimeException):
+        vm.execute()
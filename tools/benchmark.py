@@ -0,0 +1,145 @@
+"""
+Инструмент для замера скорости работы интерпретатора.
+
+Использование:
+```
+python tools/benchmark.py [-n ПОВТОРЫ] [--console] [файл.kum ...]
+```
+Без файлов запускает `examples/fib.kum` и встроенные программы с циклами.
+С `--console` программы выполняются в консоли интерфейса (нужен PyQt6, окно не показывается),
+замеряется время до того, как весь вывод показан в консоли.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from threading import Thread
+
+PATH_TO_ROOT = Path(__file__).parent.parent.absolute()
+
+sys.path.append(str(PATH_TO_ROOT / 'src'))
+
+from interpreter import code2bc, VM  # noqa: E402
+
+PROGRAMS = {
+    'циклы': """
+алг нач
+    цел с := 0
+    нц для i от 1 до 100000
+        если mod(i, 3) = 0 то
+            с := с + i
+        все
+    кц
+    вывод с
+кон
+""",
+    'пустой нц для': """
+алг нач
+    нц для i от 1 до 10000000
+    кц
+кон
+""",
+    'пока': """
+алг нач
+    цел i := 0
+    вещ с := 0.0
+    нц пока i < 100000
+        i := i + 1
+        с := с + 1.5 * i
+    кц
+    вывод с
+кон
+""",
+    'строки': """
+алг нач
+    лит с := ""
+    нц для i от 1 до 100000
+        с := с + "а"
+    кц
+    нц для i от 1 до 100000
+        с[i] := "б"
+    кц
+    вывод длин(с)
+кон
+""",
+    'вывод': """
+алг нач
+    нц для i от 1 до 1000000
+        вывод i, нс
+    кц
+кон
+""",
+}
+
+
+def run(code: str) -> float:
+    """
+    :param code: текст программы
+    :return: время выполнения программы (без компиляции) в секундах
+    """
+    bc, algs = code2bc(code)
+    vm = VM(bc, output_f=lambda s: None, input_f=lambda: '', algs=algs)
+    start = time.perf_counter()
+    vm.execute()
+    return time.perf_counter() - start
+
+
+class _RaiseErrors:
+    """Замена сигнала ошибок `Runner`: ошибка в замеряемой программе прерывает замер."""
+
+    @staticmethod
+    def emit(e: Exception) -> None:
+        raise e
+
+
+def run_console(code: str) -> float:
+    """
+    :param code: текст программы
+    :return: время от запуска программы в `Runner` (с компиляцией) до показа всего её вывода в `Console`
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    from interface.console import Console
+    from interface.runner import Runner
+
+    app = QApplication.instance() or QApplication([])
+    console = Console()
+    runner = Runner(console, _RaiseErrors())
+    start = time.perf_counter()
+    thread = Thread(target=runner.run, args=(code,))
+    thread.start()
+    # цикл событий интерфейса: вывод добавляется в консоль по её таймеру
+    while thread.is_alive():
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+    console._flush_output()
+    return time.perf_counter() - start
+
+
+def main(argv: list[str]) -> None:
+    repeats = 3
+    if len(argv) >= 2 and argv[0] == '-n':
+        repeats = int(argv[1])
+        argv = argv[2:]
+    run_f = run
+    if '--console' in argv:
+        run_f = run_console
+        argv = [arg for arg in argv if arg != '--console']
+
+    programs = {}
+    if argv:
+        for file in argv:
+            programs[file] = Path(file).read_text(encoding='utf-8')
+    else:
+        programs['fib.kum'] = (PATH_TO_ROOT / 'examples' / 'fib.kum').read_text(encoding='utf-8')
+        programs.update(PROGRAMS)
+
+    for name, code in programs.items():
+        best = min(run_f(code) for _ in range(repeats))
+        print(f'{name:20} {best * 1000:10.1f} мс')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])